@@ -4,6 +4,11 @@ from io import BytesIO
 import numpy as np
 from PIL import Image
 
+from evidence import images_dir_for
+from page_content import content_mask, page_content
+from prescreen import is_blank
+from render_manifest import area_scale
+
 
 def _recompress_arr(original: Image.Image, quality: int) -> np.ndarray:
     buf = BytesIO()
@@ -24,10 +29,7 @@ def compute_compression_score(forensic_output_dir: str) -> float:
     - only count "content" pixels (not near-white background)
     - ratio of strong-diff pixels => document score (median over pages)
     """
-    folder_name = os.path.basename(forensic_output_dir)
-
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    images_dir = os.path.join(project_root, "Images", folder_name)
+    images_dir = images_dir_for(forensic_output_dir)
 
     if not os.path.isdir(images_dir):
         return 0.0
@@ -39,10 +41,17 @@ def compute_compression_score(forensic_output_dir: str) -> float:
             continue
 
         img_path = os.path.join(images_dir, img_name)
+        if is_blank(img_path):
+            continue  # thumbnail pre-screen: the denom guard below would skip it
 
         try:
             with Image.open(img_path) as im:
-                orig = im.convert("RGB")
+                content_info = page_content(img_path, im)
+                if content_info.is_blank:
+                    continue  # no content pixels: the denom guard below would skip it
+
+                # Content box only (MCU-aligned, so the recompression matches the page)
+                orig = im.convert("RGB").crop(content_info.box)
                 low = _recompress_arr(orig, quality=60)
                 high = _recompress_arr(orig, quality=95)
                 orig_arr = np.array(orig, dtype=np.int16)
@@ -54,10 +63,11 @@ def compute_compression_score(forensic_output_dir: str) -> float:
 
         # content mask: exclude near-white background
         orig_gray = orig_arr.mean(axis=2).astype(np.float32)
-        content = orig_gray < 245.0
+        content = content_mask(orig_gray)
 
         denom = int(content.sum())
-        if denom < 5000:
+        # Pixel count calibrated at the reference render zoom
+        if denom < 5000 * area_scale(images_dir, img_name):
             continue
 
         # strong diff threshold (in 0..255)
@@ -1,10 +1,13 @@
 import os
 from io import BytesIO
-from typing import List
+from typing import Callable, List, Optional
 
 import numpy as np
 from PIL import Image
 
+from evidence import images_dir_for
+from page_content import active_mask
+
 
 def _recompress_rgb(original: Image.Image, quality: int) -> np.ndarray:
     """
@@ -28,7 +31,7 @@ def _tail_contrast_from_diff(diff_gray: np.ndarray) -> float:
     flat = diff_gray.reshape(-1).astype(np.float32)
 
     # remove near-zero background noise
-    flat = flat[flat > 2.0]
+    flat = flat[active_mask(flat)]
     if flat.size < 2000:
         return 0.0
 
@@ -51,17 +54,23 @@ def _tail_contrast_from_diff(diff_gray: np.ndarray) -> float:
     return float(max(0.0, top_band.mean() - high_band.mean()))
 
 
-def compute_ela_score(forensic_output_dir: str) -> float:
+def compute_ela_score(
+    forensic_output_dir: str,
+    compression_score: Optional[float] = None,
+    stats: Optional[dict] = None,
+    on_page: Optional[Callable[[int, float], None]] = None
+) -> float:
     """
     ELA score in [0, 1] computed from ORIGINAL page JPGs (Images/<folder>/page-*.jpg),
     not from the saved ELA visualization images.
 
     This avoids the "brightness boost saturation" problem that was making clean docs score ~1.
-    """
-    folder_name = os.path.basename(forensic_output_dir)
 
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # .../project_root
-    images_dir = os.path.join(project_root, "Images", folder_name)
+    Same signature as cw4updated; compression_score is ignored (no
+    compression gate here). The score is per document (median energy),
+    so stats / on_page are never filled.
+    """
+    images_dir = images_dir_for(forensic_output_dir)
 
     if not os.path.isdir(images_dir):
         return 0.0
@@ -89,7 +98,7 @@ def compute_ela_score(forensic_output_dir: str) -> float:
         diff_gray = diff.mean(axis=2)  # 0..255
 
         # energy: average diff over "active" pixels
-        active = diff_gray > 2.0
+        active = active_mask(diff_gray)
         if active.sum() < 2000:
             energies.append(0.0)
             contrasts.append(0.0)
@@ -1,57 +1,273 @@
 # ------------------------------------------------------------------
 # ANALYZE BUTTON
 # ------------------------------------------------------------------
-if st.button("Analyze Document"):
-    if not uploaded_file:
+# The uploader may hand over one file or a list (accept_multiple_files=True)
+if isinstance(uploaded_file, list):
+    uploaded_files = uploaded_file
+else:
+    uploaded_files = [uploaded_file] if uploaded_file else []
+
+
+def _queue_upload(upload) -> int:
+    """
+    Save one upload, record it in the DB and queue its analysis; returns the job id.
+    A file whose exact content was already analyzed reuses that finished job
+    (FORENSICS_REUSE_RESULTS=0 always queues a new analysis).
+    """
+    import uuid
+
+    from job_queue import find_done_job, submit_job
+    from uploads import save_upload
+    from workspace import create_workspace
+
+    # ----------------------------------------------------------
+    # SAVE FILE INTO THE JOB'S OWN WORKSPACE
+    # ----------------------------------------------------------
+    # The worker analyzes it there; it stays for the downloads below until
+    # it expires (workspace.WORKSPACE_TTL_HOURS, swept by worker.py).
+    # One id per file (not the upload second): same-named files of one bundle
+    # never share a file name, forensics folder or evidence ZIP name
+    file_id = uuid.uuid4().hex[:12]
+    safe_name = f"{file_id}_{os.path.basename(upload.name)}"
+    file_path = os.path.join(create_workspace(f"upload-{file_id}").uploads, safe_name)
+
+    # Chunked copy: size + SHA-256 in the same pass, never the whole file in memory
+    saved = save_upload(upload, file_path)
+
+    # ----------------------------------------------------------
+    # DB: SAVE UPLOAD METADATA
+    # ----------------------------------------------------------
+    record_id = save_upload_metadata(
+        filename=safe_name,
+        filepath=file_path,
+        content_type=upload.type,
+        size_bytes=saved.size
+    )
+
+    # PDF metadata is not parsed here: the worker reads it once with the
+    # document (DocumentContext) and _save_job_metadata stores it
+
+    # ----------------------------------------------------------
+    # SAME CONTENT ALREADY ANALYZED (SHA-256 from the upload copy)
+    # ----------------------------------------------------------
+    if os.getenv("FORENSICS_REUSE_RESULTS", "1") == "1":
+        done = find_done_job(saved.sha256)
+        if done is not None:
+            metadata = (done["result"] or {}).get("pdf_metadata")
+            if metadata is not None:
+                save_pdf_metadata(record_id, metadata)
+            return done["id"]
+
+    # ----------------------------------------------------------
+    # QUEUE ANALYSIS (warm workers pick it up: python worker.py)
+    # ----------------------------------------------------------
+    return submit_job(record_id=record_id, pdf_path=file_path, content_sha256=saved.sha256)
+
+
+def _save_job_metadata(job: dict) -> None:
+    """
+    PDF metadata of a finished job's upload record, as the worker's
+    DocumentContext read it (report["pdf_metadata"]); stored once per job.
+    """
+    from job_queue import claim_metadata
+
+    metadata = (job["result"] or {}).get("pdf_metadata")
+    if metadata is not None and claim_metadata(job["id"]):
+        save_pdf_metadata(job["record_id"], metadata)
+
+
+if st.button("Analyze Document" if len(uploaded_files) <= 1 else f"Analyze {len(uploaded_files)} Documents"):
+    if not uploaded_files:
         st.error("Please upload a valid document first")
     else:
-        with st.spinner("Running forensic analysis... Please wait"):
-
-            # ----------------------------------------------------------
-            # SAVE FILE WITH UNIX TIMESTAMP
-            # ----------------------------------------------------------
-            unix_ts = int(time.time())
-            safe_name = f"{unix_ts}_{uploaded_file.name}"
-            file_path = UPLOAD_DIR / safe_name
-
-            with open(file_path, "wb") as f:
-                f.write(uploaded_file.read())
-
-            # ----------------------------------------------------------
-            # DB: SAVE UPLOAD METADATA
-            # ----------------------------------------------------------
-            record_id = save_upload_metadata(
-                filename=safe_name,
-                filepath=str(file_path),
-                content_type=uploaded_file.type,
-                size_bytes=uploaded_file.size
-            )
+        from job_queue import init_queue
 
-            # ----------------------------------------------------------
-            # PDF METADATA
-            # ----------------------------------------------------------
-            if uploaded_file.type == "application/pdf":
-                metadata = extract_pdf_metadata(str(file_path))
-                save_pdf_metadata(record_id, metadata)
+        init_queue()
+        job_ids = [_queue_upload(upload) for upload in uploaded_files]
 
-            # ----------------------------------------------------------
-            # SOURCECODE PIPELINE (UNCHANGED)
-            # ----------------------------------------------------------
-            subprocess.run(["python", str(DETAILS_SCRIPT)], check=True)
-            subprocess.run(["python", str(FORENSICS_SCRIPT)], check=True)
-
-            # ----------------------------------------------------------
-            # SCORING + ML
-            # ----------------------------------------------------------
-            final_report = run_scoring(
-                record_id=record_id,
-                pdf_path=str(file_path)
-            )
+        st.session_state.analysis_done = False
+        st.session_state.live_events = None
+
+        # Job id(s) in the URL so a browser refresh picks the run back up
+        if len(job_ids) == 1:
+            st.session_state.job_id = job_ids[0]
+            st.session_state.batch_job_ids = None
+            st.query_params.clear()
+            st.query_params["job"] = str(job_ids[0])
+        else:
+            # All documents are queued at once: the worker pool runs them side by side
+            st.session_state.job_id = None
+            st.session_state.batch_job_ids = job_ids
+            st.query_params.clear()
+            st.query_params["jobs"] = ",".join(str(j) for j in job_ids)
+
+        st.rerun()
+
+# ==========================================================
+# BATCH STATUS (MULTI-DOCUMENT UPLOAD)
+# ==========================================================
+batch_job_ids = st.session_state.get("batch_job_ids")
+if not batch_job_ids and st.query_params.get("jobs"):
+    batch_job_ids = [int(j) for j in st.query_params.get("jobs").split(",") if j.strip().isdigit()]
+
+if batch_job_ids:
+    from job_queue import get_jobs
 
-            # -------- STORE RESULT IN SESSION (KEY FIX) --------
-            st.session_state.final_report = final_report
+    jobs = get_jobs(batch_job_ids)
+    pending = [j for j in jobs if j["status"] in ("queued", "running")]
+
+    st.markdown(f"## 📁 Document Bundle ({len(jobs)} documents)")
+
+    if pending:
+        done_count = len(jobs) - len(pending)
+        st.progress(
+            sum(min(max(j["progress"], 0.0), 1.0) for j in jobs) / max(len(jobs), 1),
+            text=f"Analyzing documents in parallel... {done_count} / {len(jobs)} finished"
+        )
+
+    rows = []
+    for j in jobs:
+        # Saved as <file id>_<original name>
+        name = os.path.basename(j["pdf_path"]).split("_", 1)[-1]
+        row = {"Job": j["id"], "Document": name, "Status": j["status"]}
+
+        result = j["result"] or {}
+        if result:
+            _save_job_metadata(j)
+            forensics = result["components"]["forensics"]
+            row.update({
+                "Final Score": result["final_result"]["final_score"],
+                "Risk": result["final_result"]["risk_category"],
+                "Forensic Risk": forensics["forensic_risk"],
+                "ML Probability": result["components"]["ml"]["ml_probability"],
+                "ELA": forensics["ela_score"],
+                "Compression": forensics["compression_score"],
+                "Noise": forensics["noise_score"],
+                "Font": forensics["font_score"],
+                "Metadata": forensics["metadata_score"],
+            })
+        elif j["status"] == "failed":
+            row["Risk"] = f"Failed: {j['error']}"
+        else:
+            row["Risk"] = f"{j['stage'] or 'queued'} ({j['progress']:.0%})"
+        rows.append(row)
+
+    # ------------------------------
+    # AGGREGATE RISK (the bundle is as risky as its riskiest document)
+    # ------------------------------
+    finished = [r for r in rows if "Final Score" in r]
+    if finished:
+        worst = max(finished, key=lambda r: r["Final Score"])
+        flagged = [r for r in finished if r["Risk"] != "Clean Document"]
+
+        a1, a2, a3 = st.columns(3)
+        a1.metric("Bundle Risk (max)", f"{worst['Final Score']} / 100", worst["Risk"], delta_color="off")
+        a2.metric("Mean Final Score", f"{sum(r['Final Score'] for r in finished) / len(finished):.1f}")
+        a3.metric("Flagged Documents", f"{len(flagged)} / {len(finished)}")
+
+    # Click a column header to sort
+    st.dataframe(
+        sorted(rows, key=lambda r: r.get("Final Score", -1), reverse=True),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    # ------------------------------
+    # DRILL DOWN INTO ONE DOCUMENT
+    # ------------------------------
+    if finished:
+        labels = {f"{r['Document']} (job {r['Job']})": r["Job"] for r in finished}
+        choice = st.selectbox("Open detailed report", ["—"] + list(labels))
+        if choice != "—":
+            picked = next(j for j in jobs if j["id"] == labels[choice])
+            st.session_state.final_report = picked["result"]
             st.session_state.analysis_done = True
+        else:
+            st.session_state.analysis_done = False
+
+    if pending:
+        time.sleep(1.0)
+        st.rerun()
+
+# ==========================================================
+# JOB STATUS (POLLED, REFRESH SAFE)
+# ==========================================================
+job_id = st.session_state.get("job_id") or st.query_params.get("job")
+
+if job_id and not batch_job_ids and not st.session_state.analysis_done:
+    from job_queue import get_job
+
+    job = get_job(int(job_id))
+
+    if job is None:
+        st.error("Analysis job not found")
+
+    elif job["status"] in ("queued", "running"):
+        from job_queue import get_events
+
+        stage = job["stage"] or "waiting for a worker"
+        st.progress(
+            min(max(job["progress"], 0.0), 1.0),
+            text=f"Running forensic analysis... ({stage})"
+        )
+
+        # -------- LIVE RESULTS (only new events are read each poll) --------
+        live = st.session_state.get("live_events")
+        if live is None or live["job_id"] != int(job_id):
+            live = {"job_id": int(job_id), "last_id": 0, "scores": {}, "pages": {}, "provisional": None, "rendered": None}
+
+        for event in get_events(int(job_id), after_id=live["last_id"]):
+            live["last_id"] = event["id"]
+            payload = event["payload"]
+
+            if event["kind"] == "score":
+                live["scores"][payload["scorer"]] = payload["score"]
+            elif event["kind"] == "page_score":
+                live["pages"][payload["page"]] = payload["score"]
+            elif event["kind"] == "provisional":
+                live["provisional"] = payload
+            elif event["kind"] == "pages_rendered":
+                live["rendered"] = payload
+
+        st.session_state.live_events = live
+
+        if live["rendered"]:
+            st.caption(f"Pages rendered: {live['rendered']['done']} / {live['rendered']['total']}")
+
+        provisional = live["provisional"]
+        if provisional:
+            if provisional["verdict_lower"] == provisional["verdict_upper"]:
+                verdict_text = provisional["verdict_lower"]
+            else:
+                verdict_text = f"{provisional['verdict_lower']} … {provisional['verdict_upper']}"
+
+            st.markdown(f"### Provisional verdict: {verdict_text}")
+            st.caption(
+                f"Forensic risk between {provisional['risk_lower']:.3f} and "
+                f"{provisional['risk_upper']:.3f} – narrows as more pages and scorers finish"
+            )
+
+        if live["scores"]:
+            cols = st.columns(len(live["scores"]))
+            for col, (name, value) in zip(cols, sorted(live["scores"].items())):
+                col.metric(name.title(), f"{value:.3f}")
+
+        if live["pages"]:
+            st.caption("ELA score per page (so far)")
+            st.bar_chart({"ELA": [live["pages"][k] for k in sorted(live["pages"])]})
+
+        time.sleep(1.0)
+        st.rerun()
 
+    elif job["status"] == "failed":
+        st.error(f"Analysis failed: {job['error']}")
+
+    else:
+        # -------- STORE RESULT IN SESSION (KEY FIX) --------
+        _save_job_metadata(job)
+        st.session_state.job_id = int(job_id)
+        st.session_state.final_report = job["result"]
+        st.session_state.analysis_done = True
         st.success("Analysis completed successfully!")
 
 # ==========================================================
@@ -252,8 +468,20 @@ if st.session_state.analysis_done:
                     file_name=os.path.basename(report_path),
                     mime="application/json"
                 )
+    else:
+        # Workspace already expired: the job row still has the report
+        import json
+
+        with c1:
+            st.download_button(
+                label="⬇ Download Risk Report (JSON)",
+                data=json.dumps(final_report, indent=4),
+                file_name=f"{final_report.get('record_id')}_final_report.json",
+                mime="application/json"
+            )
 
-    # ---- Download Forensics ZIP (MEMORY SAFE)
+    # ---- Download Forensics ZIP (DISK CACHED, STREAMED FROM FILE)
+    # Until the workspace expires (workspace.WORKSPACE_TTL_HOURS)
     forensics_dir = os.path.abspath(
         os.path.join(
             os.path.dirname(report_path),
@@ -261,27 +489,33 @@ if st.session_state.analysis_done:
             "Forensics_Output",
             final_report["forensics_folder"]
         )
-    )
+    ) if report_path else None
+
+    if forensics_dir and os.path.exists(forensics_dir):
+        from evidence import ensure_evidence
+        from evidence_zip import build_evidence_zip, evidence_zip_path
+
+        zip_path = evidence_zip_path(forensics_dir)
 
-    if st.session_state.forensics_zip is None and os.path.exists(forensics_dir):
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
-            for root, _, files in os.walk(forensics_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, forensics_dir)
-                    zipf.write(file_path, arcname)
-        zip_buffer.seek(0)
-        st.session_state.forensics_zip = zip_buffer
-
-    if st.session_state.forensics_zip:
         with c2:
-            st.download_button(
-                label="⬇ Download Forensics Evidence (ZIP)",
-                data=st.session_state.forensics_zip,
-                file_name=f"{final_report['forensics_folder']}.zip",
-                mime="application/zip"
-            )
+            if not os.path.exists(zip_path):
+                # Evidence images are only rendered the first time somebody asks for them
+                if st.button("Prepare Forensics Evidence (ZIP)"):
+                    with st.spinner("Rendering evidence images..."):
+                        ensure_evidence(forensics_dir)
+                        build_evidence_zip(forensics_dir)
+                    st.rerun()
+            else:
+                # Built once per document (per workspace) and shared by every session
+                zip_path = build_evidence_zip(forensics_dir)
+
+                with open(zip_path, "rb") as f:
+                    st.download_button(
+                        label="⬇ Download Forensics Evidence (ZIP)",
+                        data=f,
+                        file_name=f"{final_report['forensics_folder']}.zip",
+                        mime="application/zip"
+                    )
 
 # ------------------------------------------------------------------
 # FOOTER (✅ FIXED: visible + pinned)
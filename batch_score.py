@@ -0,0 +1,233 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Set
+
+from workspace import WORKSPACE_ROOT, create_workspace, remove_workspace
+
+
+# =====================================================
+# INPUTS
+# =====================================================
+def collect_pdfs(paths: Iterable[str], file_list: Optional[str] = None) -> List[str]:
+    """
+    PDFs from directories (recursive), single files and an optional list file
+    (one path per line). Absolute paths, duplicates removed, stable order.
+    """
+    found = []
+
+    def add(path):
+        path = os.path.abspath(path)
+        if path.lower().endswith(".pdf") and os.path.isfile(path):
+            found.append(path)
+
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    add(os.path.join(root, name))
+        else:
+            add(path)
+
+    if file_list:
+        with open(file_list, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    add(line.strip())
+
+    return list(dict.fromkeys(found))
+
+
+def trim_partial_line(output_path: str) -> int:
+    """
+    Cut a last line the crash left without its newline, so the next append
+    starts on a line of its own. Returns the number of bytes removed.
+    """
+    if not os.path.exists(output_path):
+        return 0
+
+    with open(output_path, "r+b") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            step = min(64 * 1024, pos)
+            f.seek(pos - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                pos = pos - step + newline + 1
+                break
+            pos -= step
+
+        if pos < end:
+            f.truncate(pos)
+        return end - pos
+
+
+def completed_sources(output_path: str) -> Set[str]:
+    """
+    PDFs that already have a successful line in the output (resume after a crash).
+
+    A line cut short by the crash does not parse and is ignored, so that
+    document simply runs again. Failed documents are retried as well.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            if "error" not in row and row.get("source_pdf"):
+                done.add(row["source_pdf"])
+    return done
+
+
+# =====================================================
+# ONE DOCUMENT (runs in a worker process)
+# =====================================================
+def _preload() -> None:
+    # Same warm-up as the queue workers: heavy imports once per process
+    from worker import _preload as preload
+    preload()
+
+
+def score_document(pdf_path: str, workspace_root: str = WORKSPACE_ROOT, keep_workspace: bool = False) -> dict:
+    """
+    Full pipeline for one PDF in its own workspace; returns the report line.
+    """
+    from pipeline import analyze_document
+
+    key = hashlib.sha1(pdf_path.encode("utf-8")).hexdigest()[:16]
+    ws = create_workspace(f"batch-{key}", base=workspace_root)
+
+    stage_seconds: Dict[str, float] = {}
+    current = {"stage": None, "since": time.perf_counter()}
+
+    def progress(stage: str, _fraction: float) -> None:
+        now = time.perf_counter()
+        if current["stage"] is not None:
+            stage_seconds[current["stage"]] = stage_seconds.get(current["stage"], 0.0) + now - current["since"]
+        current["stage"], current["since"] = stage, now
+
+    started = time.perf_counter()
+    try:
+        report = analyze_document(record_id=None, pdf_path=pdf_path, progress=progress, workspace=ws)
+    finally:
+        if not keep_workspace:
+            remove_workspace(ws)
+
+    stage_seconds.pop("done", None)
+    if not keep_workspace:
+        report.pop("report_path", None)
+
+    report["source_pdf"] = pdf_path
+    report["pipeline"]["stage_seconds"] = {k: round(v, 3) for k, v in stage_seconds.items()}
+    report["pipeline"]["total_seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+# =====================================================
+# SUMMARY
+# =====================================================
+def _print_summary(processed: int, failed: int, skipped: int, wall: float, stage_totals, node_totals) -> None:
+    print("\n==== BATCH SUMMARY ====")
+    print(f"Processed      : {processed}")
+    print(f"Failed         : {failed}")
+    print(f"Resumed (skip) : {skipped}")
+    print(f"Wall time      : {wall:.1f}s")
+    if wall > 0 and processed:
+        print(f"Throughput     : {processed / wall * 60:.1f} docs/min")
+
+    ok = processed - failed
+    for title, totals in (("Stage time", stage_totals), ("Scoring node time", node_totals)):
+        if not totals or not ok:
+            continue
+        print(f"\n{title} (total / mean per doc):")
+        for name, seconds in sorted(totals.items(), key=lambda kv: -kv[1]):
+            print(f"  {name:<18} {seconds:9.1f}s  {seconds / ok:7.2f}s")
+
+
+# =====================================================
+# MAIN
+# =====================================================
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Score a batch of PDFs, one JSON line per document")
+    parser.add_argument("inputs", nargs="*", help="PDF files and/or directories (searched recursively)")
+    parser.add_argument("--list", dest="file_list", help="text file with one PDF path per line")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="JSONL output (appended)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--workspace-root", default=WORKSPACE_ROOT)
+    parser.add_argument("--keep-workspaces", action="store_true", help="keep rendered pages / evidence per document")
+    args = parser.parse_args()
+
+    pdfs = collect_pdfs(args.inputs, args.file_list)
+    if trim_partial_line(args.output):
+        print("Dropped an incomplete last line from the previous run")
+    done = completed_sources(args.output)
+    todo = [p for p in pdfs if p not in done]
+    skipped = len(pdfs) - len(todo)
+
+    print(f"{len(pdfs)} PDF(s), {skipped} already done, {len(todo)} to process with {args.workers} worker(s)")
+
+    processed = failed = 0
+    stage_totals = defaultdict(float)
+    node_totals = defaultdict(float)
+    started = time.perf_counter()
+
+    pool = ProcessPoolExecutor(max_workers=args.workers, initializer=_preload)
+
+    try:
+        with open(args.output, "a", encoding="utf-8") as out:
+            futures = {
+                pool.submit(score_document, pdf, args.workspace_root, args.keep_workspaces): pdf
+                for pdf in todo
+            }
+
+            for future in as_completed(futures):
+                pdf = futures[future]
+                processed += 1
+
+                try:
+                    row = future.result()
+                    for name, seconds in row["pipeline"].get("stage_seconds", {}).items():
+                        stage_totals[name] += seconds
+                    for name, seconds in row["pipeline"].get("node_seconds", {}).items():
+                        node_totals[name] += seconds
+                    status = row["final_result"]["risk_category"]
+
+                except Exception as e:
+                    failed += 1
+                    row = {"source_pdf": pdf, "error": f"{type(e).__name__}: {e}"}
+                    status = f"FAILED ({row['error']})"
+                    if os.getenv("DEBUG_FORENSICS") == "1":
+                        traceback.print_exc()
+
+                # One complete line per document, on disk before the next one: this is the resume point
+                out.write(json.dumps(row) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+
+                print(f"[{processed}/{len(todo)}] {os.path.basename(pdf)}: {status}")
+
+    except KeyboardInterrupt:
+        print("\nInterrupted – rerun the same command to resume")
+
+    finally:
+        # Queued documents are dropped, running ones finish (their lines are lost; they rerun on resume)
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    _print_summary(processed, failed, skipped, time.perf_counter() - started, stage_totals, node_totals)
+
+
+if __name__ == "__main__":
+    main()
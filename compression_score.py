@@ -1,7 +1,7 @@
-import os
-from PIL import Image
 import numpy as np
 
+from evidence import iter_sparse_evidence
+
 
 def compute_compression_score(forensic_output_dir: str) -> float:
     """
@@ -13,22 +13,15 @@ def compute_compression_score(forensic_output_dir: str) -> float:
     - Manipulated / recompressed regions → spikes preserved
     """
 
-    comp_dir = os.path.join(forensic_output_dir, "Compression")
-    if not os.path.exists(comp_dir):
-        return 0.0
-
     p90_values = []
 
-    for img in os.listdir(comp_dir):
-        if not img.lower().endswith(".jpg"):
-            continue
-
+    for _, sparse in iter_sparse_evidence(forensic_output_dir, "Compression"):
         try:
-            image = Image.open(os.path.join(comp_dir, img)).convert("RGB")
-            arr = np.array(image, dtype=np.float32)
+            # Non-zero pixels only: a zero pixel has zero channel spread
+            arr = sparse.values.astype(np.float32)
 
             # Per-pixel std across channels
-            std_map = arr.std(axis=2)
+            std_map = arr.std(axis=1)
 
             # Remove background noise
             std_map = std_map[std_map > 1.5]
@@ -1,26 +1,26 @@
 import os
+from typing import Optional
 from PIL import Image
 import numpy as np
 
+from evidence import count_pages, iter_evidence
+from page_scan import MaxPageScan
 
-def compute_compression_score(forensic_output_dir: str) -> float:
-    comp_dir = os.path.join(forensic_output_dir, "Compression")
-    if not os.path.exists(comp_dir):
-        return 0.0
 
+def compute_compression_score(
+    forensic_output_dir: str,
+    stats: Optional[dict] = None
+) -> float:
     debug = os.getenv("DEBUG_FORENSICS", "0") == "1"
 
-    page_scores = []
-
-    for img_name in os.listdir(comp_dir):
-        if not img_name.lower().endswith(".jpg"):
-            continue
-
-        img_path = os.path.join(comp_dir, img_name)
+    scan = MaxPageScan(
+        iter_evidence(forensic_output_dir, "Compression"),
+        total=count_pages(forensic_output_dir)
+    )
 
+    for img_name, evidence in scan:
         try:
-            with Image.open(img_path).convert("L") as im:
-                arr = np.asarray(im, dtype=np.float32) / 255.0
+            arr = np.asarray(evidence.convert("L"), dtype=np.float32) / 255.0
         except Exception:
             continue
 
@@ -49,14 +49,18 @@ def compute_compression_score(forensic_output_dir: str) -> float:
         score = (raw - LO) / (HI - LO)
         score = float(np.clip(score, 0.0, 1.0))
 
-        page_scores.append(score)
+        scan.add(score)
 
         if debug:
             print(f"[COMP] {img_name} q50={q50:.3f} q95={q95:.3f} q99={q99:.3f} thr={thr:.3f} strong={strong_ratio:.4f} raw={raw:.4f} score={score:.3f}")
 
-    if not page_scores:
+    scan.report(stats)
+    if debug and scan.stopped_early:
+        print(f"[SCAN] page max saturated, skipped {scan.pages_skipped} page(s)")
+
+    if not scan.page_scores:
         return 0.0
 
     # Document score: max catches a single tampered page
-    doc_score = float(np.max(page_scores))
+    doc_score = scan.value
     return float(round(doc_score, 3))
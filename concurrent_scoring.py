@@ -0,0 +1,112 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# name -> (module-level function, args, kwargs)
+# Module-level functions keep the tasks picklable for the process pool.
+ScorerTask = Tuple[Callable[..., float], tuple, dict]
+
+SCORER_TIMEOUT = float(os.getenv("FORENSICS_SCORER_TIMEOUT", "300"))
+
+
+def _invoke(fn: Callable[..., float], args: tuple, kwargs: dict) -> Tuple[float, Optional[dict]]:
+    """
+    Runs one scorer; returns (score, stats) so a `stats` dict filled in a
+    worker process makes it back to the caller.
+    """
+    value = fn(*args, **kwargs)
+    return float(value), kwargs.get("stats")
+
+
+def run_scorers_concurrently(
+    tasks: Dict[str, ScorerTask],
+    defaults: Dict[str, float],
+    mode: str = "thread",
+    timeout: float = SCORER_TIMEOUT,
+    max_workers: Optional[int] = None,
+    on_result: Optional[Callable[[str, float], None]] = None,
+) -> Tuple[Dict[str, float], Dict[str, str], Dict[str, Any]]:
+    """
+    Run independent scorers in parallel.
+
+    mode:
+    - "thread"  (default) scorers mostly sit in numpy / cv2 / PIL code that releases the GIL
+    - "process" full isolation, for scorers that hold the GIL
+
+    Returns (scores, failures, stats):
+    - a scorer that raises or exceeds `timeout` seconds gets its default score
+      and an entry in `failures` ("timeout" or "error: ...")
+    - a timed-out scorer cannot be killed mid-call; its result is just ignored
+
+    on_result(name, score) is called in completion order (defaults included),
+    so callers can publish each score as soon as it lands.
+    """
+    if not tasks:
+        return {}, {}, {}
+
+    pool_cls = ProcessPoolExecutor if mode == "process" else ThreadPoolExecutor
+    pool = pool_cls(max_workers=max_workers or len(tasks))
+
+    scores: Dict[str, float] = {}
+    failures: Dict[str, str] = {}
+    stats: Dict[str, Any] = {}
+
+    try:
+        futures = {
+            pool.submit(_invoke, fn, args, kwargs): name
+            for name, (fn, args, kwargs) in tasks.items()
+        }
+
+        def record(name: str, value: float) -> None:
+            scores[name] = value
+            if on_result is not None:
+                on_result(name, value)
+
+        try:
+            # Every scorer gets `timeout` seconds from the common start
+            for future in as_completed(futures, timeout=timeout):
+                name = futures[future]
+                try:
+                    value, task_stats = future.result()
+                except Exception as e:
+                    value, task_stats = defaults.get(name, 0.0), None
+                    failures[name] = f"error: {e}"
+
+                if task_stats is not None:
+                    stats[name] = task_stats
+                record(name, value)
+
+        except FutureTimeout:
+            for future, name in futures.items():
+                if name not in scores:
+                    future.cancel()
+                    failures[name] = "timeout"
+                    record(name, defaults.get(name, 0.0))
+
+    finally:
+        # Do not block the report on a scorer that already timed out
+        pool.shutdown(wait=not failures, cancel_futures=True)
+
+    return scores, failures, stats
+
+
+def run_guarded(
+    name: str,
+    task: ScorerTask,
+    default: Optional[float],
+    timeout: float = SCORER_TIMEOUT,
+    failures: Optional[Dict[str, str]] = None
+) -> Optional[float]:
+    """
+    One scorer with the same timeout / default-on-error as
+    run_scorers_concurrently, for work needed outside the batch
+    (the compression gate every raster scorer waits on, metadata).
+
+    Failures are merged into `failures` when given.
+    """
+    scores, failed, _ = run_scorers_concurrently({name: task}, {name: default}, timeout=timeout)
+    if failures is not None:
+        failures.update(failed)
+    return scores[name]
@@ -1,13 +1,27 @@
-import os
+from typing import Callable, Optional
+
 import numpy as np
-from PIL import Image
 import cv2
 
+from evidence import count_pages, images_dir_for, iter_evidence
+from page_content import WATERMARK_V, crop_to_content, watermark_mask
+from page_scan import MaxPageScan
+from render_manifest import area_scale
+
 # Adjust import path if needed
 from compression_score import compute_compression_score
 
+# (compression below, ELA weight): read by pipeline_stages.declare_gate so
+# staged scoring bounds ELA with the same thresholds
+COMPRESSION_GATE = ((0.03, 0.0), (0.07, 0.5))
+
 
-def compute_ela_score(forensic_output_dir: str) -> float:
+def compute_ela_score(
+    forensic_output_dir: str,
+    compression_score: Optional[float] = None,
+    stats: Optional[dict] = None,
+    on_page: Optional[Callable[[int, float], None]] = None
+) -> float:
     """
     ELA-based manipulation score (0.0 – 1.0)
 
@@ -17,62 +31,73 @@ def compute_ela_score(forensic_output_dir: str) -> float:
     - > 0.07              → ELA fully active
 
     Core ELA logic remains unchanged.
+
+    Pass `compression_score` when the caller already computed it
+    (pipeline DAG) so the compression scan is not run a second time.
+    on_page(page_number, weighted page score) reports pages as they finish.
     """
 
     # =====================================================
     # COMPRESSION GATE
     # =====================================================
-    compression_score = compute_compression_score(forensic_output_dir)
+    if compression_score is None:
+        compression_score = compute_compression_score(forensic_output_dir)
 
-    if compression_score < 0.03:
-        return 0.0
+    # Below 0.03 off, 0.03-0.07 conservative influence, above full confidence
+    ela_weight = 1.0
+    for below, weight in COMPRESSION_GATE:
+        if compression_score < below:
+            ela_weight = weight
+            break
 
-    # Down-weight factor for gray zone
-    if compression_score < 0.07:
-        ela_weight = 0.5   # conservative influence
-    else:
-        ela_weight = 1.0   # full confidence
+    if ela_weight <= 0.0:
+        return 0.0
 
     # =====================================================
     # ELA PROCESSING
     # =====================================================
-    ela_dir = os.path.join(forensic_output_dir, "ELA")
-    if not os.path.exists(ela_dir):
-        return 0.0
-
-    page_scores = []
-
-    for fname in os.listdir(ela_dir):
-        if not fname.lower().endswith(".jpg"):
-            continue
-
-        path = os.path.join(ela_dir, fname)
-
-        img_rgb = cv2.imread(path)
-        if img_rgb is None:
-            continue
-
-        # ===============================
-        # STEP 1: Convert to grayscale
-        # ===============================
-        gray = cv2.cvtColor(img_rgb, cv2.COLOR_BGR2GRAY).astype(np.float32) / 255.0
-
-        # ===============================
-        # STEP 2: Watermark / overlay masking
-        # ===============================
-        hsv = cv2.cvtColor(img_rgb, cv2.COLOR_BGR2HSV)
-        _, s, v = cv2.split(hsv)
-
-        watermark_mask = (v > 200) & (s < 40)
-
-        valid_mask = (~watermark_mask) & (gray > 0.02)
+    scan = MaxPageScan(
+        iter_evidence(forensic_output_dir, "ELA"),
+        total=count_pages(forensic_output_dir),
+        on_page=(lambda n, s: on_page(n, s * ela_weight)) if on_page is not None else None
+    )
+
+    images_dir = images_dir_for(forensic_output_dir)
+
+    for name, evidence in scan:
+        # Content box only: the map is zero outside it
+        page = crop_to_content(evidence)
+
+        if page.mode == "L":
+            # Single-channel map (monochrome page): already gray, saturation is 0
+            gray_u8 = np.asarray(page)
+            gray = gray_u8.astype(np.float32) / 255.0
+            watermark = gray_u8 > WATERMARK_V
+        else:
+            rgb = np.asarray(page.convert("RGB"))
+
+            # Same BGR layout cv2.imread would give
+            img_rgb = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+            # ===============================
+            # STEP 1: Convert to grayscale
+            # ===============================
+            gray = cv2.cvtColor(img_rgb, cv2.COLOR_BGR2GRAY).astype(np.float32) / 255.0
+
+            # ===============================
+            # STEP 2: Watermark / overlay masking
+            # ===============================
+            watermark = watermark_mask(rgb)
+
+        valid_mask = (~watermark) & (gray > 0.02)
         valid_pixels = gray[valid_mask]
 
         # ===============================
         # STEP 3: Low-content guard
         # ===============================
-        if valid_pixels.size < 500:
-            page_scores.append(0.0)
+        # Pixel counts are calibrated at the reference render zoom
+        if valid_pixels.size < 500 * area_scale(images_dir, name):
+            scan.add(0.0)
             continue
 
         # ===============================
@@ -83,7 +108,7 @@ def compute_ela_score(forensic_output_dir: str) -> float:
 
         # Very low ELA intensity → clean
         if mean_ela < 0.03:
-            page_scores.append(0.0)
+            scan.add(0.0)
             continue
 
         # ===============================
@@ -93,14 +118,16 @@ def compute_ela_score(forensic_output_dir: str) -> float:
 
         score = min(1.0, raw_score * 4.0)
 
-        page_scores.append(score)
+        scan.add(score)
+
+    scan.report(stats)
 
-    if not page_scores:
+    if not scan.page_scores:
         return 0.0
 
     # =====================================================
     # FINAL ELA SCORE (with compression weighting)
     # =====================================================
-    final_ela_score = max(page_scores) * ela_weight
+    final_ela_score = scan.value * ela_weight
 
     return float(round(final_ela_score, 3))
@@ -1,57 +1,146 @@
 import fitz
 import os
 
+from pipeline_stages import plan_stages
+from render_manifest import REFERENCE_ZOOM, write_manifest
+
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 
 pdf_folder = os.path.join(project_root, "uploads")
 images_folder = os.path.join(project_root, "Images")
 
-if not os.path.exists(pdf_folder):
-    print("error pdf folder not exists")
-
-os.makedirs(images_folder, exist_ok=True)
-
 # Higher render resolution helps forensic signals a lot
-ZOOM = 2.0  # 2.0 = 2x in each dimension (sharp text)
+ZOOM = REFERENCE_ZOOM  # 2.0 = 2x in each dimension (sharp text)
 JPG_QUALITY = 95
 
-for pdf_file in os.listdir(pdf_folder):
-    if not pdf_file.lower().endswith(".pdf"):
-        continue
-
-    pdf_path = os.path.join(pdf_folder, pdf_file)
-    pdf_name = os.path.splitext(pdf_file)[0]
-    output_folder = os.path.join(images_folder, pdf_name)
-
+# ---- adaptive zoom (per page) ----
+# Opt-in (FORENSICS_ADAPTIVE_ZOOM=1): only pixel-count guards are rescaled
+# (render_manifest.area_scale); intensity thresholds (ELA bands, compression
+# bands, noise variance / window sizes) and the ML model are calibrated at
+# REFERENCE_ZOOM, so by default every page renders at ZOOM
+ADAPTIVE_ZOOM = os.getenv("FORENSICS_ADAPTIVE_ZOOM", "0") == "1"
+MIN_ZOOM = 1.5
+MAX_ZOOM = REFERENCE_ZOOM     # small text never pushes a page past the calibrated zoom
+MAX_PAGE_PIXELS = 4_000_000   # A3 / long receipts are scaled down to this budget
+MIN_TEXT_PX = 16              # small text (10th percentile size) gets at least this many pixels
+SPARSE_CHARS = 150            # less text than this and no images: a sparse page
+
+
+def choose_zoom(page) -> float:
+    """
+    Render zoom for one fitz page.
+
+    - small text in the text layer raises the zoom (never above MAX_ZOOM = REFERENCE_ZOOM)
+    - sparse pages (little text, no images) drop to MIN_ZOOM
+    - the page never exceeds MAX_PAGE_PIXELS, whatever its size
+    """
+    if not ADAPTIVE_ZOOM:
+        return ZOOM
+
+    sizes = []
+    chars = 0
+    for block in page.get_text("dict")["blocks"]:
+        if block.get("type") != 0:
+            continue
+        for line in block["lines"]:
+            for span in line["spans"]:
+                text = span["text"].strip()
+                if text:
+                    chars += len(text)
+                    sizes.append(span["size"])
+
+    zoom = ZOOM
+    if chars < SPARSE_CHARS and not page.get_images():
+        zoom = MIN_ZOOM
+
+    if sizes:
+        sizes.sort()
+        small = max(sizes[len(sizes) // 10], 1.0)
+        zoom = max(zoom, min(MAX_ZOOM, MIN_TEXT_PX / small))
+
+    area = max(page.rect.width * page.rect.height, 1.0)
+    zoom = min(zoom, (MAX_PAGE_PIXELS / area) ** 0.5)
+    return round(zoom, 2)
+
+
+def render_pdf(pdf_path: str, output_folder: str, progress=None, context=None) -> int:
+    """
+    Render every page of one PDF to <output_folder>/page-N.jpg.
+
+    Returns the number of pages rendered.
+    The zoom is chosen per page (choose_zoom) and recorded in
+    <output_folder>/render_manifest.json for the scorers and the report.
+    progress(done, total) is called after each page (optional).
+    context: an open doc_context.DocumentContext to render from instead of
+    parsing the file again (the caller keeps ownership of it).
+    """
     os.makedirs(output_folder, exist_ok=True)
-
-    print(f"Converting: {pdf_file}")
     doc = None
 
     try:
-        doc = fitz.open(pdf_path)
-        matrix = fitz.Matrix(ZOOM, ZOOM)
+        doc = context.doc if context is not None else fitz.open(pdf_path)
+        manifest = {}
 
         for page_number in range(doc.page_count):
             page = doc.load_page(page_number)
 
-            pix = page.get_pixmap(matrix=matrix, alpha=False)
+            zoom = choose_zoom(page)
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
             image_name = f"page-{page_number + 1}.jpg"
             image_path = os.path.join(output_folder, image_name)
 
             # Save as high-quality JPEG
             pix.save(image_path, jpg_quality=JPG_QUALITY)
+            manifest[image_name] = {
+                "zoom": zoom,
+                "dpi": round(72 * zoom),
+                "width": pix.width,
+                "height": pix.height,
+            }
 
-        print(f"Converted {doc.page_count} Pages Successfully")
+            if progress is not None:
+                progress(page_number + 1, doc.page_count)
 
-    except Exception as e:
-        print(f"Error converting {pdf_file}: {str(e)}")
+        write_manifest(output_folder, manifest)
+        return doc.page_count
 
     finally:
-        if doc is not None and not doc.is_closed:
+        if context is None and doc is not None and not doc.is_closed:
             doc.close()
 
-    print(f"Done: images saved in {output_folder}")
 
-print("PDF Pages converted to images successfully!")
+def main() -> None:
+    if not os.path.exists(pdf_folder):
+        print("error pdf folder not exists")
+
+    if "Images" not in plan_stages()[0]:
+        print("Page rendering pruned: no active scorer reads page images")
+        return
+
+    os.makedirs(images_folder, exist_ok=True)
+
+    for pdf_file in os.listdir(pdf_folder):
+        if not pdf_file.lower().endswith(".pdf"):
+            continue
+
+        pdf_path = os.path.join(pdf_folder, pdf_file)
+        pdf_name = os.path.splitext(pdf_file)[0]
+        output_folder = os.path.join(images_folder, pdf_name)
+
+        print(f"Converting: {pdf_file}")
+
+        try:
+            page_count = render_pdf(pdf_path, output_folder)
+            print(f"Converted {page_count} Pages Successfully")
+
+        except Exception as e:
+            print(f"Error converting {pdf_file}: {str(e)}")
+
+        print(f"Done: images saved in {output_folder}")
+
+    print("PDF Pages converted to images successfully!")
+
+
+if __name__ == "__main__":
+    main()
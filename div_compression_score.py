@@ -400,83 +400,96 @@
 #     return float(round(max(page_scores), 3)), all_location_scores
 
 
-import os
+from typing import Optional
+
 import numpy as np
-from PIL import Image
-import cv2
 import math
 
+from evidence import count_pages, images_dir_for, iter_sparse_evidence
+from page_content import active_mask
+from page_scan import MaxPageScan
+from render_manifest import length_scale
+from sparse_maps import components
+
+# Compression residuals (normalized 0..1) carry signal above this level
+COMPRESSION_ACTIVE_LEVEL = 0.02
+
 
-def compute_compression_score(forensic_output_dir: str):
+def compute_compression_score(
+    forensic_output_dir: str,
+    stats: Optional[dict] = None,
+    all_locations: bool = False
+):
     """
     Computes compression score based on manipulation LOCATIONS.
 
     Returns:
         final_score (float): 0.0 – 1.0
         location_scores (list[float]): per-location severity scores
-    """
 
-    comp_dir = os.path.join(forensic_output_dir, "Compression")
-    if not os.path.exists(comp_dir):
-        return 0.0, []
+    The page scan stops once a page scores 1.0, so location_scores only
+    covers the pages scanned up to there (stats["pages_skipped"] says how
+    many were left out). all_locations=True scans every page.
+    """
 
-    page_scores = []
+    scan = MaxPageScan(
+        iter_sparse_evidence(forensic_output_dir, "Compression"),
+        cap=float("inf") if all_locations else 1.0,
+        total=count_pages(forensic_output_dir)
+    )
     all_location_scores = []
 
-    for fname in os.listdir(comp_dir):
-        if not fname.lower().endswith(".jpg"):
-            continue
+    # Maps arrive as their non-zero pixels only (sparse_maps.SparseMap):
+    # every step below scales with active pixels, not page area
+    images_dir = images_dir_for(forensic_output_dir)
 
-        img_path = os.path.join(comp_dir, fname)
+    for name, sparse in scan:
 
         # ---------- Load image ----------
         try:
-            gray = np.array(
-                Image.open(img_path).convert("L"),
-                dtype=np.float32
-            )
+            gray = sparse.gray().astype(np.float32)
         except Exception:
             continue
 
         # Normalize
         gray = gray / 255.0
-        h, w = gray.shape
-        total_pixels = float(h * w)
+        total_pixels = float(sparse.page_pixels)
+
+        # Pixel thresholds below are calibrated at the reference render zoom
+        scale = length_scale(images_dir, name)
+        area_k = scale * scale
 
         # ---------- STEP 1: Active residual pixels ----------
-        active_mask = gray > 0.02
-        if np.sum(active_mask) < 40:
+        active = active_mask(gray, COMPRESSION_ACTIVE_LEVEL)
+        if np.sum(active) < 40 * area_k:
             continue
 
         # ---------- STEP 2: High residual pixels ----------
-        high_thresh = np.percentile(gray[active_mask], 95)
+        high_thresh = np.percentile(gray[active], 95)
         high_mask = gray >= high_thresh
 
-        if np.sum(high_mask) < 25:
+        if np.sum(high_mask) < 25 * area_k:
             continue
 
         # ---------- STEP 3: Connected components ----------
-        mask_uint8 = (high_mask.astype(np.uint8)) * 255
-        num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(
-            mask_uint8, connectivity=8
-        )
+        high = sparse.select(high_mask)
+        comps = components(high)
+        region_energy = np.bincount(comps.labels, weights=gray[high_mask], minlength=comps.count)
 
         location_scores = []
 
-        for i in range(1, num_labels):
-            area = int(stats[i, cv2.CC_STAT_AREA])
-            x, y, bw, bh, _ = stats[i]
+        for i in range(comps.count):
+            area = int(comps.area[i])
+            bw, bh = int(comps.width[i]), int(comps.height[i])
 
             # ---- Practical filters (NOT aggressive) ----
-            if area < 60:
+            if area < 60 * area_k:
                 continue
-            if bw < 8 or bh < 8:
+            if bw < 8 * scale or bh < 8 * scale:
                 continue
 
-            region_mask = (labels == i)
-
             # ---------- Per-location features ----------
-            energy = float(np.mean(gray[region_mask]))
+            energy = float(region_energy[i] / area)
             area_ratio = float(area / total_pixels)
 
             # ---------- Per-location score ----------
@@ -489,7 +502,7 @@ def compute_compression_score(forensic_output_dir: str):
 
         # ---------- HARD GATE ----------
         if len(location_scores) == 0:
-            page_scores.append(0.0)
+            scan.add(0.0)
             continue
 
         # ---------- AGGREGATION ----------
@@ -499,13 +512,15 @@ def compute_compression_score(forensic_output_dir: str):
         boost = float(1.0 + 0.6 * math.log1p(loc_count))
         final_page_score = float(min(1.0, mean_loc * boost))
 
-        page_scores.append(final_page_score)
+        scan.add(final_page_score)
         all_location_scores.extend(location_scores)
 
-    if not page_scores:
+    scan.report(stats)
+
+    if not scan.page_scores:
         return 0.0, []
 
     # Use max-page strategy
-    final_score = float(round(max(page_scores), 3))
+    final_score = float(round(scan.value, 3))
     return final_score, all_location_scores
 
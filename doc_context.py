@@ -0,0 +1,98 @@
+import mmap
+import os
+from typing import List, NamedTuple, Optional
+
+import fitz  # PyMuPDF
+
+from pdf_structure import PdfStructure, scan_structure
+
+
+class PageInfo(NamedTuple):
+    number: int        # 1-based, same as page-N.jpg
+    width: float       # points
+    height: float      # points
+    rotation: int
+
+
+class DocumentContext:
+    """
+    One parse of one PDF, shared by every consumer in the pipeline.
+
+    - the file is memory-mapped once and opened by fitz from that buffer
+      (falls back to fitz.open(path) on PyMuPDF builds without buffer support)
+    - `metadata` (producer, creator, ...) and the page inventory are read once;
+      metadata is {} when the file has no (or an empty) Info dictionary, like
+      PyPDF2's reader.metadata
+    - `structure` (revisions / xref chain) is scanned from the same mapped bytes
+    - `doc` is the live handle for rendering (details.render_pdf) and for
+      object-model scorers; fitz documents are NOT thread-safe, so threaded
+      scorers only get the plain `metadata` / `pages` values
+
+    Usage:
+        with DocumentContext(pdf_path) as ctx:
+            render_pdf(pdf_path, out, context=ctx)
+            compute_metadata_score(metadata=ctx.metadata)
+    """
+
+    def __init__(self, pdf_path: str):
+        self.path = pdf_path
+        self.size = os.path.getsize(pdf_path)
+
+        self._file = open(pdf_path, "rb")
+        self.buffer: Optional[mmap.mmap] = None
+        self._structure: Optional[PdfStructure] = None
+        try:
+            if self.size:
+                self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.doc = self._open()
+        except Exception:
+            self.close()
+            raise
+
+        self.metadata = {k: (v or "") for k, v in (self.doc.metadata or {}).items()} if self._has_info() else {}
+        self.pages: List[PageInfo] = [
+            PageInfo(i + 1, page.rect.width, page.rect.height, page.rotation)
+            for i, page in enumerate(self.doc)
+        ]
+
+    def _open(self) -> "fitz.Document":
+        if self.buffer is not None:
+            try:
+                return fitz.open(stream=self.buffer, filetype="pdf")
+            except TypeError:
+                pass
+        return fitz.open(self.path)
+
+    def _has_info(self) -> bool:
+        """
+        Trailer /Info with at least one entry (fitz fills every metadata key,
+        "format" included, whether or not the file has one).
+        """
+        try:
+            kind, value = self.doc.xref_get_key(-1, "Info")
+            if kind == "xref":
+                return bool(self.doc.xref_get_keys(int(value.split()[0])))
+            return kind == "dict" and value.strip("<> ") != ""
+        except Exception:
+            return any(v for k, v in (self.doc.metadata or {}).items() if k not in ("format", "encryption"))
+
+    @property
+    def structure(self) -> PdfStructure:
+        if self._structure is None:
+            self._structure = scan_structure(self.buffer if self.buffer is not None else b"")
+        return self._structure
+
+    def close(self) -> None:
+        doc = getattr(self, "doc", None)
+        if doc is not None and not doc.is_closed:
+            doc.close()
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+        self._file.close()
+
+    def __enter__(self) -> "DocumentContext":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
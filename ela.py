@@ -1,6 +1,8 @@
 import os
 from PIL import Image, ImageChops, ImageEnhance
 
+from page_content import page_content
+
 
 def perform_ela(image_path: str, save_path: str, quality: int = 90) -> None:
     """
@@ -15,15 +17,15 @@ def perform_ela(image_path: str, save_path: str, quality: int = 90) -> None:
     quality : int, optional
         JPEG quality for recompression. Must stay constant across the dataset.
     """
-    # Load original image in RGB
-    original = Image.open(image_path).convert("RGB")
+    # Load original image in RGB (single channel for monochrome pages)
+    original = Image.open(image_path).convert(page_content(image_path).mode)
 
     # Temporary recompressed copy
     temp_path = save_path + ".tmp.jpg"
     original.save(temp_path, "JPEG", quality=quality)
 
     # Reload recompressed copy
-    recompressed = Image.open(temp_path).convert("RGB")
+    recompressed = Image.open(temp_path).convert(original.mode)
 
     # Absolute difference between original and recompressed
     diff = ImageChops.difference(original, recompressed)
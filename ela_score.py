@@ -1,9 +1,12 @@
 import os
-from typing import List, Tuple
+from typing import Callable, Optional, Tuple
 
-from PIL import Image
 import numpy as np
 
+from evidence import count_pages, images_dir_for, iter_sparse_evidence
+from page_scan import MaxPageScan
+from render_manifest import area_scale
+
 
 def _tail_features(x: np.ndarray) -> Tuple[float, float, float]:
     """
@@ -17,32 +20,37 @@ def _tail_features(x: np.ndarray) -> Tuple[float, float, float]:
     return q50, q95, q99
 
 
-def compute_ela_score(forensic_output_dir: str) -> float:
-    ela_dir = os.path.join(forensic_output_dir, "ELA")
-    if not os.path.exists(ela_dir):
-        return 0.0
-
+def compute_ela_score(
+    forensic_output_dir: str,
+    compression_score: Optional[float] = None,
+    stats: Optional[dict] = None,
+    on_page: Optional[Callable[[int, float], None]] = None
+) -> float:
+    """
+    compression_score is accepted for the pipeline's ELA signature
+    (cw4updated) and ignored: this scorer has no compression gate.
+    """
     debug = os.getenv("DEBUG_FORENSICS", "0") == "1"
 
-    page_scores: List[float] = []
+    scan = MaxPageScan(
+        iter_sparse_evidence(forensic_output_dir, "ELA"),
+        total=count_pages(forensic_output_dir),
+        on_page=on_page
+    )
 
-    for img_name in os.listdir(ela_dir):
-        if not img_name.lower().endswith(".jpg"):
-            continue
-
-        img_path = os.path.join(ela_dir, img_name)
+    images_dir = images_dir_for(forensic_output_dir)
 
+    for img_name, sparse in scan:
+        # Only the map's non-zero pixels (sparse_maps.SparseMap): zeros are below the floor anyway
         try:
-            with Image.open(img_path).convert("L") as im:
-                arr = np.asarray(im, dtype=np.float32) / 255.0
+            flat = sparse.gray().astype(np.float32) / 255.0
         except Exception:
             continue
 
-        flat = arr.reshape(-1)
-
         # drop background floor
         flat = flat[flat > 0.04]
-        if flat.size < 2000:
+        # Pixel count calibrated at the reference render zoom
+        if flat.size < 2000 * area_scale(images_dir, img_name):
             continue
 
         q50, q95, q99 = _tail_features(flat)
@@ -63,14 +71,18 @@ def compute_ela_score(forensic_output_dir: str) -> float:
         score = (raw - LO) / (HI - LO)
         score = float(np.clip(score, 0.0, 1.0))
 
-        page_scores.append(score)
+        scan.add(score)
 
         if debug:
             print(f"[ELA] {img_name} q50={q50:.3f} q95={q95:.3f} q99={q99:.3f} raw={raw:.4f} score={score:.3f}")
 
-    if not page_scores:
+    scan.report(stats)
+    if debug and scan.stopped_early:
+        print(f"[SCAN] page max saturated, skipped {scan.pages_skipped} page(s)")
+
+    if not scan.page_scores:
         return 0.0
 
     # Document score: use max to catch a single tampered page
-    doc_score = float(np.max(page_scores))
+    doc_score = scan.value
     return float(round(doc_score, 3))
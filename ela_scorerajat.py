@@ -1,34 +1,36 @@
-import os
+from typing import Callable, Optional
 import numpy as np
-from PIL import Image
 
+from evidence import count_pages, iter_evidence
+from integral_stats import IntegralStats
+from page_content import active_mask
+from page_scan import MaxPageScan
 
-def _patch_values(gray: np.ndarray, grid: int = 60) -> np.ndarray:
+
+def _patch_values(gray: np.ndarray, active: np.ndarray, grid: int = 60) -> np.ndarray:
     """
     Returns per-patch mean intensity (0..1), ignoring background-heavy patches.
+
+    All patches are read from one set of integral images of the page;
+    `active` is its page_content.active_mask().
     """
     h, w = gray.shape
     ph = max(h // grid, 10)
     pw = max(w // grid, 10)
 
-    vals = []
-    for y in range(0, h, ph):
-        for x in range(0, w, pw):
-            patch = gray[y:y + ph, x:x + pw]
-            if patch.size == 0:
-                continue
-
-            active = patch > 2.0
-            # Ignore patches that are mostly background
-            if active.mean() < 0.12:
-                continue
+    patches = IntegralStats(gray, active).windows((ph, pw))
 
-            vals.append(float(patch[active].mean()) / 255.0)
+    # Ignore patches that are mostly background
+    keep = patches.active_fraction >= 0.12
+    return (patches.mean[keep] / 255.0).astype(np.float32)
 
-    return np.array(vals, dtype=np.float32)
 
-
-def compute_ela_score(forensic_output_dir: str) -> float:
+def compute_ela_score(
+    forensic_output_dir: str,
+    compression_score: Optional[float] = None,
+    stats: Optional[dict] = None,
+    on_page: Optional[Callable[[int, float], None]] = None
+) -> float:
     """
     ELA score (0..1)
 
@@ -37,36 +39,35 @@ def compute_ela_score(forensic_output_dir: str) -> float:
       If the page has too little active area OR too few usable patches,
       return 0 for that page (prevents Lokesh false positives).
     - More aggressive mapping AFTER the guard so manipulated pages rise.
-    """
-    ela_dir = os.path.join(forensic_output_dir, "ELA")
-    if not os.path.exists(ela_dir):
-        return 0.0
-
-    page_scores = []
 
-    for name in os.listdir(ela_dir):
-        if not name.lower().endswith(".jpg"):
-            continue
+    compression_score is accepted for the pipeline's ELA signature
+    (cw4updated) and ignored: this scorer has no compression gate.
+    """
+    scan = MaxPageScan(
+        iter_evidence(forensic_output_dir, "ELA"),
+        total=count_pages(forensic_output_dir),
+        on_page=on_page
+    )
 
-        path = os.path.join(ela_dir, name)
+    for _, evidence in scan:
         try:
-            with Image.open(path).convert("L") as im:
-                gray = np.array(im, dtype=np.float32)
+            gray = np.array(evidence.convert("L"), dtype=np.float32)
         except Exception:
             continue
 
         # ---------------- LOW CONTENT GUARD ----------------
-        active_fraction = float((gray > 2.0).mean())
+        active = active_mask(gray)
+        active_fraction = float(active.mean())
         # Very empty pages (Lokesh-style) should not produce ELA spikes
         if active_fraction < 0.015:  # 1.5% of pixels active
-            page_scores.append(0.0)
+            scan.add(0.0)
             continue
 
-        vals = _patch_values(gray, grid=60)
+        vals = _patch_values(gray, active, grid=60)
 
         # If too few patches survived, stats become unstable -> treat as clean
         if vals.size < 120:
-            page_scores.append(0.0)
+            scan.add(0.0)
             continue
 
         med = float(np.median(vals))
@@ -77,7 +78,7 @@ def compute_ela_score(forensic_output_dir: str) -> float:
 
         # Extra guard: for low-energy documents, small ratios are benign
         if med < 0.03 and ratio < 0.06:
-            page_scores.append(0.0)
+            scan.add(0.0)
             continue
 
         # ---------------- SCORE MAPPING (MORE SENSITIVE) ----------------
@@ -90,9 +91,11 @@ def compute_ela_score(forensic_output_dir: str) -> float:
         else:
             score = 0.75 + min(0.25, (ratio - 0.07) / 0.08 * 0.25)  # up to 1.0
 
-        page_scores.append(float(score))
+        scan.add(float(score))
+
+    scan.report(stats)
 
-    if not page_scores:
+    if not scan.page_scores:
         return 0.0
 
-    return float(round(min(1.0, max(page_scores)), 3))
+    return float(round(min(1.0, scan.value), 3))
@@ -0,0 +1,102 @@
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from staged_scoring import SCORE_KWARGS, risk_bounds
+
+
+# on_event(kind, payload) – payload must be JSON serialisable
+EventSink = Callable[[str, Dict[str, Any]], None]
+
+# Event kinds
+# - "pages_rendered"  {"done", "total"}
+# - "stage"           {"stage"}
+# - "page_score"      {"scorer", "page", "score"}
+# - "score"           {"scorer", "score"}
+# - "provisional"     {"risk_lower", "risk_upper", "verdict_lower", "verdict_upper", "final"}
+
+
+def emit(on_event: Optional[EventSink], kind: str, **payload: Any) -> None:
+    """
+    Fire one event; a broken sink never breaks the analysis.
+    """
+    if on_event is None:
+        return
+    try:
+        on_event(kind, payload)
+    except Exception as e:
+        print(f"Event sink failed for {kind}: {e}")
+
+
+class ScoreProgress:
+    """
+    Turns partial scorer results into provisional risk events.
+
+    - final(scorer, value): a component score is known
+    - page(scorer, index, value): one more page of a max-aggregated scorer is done;
+      the page max so far is a lower bound for that scorer's document score
+    Every update re-emits the (lower, upper) forensic risk and the verdict range
+    it allows, so the UI can show a provisional verdict long before the run ends.
+
+    page() is called from scorer threads, hence the lock.
+    """
+
+    def __init__(
+        self,
+        on_event: Optional[EventSink],
+        scorers,
+        fuse: Callable[..., float],
+        verdict: Callable[[float, float], tuple],
+        known: Optional[Dict[str, Any]] = None
+    ):
+        self.on_event = on_event
+        self.fuse = fuse
+        self.verdict = verdict
+        # Already-resolved DAG values (compression_gate caps ELA's maximum)
+        self.known = known if known is not None else {}
+        self._lock = threading.Lock()
+
+        # Inactive scorers are fixed at 0.0 from the start
+        self._final = {name: 0.0 for name in SCORE_KWARGS if name not in scorers}
+        self._partial: Dict[str, float] = {}
+
+    def page(self, scorer: str, index: int, value: float) -> None:
+        value = float(value)
+        with self._lock:
+            if scorer in self._final:
+                return
+            self._partial[scorer] = max(self._partial.get(scorer, 0.0), value)
+
+        emit(self.on_event, "page_score", scorer=scorer, page=index, score=round(value, 4))
+        self._provisional()
+
+    def final(self, scorer: str, value: float) -> None:
+        if scorer not in SCORE_KWARGS:
+            return
+        with self._lock:
+            self._final[scorer] = float(value)
+            self._partial.pop(scorer, None)
+
+        emit(self.on_event, "score", scorer=scorer, score=round(float(value), 4))
+        self._provisional()
+
+    def _provisional(self) -> None:
+        if self.on_event is None:
+            return
+
+        with self._lock:
+            final = dict(self._final)
+            partial = dict(self._partial)
+
+        lower, _ = risk_bounds({**partial, **final}, self.known, self.fuse)
+        _, upper = risk_bounds(final, self.known, self.fuse)
+        upper = max(lower, upper)
+
+        # Forensics decide the range, ML can only move a flagged document within it
+        emit(
+            self.on_event, "provisional",
+            risk_lower=round(lower, 4),
+            risk_upper=round(upper, 4),
+            verdict_lower=self.verdict(lower, 0.0)[1],
+            verdict_upper=self.verdict(upper, 1.0)[1],
+            final=len(final) == len(SCORE_KWARGS)
+        )
@@ -0,0 +1,321 @@
+import os
+import re
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+from PIL import Image
+
+from forensic_maps import IN_MEMORY_MAPS, SINGLE_CHANNEL_MAPS, save_map
+from page_content import page_content
+from prescreen import is_blank
+from render_manifest import MANIFEST_NAME
+from sparse_maps import SparseMap, sparsify
+
+
+EVIDENCE_KINDS = ("Preprocessed", "ELA", "Compression", "Noise", "Font_Alignment")
+
+# What a download / preview offers. Independent of the scorer plan: a stage
+# the scorers no longer read (Noise with the tiles engine) is still evidence
+DOWNLOAD_KINDS = tuple(
+    k.strip() for k in os.getenv("FORENSICS_DOWNLOAD_KINDS", ",".join(EVIDENCE_KINDS)).split(",")
+    if k.strip() in EVIDENCE_KINDS
+)
+IMAGE_EXTS = (".png", ".jpg", ".jpeg")
+
+# In-memory maps kept for the lifetime of the process (scoring + later download)
+MAP_CACHE_SIZE = int(os.getenv("FORENSICS_MAP_CACHE", "64"))
+
+# Cached maps are kept as their active pixels only (sparse_maps.SparseMap);
+# FORENSICS_SPARSE_MAPS=0 keeps the dense images instead
+SPARSE_MAPS = os.getenv("FORENSICS_SPARSE_MAPS", "1") == "1"
+
+# Above this share of active pixels (scans, photos) the sparse form is the
+# bigger one (4-byte index per pixel): such maps stay dense in the cache
+SPARSE_MAX_DENSITY = float(os.getenv("FORENSICS_SPARSE_MAX_DENSITY", "0.25"))
+
+_map_cache: "OrderedDict[tuple, Union[Image.Image, SparseMap]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def page_number(name: str) -> int:
+    m = re.search(r"(\d+)", name)
+    return int(m.group(1)) if m else 0
+
+
+def list_pages(folder: str, exts: Sequence[str] = IMAGE_EXTS) -> List[str]:
+    """
+    Image file names in a folder, in page order (page-2 before page-10).
+    """
+    if not os.path.isdir(folder):
+        return []
+
+    names = [
+        n for n in os.listdir(folder)
+        if n.lower().endswith(tuple(exts)) and not n.startswith(".")
+    ]
+    return sorted(names, key=lambda n: (page_number(n), n))
+
+
+def images_dir_for(forensic_output_dir: str) -> str:
+    """
+    <root>/Forensics_Output/<doc>  ->  <root>/Images/<doc>
+    """
+    forensic_output_dir = os.path.normpath(forensic_output_dir)
+    root = os.path.dirname(os.path.dirname(forensic_output_dir))
+    return os.path.join(root, "Images", os.path.basename(forensic_output_dir))
+
+
+def scored_pages(forensic_output_dir: str) -> List[str]:
+    """
+    list_pages() of the page images minus near-blank pages (prescreen.py),
+    which skip full-resolution analysis.
+    """
+    images_dir = images_dir_for(forensic_output_dir)
+    return [p for p in list_pages(images_dir) if not is_blank(os.path.join(images_dir, p))]
+
+
+def page_files(forensic_output_dir: str, numbers: Sequence[int]) -> List[str]:
+    """
+    Scored page image names for 1-based page numbers (near-blank pages drop out).
+    """
+    wanted = set(numbers)
+    return [p for p in scored_pages(forensic_output_dir) if page_number(p) in wanted]
+
+
+def blank_pages(forensic_output_dir: str) -> List[str]:
+    images_dir = images_dir_for(forensic_output_dir)
+    return [p for p in list_pages(images_dir) if is_blank(os.path.join(images_dir, p))]
+
+
+def _evidence_name(page_file: str) -> str:
+    # Keep output names as .jpg for compatibility in downstream scoring
+    return os.path.splitext(page_file)[0] + ".jpg"
+
+
+def _cached_map(kind: str, page_path: str, sparse: bool = False) -> Union[Image.Image, SparseMap]:
+    key = (kind, page_path, os.path.getmtime(page_path))
+
+    with _cache_lock:
+        result = _map_cache.get(key)
+        if result is not None:
+            _map_cache.move_to_end(key)
+
+    if result is None:
+        # Maps are computed on the page's content box only (margins stay black)
+        with Image.open(page_path) as im:
+            content = page_content(page_path, im)
+            if kind in SINGLE_CHANNEL_MAPS:
+                result = IN_MEMORY_MAPS[kind](im, box=content.box, mode=content.mode)
+            else:
+                result = IN_MEMORY_MAPS[kind](im, box=content.box)
+        if SPARSE_MAPS:
+            sparse_result = sparsify(result)
+            if sparse_result.density <= SPARSE_MAX_DENSITY:
+                result = sparse_result
+
+        with _cache_lock:
+            _map_cache[key] = result
+            while len(_map_cache) > MAP_CACHE_SIZE:
+                _map_cache.popitem(last=False)
+
+    if sparse:
+        return result if isinstance(result, SparseMap) else sparsify(result)
+    return result.to_image() if isinstance(result, SparseMap) else result
+
+
+def _evidence_complete(forensic_output_dir: str, kind: str, pages: Optional[List[str]] = None) -> bool:
+    if pages is None:
+        pages = list_pages(images_dir_for(forensic_output_dir))
+    evidence_dir = os.path.join(forensic_output_dir, kind)
+    if not pages or not os.path.isdir(evidence_dir):
+        return False
+
+    return all(
+        os.path.exists(os.path.join(evidence_dir, _evidence_name(p)))
+        for p in pages
+    )
+
+
+def _render_page(kind: str, page_path: str, out_path: str) -> None:
+    """
+    Render one evidence JPEG (write to temp, then rename).
+    """
+    out_dir, out_name = os.path.split(out_path)
+    tmp_path = os.path.join(out_dir, "." + out_name)
+
+    if kind in IN_MEMORY_MAPS:
+        with Image.open(page_path) as im:
+            save_map(kind, im, tmp_path, mode=page_content(page_path, im).mode)
+
+    elif kind == "Preprocessed":
+        from preprocess import preprocess_image
+        preprocess_image(page_path, tmp_path)
+
+    elif kind == "Noise":
+        from noise import noise_pattern_analysis
+        noise_pattern_analysis(page_path, tmp_path)
+
+    elif kind == "Font_Alignment":
+        from font_alignment import font_alignment_check
+        font_alignment_check(page_path, tmp_path)
+
+    else:
+        raise ValueError(f"Unknown evidence kind: {kind}")
+
+    os.replace(tmp_path, out_path)
+
+
+def ensure_evidence(
+    forensic_output_dir: str,
+    kinds: Optional[Sequence[str]] = None,
+    skip_blank: bool = False,
+    only_pages: Optional[Sequence[str]] = None
+) -> None:
+    """
+    Lazily render evidence JPEGs for a document.
+
+    - Only pages that do not have an evidence image yet are rendered
+    - ELA / Compression are encoded once from the page, byte for byte like the eager generators
+    - Safe to call on every download / preview click (no-op once complete)
+    - Default kinds are DOWNLOAD_KINDS; scoring passes the stages its scorers read
+    - skip_blank: scoring only, near-blank pages get no evidence (downloads keep every page)
+    - only_pages: page image names to render, the rest are left alone
+    """
+    images_dir = images_dir_for(forensic_output_dir)
+    pages = scored_pages(forensic_output_dir) if skip_blank else list_pages(images_dir)
+    if only_pages is not None:
+        pages = [p for p in pages if p in set(only_pages)]
+
+    if kinds is None:
+        kinds = DOWNLOAD_KINDS
+
+    for kind in kinds:
+        out_dir = os.path.join(forensic_output_dir, kind)
+        os.makedirs(out_dir, exist_ok=True)
+
+        for page in pages:
+            out_path = os.path.join(out_dir, _evidence_name(page))
+            if os.path.exists(out_path):
+                continue
+
+            _render_page(kind, os.path.join(images_dir, page), out_path)
+
+
+def _link(src: str, dst: str) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+@contextmanager
+def page_view(forensic_output_dir: str, pages: Sequence[str], kinds: Sequence[str] = ()) -> Iterator[str]:
+    """
+    A throwaway forensics folder that holds only `pages` (page image names)
+    and their existing evidence of `kinds`, hard-linked, in the usual
+    Images/<doc> + Forensics_Output/<doc> layout. Folder-level scorers run
+    on it see just those pages. Yields the view's forensics folder.
+    """
+    forensic_output_dir = os.path.normpath(os.path.abspath(forensic_output_dir))
+    doc = os.path.basename(forensic_output_dir)
+    images_dir = images_dir_for(forensic_output_dir)
+
+    root = os.path.join(os.path.dirname(os.path.dirname(forensic_output_dir)), ".views", uuid.uuid4().hex)
+    view_images = os.path.join(root, "Images", doc)
+    view_forensics = os.path.join(root, "Forensics_Output", doc)
+
+    try:
+        os.makedirs(view_images)
+        if os.path.exists(os.path.join(images_dir, MANIFEST_NAME)):
+            _link(os.path.join(images_dir, MANIFEST_NAME), os.path.join(view_images, MANIFEST_NAME))
+
+        for kind in kinds:
+            os.makedirs(os.path.join(view_forensics, kind))
+
+        for page in pages:
+            _link(os.path.join(images_dir, page), os.path.join(view_images, page))
+            for kind in kinds:
+                src = os.path.join(forensic_output_dir, kind, _evidence_name(page))
+                if os.path.exists(src):
+                    _link(src, os.path.join(view_forensics, kind, _evidence_name(page)))
+
+        os.makedirs(view_forensics, exist_ok=True)
+        yield view_forensics
+
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def iter_evidence(forensic_output_dir: str, kind: str) -> Iterator[Tuple[str, Image.Image]]:
+    """
+    Yields (evidence file name, PIL image) for every page of one evidence kind.
+
+    Source priority:
+    1. Evidence JPEGs already on disk (eager forensics run / earlier download)
+    2. In-memory maps from the page images (ELA, Compression) - nothing written
+    3. Lazy render to disk for file-based generators (Noise, Font_Alignment, ...)
+
+    Near-blank pages (prescreen.py) are not yielded: every scorer guard
+    would discard them, so they are never decoded at full resolution.
+    """
+    evidence_dir = os.path.join(forensic_output_dir, kind)
+    images_dir = images_dir_for(forensic_output_dir)
+    pages = scored_pages(forensic_output_dir)
+
+    if not _evidence_complete(forensic_output_dir, kind, pages):
+        if kind in IN_MEMORY_MAPS and os.path.isdir(images_dir):
+            for page in pages:
+                try:
+                    yield _evidence_name(page), _cached_map(kind, os.path.join(images_dir, page))
+                except Exception:
+                    continue
+            return
+
+        if os.path.isdir(images_dir):
+            ensure_evidence(forensic_output_dir, [kind], skip_blank=True)
+
+    # Without page images (older eager runs) every evidence file is scored
+    wanted = {_evidence_name(p) for p in pages} if os.path.isdir(images_dir) else None
+
+    for name in list_pages(evidence_dir, exts=(".jpg",)):
+        if wanted is not None and name not in wanted:
+            continue
+        try:
+            with Image.open(os.path.join(evidence_dir, name)) as im:
+                im.load()
+                yield name, im
+        except Exception:
+            continue
+
+
+def iter_sparse_evidence(forensic_output_dir: str, kind: str) -> Iterator[Tuple[str, SparseMap]]:
+    """
+    iter_evidence() with each map as its active pixels only (sparse_maps.SparseMap).
+
+    In-memory maps come straight from the sparse cache; evidence JPEGs on
+    disk are sparsified as they are read.
+    """
+    images_dir = images_dir_for(forensic_output_dir)
+    pages = scored_pages(forensic_output_dir)
+
+    if kind in IN_MEMORY_MAPS and os.path.isdir(images_dir) and not _evidence_complete(forensic_output_dir, kind, pages):
+        for page in pages:
+            try:
+                yield _evidence_name(page), _cached_map(kind, os.path.join(images_dir, page), sparse=True)
+            except Exception:
+                continue
+        return
+
+    for name, image in iter_evidence(forensic_output_dir, kind):
+        yield name, sparsify(image)
+
+
+def count_pages(forensic_output_dir: str) -> int:
+    """
+    Number of rendered pages that reach the scorers (near-blank pages excluded).
+    """
+    return len(scored_pages(forensic_output_dir))
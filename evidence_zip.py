@@ -0,0 +1,80 @@
+import os
+import tempfile
+import zipfile
+from typing import Optional
+
+
+# Already-compressed formats: deflating them burns CPU for ~0% size gain
+STORED_EXTENSIONS = (".jpg", ".jpeg", ".png", ".zip", ".pdf")
+
+
+def _latest_mtime(forensics_dir: str) -> float:
+    latest = os.path.getmtime(forensics_dir)
+    for root, _, files in os.walk(forensics_dir):
+        for name in files:
+            latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+    return latest
+
+
+def evidence_zip_path(forensics_dir: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Where the ZIP for one forensics folder lives.
+
+    Default cache is next to the Forensics_Output root the folder belongs to
+    (<root>/evidence_cache), so each workspace keeps its own archives and two
+    documents with the same name in different workspaces never collide.
+    """
+    forensics_dir = os.path.normpath(os.path.abspath(forensics_dir))
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.dirname(forensics_dir)), "evidence_cache")
+
+    return os.path.join(cache_dir, f"{os.path.basename(forensics_dir)}.zip")
+
+
+def build_evidence_zip(forensics_dir: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Build (or reuse) the evidence ZIP for one forensics folder and return its path.
+
+    - One archive per document: see evidence_zip_path()
+    - JPEG/PNG evidence is STORED, everything else (json, txt) is DEFLATED
+    - Written to a temp file and renamed, so parallel sessions never see a half-written zip
+    - Reused as long as it is newer than every file in the forensics folder
+    """
+    if not os.path.isdir(forensics_dir):
+        raise FileNotFoundError(f"Forensics folder not found: {forensics_dir}")
+
+    zip_path = evidence_zip_path(forensics_dir, cache_dir)
+    os.makedirs(os.path.dirname(zip_path), exist_ok=True)
+
+    if os.path.exists(zip_path) and os.path.getmtime(zip_path) >= _latest_mtime(forensics_dir):
+        return zip_path
+
+    # Unique per build: Streamlit sessions are threads of one process, so a pid suffix is shared
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(zip_path)}.", suffix=".tmp", dir=os.path.dirname(zip_path)
+    )
+    os.close(fd)
+
+    try:
+        with zipfile.ZipFile(tmp_path, "w") as zipf:
+            for root, dirs, files in os.walk(forensics_dir):
+                dirs.sort()
+                for file in sorted(files):
+                    file_path = os.path.join(root, file)
+                    arcname = os.path.relpath(file_path, forensics_dir)
+
+                    if file.lower().endswith(STORED_EXTENSIONS):
+                        compress_type = zipfile.ZIP_STORED
+                    else:
+                        compress_type = zipfile.ZIP_DEFLATED
+
+                    zipf.write(file_path, arcname, compress_type=compress_type)
+
+        os.replace(tmp_path, zip_path)
+
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return zip_path
@@ -1,18 +1,351 @@
 import os
 import json
+from functools import partial
+from typing import Optional
 from datetime import datetime
 
+import scoring.ela_score
 from scoring.ela_score import compute_ela_score
 from scoring.noise_score import compute_noise_score
+from noise_engine import compute_noise_engine_score
 from scoring.compression_score import compute_compression_score
 from scoring.font_alignment_score import compute_font_alignment_score
 from scoring.metadata_score import compute_metadata_score
+from structure_score import compute_structure_score
+from pdf_structure import revision_risk, scan_file
+from text_alignment import text_alignment_score
 from scoring.final_score import compute_final_score
 
 from ml.predict_xgb import predict_risk
 
+from evidence import blank_pages, ensure_evidence, images_dir_for, list_pages, page_files, page_number, page_view
+from forensic_maps import IN_MEMORY_MAPS
+from pipeline_dag import DocumentRun, Node, build_graph
+from concurrent_scoring import run_guarded, run_scorers_concurrently
+from pipeline_stages import NOISE_ENGINE, SCORERS, active_scorers, declare_gate, plan_stages
+from staged_scoring import run_staged
+from workspace import Workspace
+from events import EventSink, ScoreProgress
+from doc_context import DocumentContext
+from render_manifest import REFERENCE_ZOOM, read_manifest
 
-def run_scoring(record_id: int, pdf_path: str) -> dict:
+
+# Forensic risk below this is a clean document (ML is not consulted)
+CLEAN_GATE = 0.06
+
+# Object-model signals (structure_score, pdf_structure.revision_risk) are not
+# calibrated against compute_final_score or the ML model: they are reported as
+# their own components and the model never sees them. A weight > 0 lets them
+# raise the forensic risk to weight * max(structure, revisions).
+STRUCTURE_WEIGHT = float(os.getenv("FORENSICS_STRUCTURE_WEIGHT", "0"))
+
+# Staged bounds cap ELA by the compression score only if the deployed ELA
+# scorer is the compression-gated one (cw4updated); every other one is ungated
+declare_gate("ela", "compression_gate", getattr(scoring.ela_score, "COMPRESSION_GATE", ()))
+
+
+def _verdict(forensic_risk: float, ml_probability: float):
+    """
+    Returns (final_score_100, risk_category)
+    """
+    # -------------------------------------------------
+    # CLEAN DOCUMENT GATE (FORENSIC ONLY)
+    # -------------------------------------------------
+    if forensic_risk < CLEAN_GATE:
+        return 0.0, "Clean Document"
+
+    # -------------------------------------------------
+    # FINAL COMBINED SCORE (0–100)
+    # -------------------------------------------------
+    final_score_01 = (0.7 * forensic_risk) + (0.3 * ml_probability)
+    final_score_100 = round(final_score_01 * 100, 2)
+
+    # -------------------------------------------------
+    # PROFESSIONAL VERDICTS
+    # -------------------------------------------------
+    if final_score_100 < 10:
+        return 0.0, "Clean Document"
+    elif final_score_100 < 35:
+        return final_score_100, "Low Risk"
+    elif final_score_100 < 55:
+        return final_score_100, "Moderate Risk"
+    elif final_score_100 < 75:
+        return final_score_100, "High Risk"
+    elif final_score_100 < 90:
+        return final_score_100, "Very High Risk"
+    else:
+        return final_score_100, "Critical Risk"
+
+
+def _forensic_risk(structure_signal: float = 0.0, **scores) -> float:
+    """
+    compute_final_score, raised to STRUCTURE_WEIGHT * structure_signal when
+    that weight is set (still monotone, so the staged bounds hold).
+    """
+    risk = compute_final_score(**scores)
+    if STRUCTURE_WEIGHT > 0:
+        risk = max(risk, STRUCTURE_WEIGHT * structure_signal)
+    return risk
+
+
+def _font_score(forensic_output_dir, text_pages=None, scanned_pages=None, stats=None) -> float:
+    """
+    Font alignment, document score = max(text-layer score, raster score):
+    - born-digital pages: span geometry from the text layer (`text_pages`,
+      {page number: score})
+    - scanned pages: the raster scorer, run once on a view holding all of
+      them (evidence.page_view), so its own document-level aggregation
+      stays as it is; it never sees the born-digital pages
+    Without text layer info (scanned_pages None) the raster scorer runs on
+    the whole document. Text-layer page scores land in stats["page_scores"],
+    the raster result in stats["raster_score"].
+    """
+    if scanned_pages is None:
+        return compute_font_alignment_score(forensic_output_dir)
+
+    page_scores = {int(n): float(v) for n, v in (text_pages or {}).items()}
+    score = max(page_scores.values(), default=0.0)
+
+    raster = None
+    pages = page_files(forensic_output_dir, scanned_pages)
+    if pages:
+        with page_view(forensic_output_dir, pages, ("Font_Alignment",)) as view:
+            raster = float(compute_font_alignment_score(view))
+        score = max(score, raster)
+
+    if stats is not None:
+        stats["page_scores"] = {str(n): round(v, 4) for n, v in sorted(page_scores.items())}
+        stats["raster_pages"] = [page_number(p) for p in pages]
+        stats["raster_score"] = round(raster, 4) if raster is not None else None
+    return score
+
+
+def _text_pages(text_layer) -> dict:
+    return {f["page"]: f["score"] for f in text_layer.pages}
+
+
+def build_scoring_graph(scorers, needed_stages, page_scan=None, on_page=None, failures=None) -> dict:
+    """
+    render -> residuals -> scorers -> fusion -> ML -> verdict
+
+    Shared dependencies are separate nodes, so the compression scan that
+    gates ELA is the same result reported as compression_score.
+    Inactive scorers resolve to 0.0 without touching their inputs.
+    Max-aggregated scorers write their page counters into `page_scan`
+    (the structure scorer its font / overlay features, under "structure");
+    on_page(page_number, score) gets ELA page scores as they finish.
+    The compression gate and metadata run outside the scorer batch but with
+    its timeout / default score; their failures land in `failures`.
+    """
+    page_scan = page_scan if page_scan is not None else {}
+
+    def render(forensic_output_dir):
+        # Near-blank pages are pre-screened from thumbnails and never scored
+        skipped = blank_pages(forensic_output_dir)
+        page_scan["blank_pages"] = skipped
+        page_scan["blank_pages_skipped"] = len(skipped)
+        if skipped and os.getenv("DEBUG_FORENSICS", "0") == "1":
+            print(f"Pre-screened blank pages: {len(skipped)} ({', '.join(skipped)})")
+        return list_pages(images_dir_for(forensic_output_dir))
+
+    # Span geometry from the PDF text layer (fitz handle, main thread only)
+    def text_layer(pdf_document):
+        if "font" not in scorers or pdf_document is None:
+            return None
+        result = text_alignment_score(pdf_document)
+        page_scan["font"] = {
+            "text_layer_pages": len(result.pages),
+            "scanned_pages": result.scanned_pages,
+            "text_layer_score": result.score,
+        }
+        return result
+
+    def residuals(forensic_output_dir, render, text_layer):
+        # In-memory maps are produced on first read; file-based ones are rendered once here
+        kinds = [
+            s for s in needed_stages
+            if s not in ("Images", "Preprocessed") and s not in IN_MEMORY_MAPS
+        ]
+        # Fully born-digital: the text layer already answered the font question
+        if text_layer is not None and not text_layer.scanned_pages:
+            kinds = [k for k in kinds if k != "Font_Alignment"]
+        if render and kinds:
+            others = kinds
+            # Raster font analysis only runs on the scanned pages (_font_score)
+            if text_layer is not None and "Font_Alignment" in kinds:
+                others = [k for k in kinds if k != "Font_Alignment"]
+                ensure_evidence(
+                    forensic_output_dir, ["Font_Alignment"], skip_blank=True,
+                    only_pages=page_files(forensic_output_dir, text_layer.scanned_pages)
+                )
+            if others:
+                ensure_evidence(forensic_output_dir, others, skip_blank=True)
+        return kinds
+
+    # None when compression failed: an unknown gate must not switch ELA off
+    # (compute_ela_score then measures compression itself, as it did standalone)
+    def compression_gate(forensic_output_dir, residuals):
+        if "compression" not in scorers and "ela" not in scorers:
+            return 0.0
+        return run_guarded(
+            "compression",
+            (compute_compression_score, (forensic_output_dir,), {}),
+            default=None,
+            failures=failures
+        )
+
+    def ela(forensic_output_dir, compression_gate):
+        if "ela" not in scorers:
+            return 0.0
+        return compute_ela_score(
+            forensic_output_dir,
+            compression_score=compression_gate,
+            stats=page_scan.setdefault("ela", {}),
+            on_page=on_page
+        )
+
+    def compression(compression_gate):
+        if "compression" not in scorers:
+            return 0.0
+        return SCORERS["compression"]["default"] if compression_gate is None else compression_gate
+
+    def noise(forensic_output_dir, residuals):
+        if "noise" not in scorers:
+            return 0.0
+        if NOISE_ENGINE == "legacy":
+            return compute_noise_score(forensic_output_dir)
+        return compute_noise_engine_score(forensic_output_dir, stats=page_scan.setdefault("noise", {}))
+
+    def font(forensic_output_dir, residuals, text_layer):
+        if "font" not in scorers:
+            return 0.0
+        if text_layer is None:
+            return _font_score(forensic_output_dir)
+        return _font_score(
+            forensic_output_dir, _text_pages(text_layer), text_layer.scanned_pages,
+            stats=page_scan.setdefault("font", {})
+        )
+
+    # Object-model features (fonts / image overlays): no rasterizing, fitz
+    # handle on this thread. Its own report component (STRUCTURE_WEIGHT)
+    def structure(pdf_path, pdf_document):
+        if "metadata" not in scorers:
+            return 0.0
+        return compute_structure_score(
+            pdf_path,
+            doc=pdf_document,
+            stats=page_scan.setdefault("structure", {})
+        )
+
+    # Incremental updates (raw-byte scan, already done by the DocumentContext)
+    def revisions(pdf_path, pdf_structure):
+        if "metadata" not in scorers:
+            return 0.0
+        try:
+            return revision_risk(pdf_structure if pdf_structure is not None else scan_file(pdf_path))
+        except Exception:
+            return 0.0
+
+    def metadata(pdf_path, pdf_metadata):
+        if "metadata" not in scorers:
+            return 0.0
+        # PyPDF2 only (no fitz handle), so it can leave this thread
+        return run_guarded(
+            "metadata",
+            (compute_metadata_score, (pdf_path,), {"metadata": pdf_metadata}),
+            default=SCORERS["metadata"]["default"],
+            failures=failures
+        )
+
+    # -------------------------------------------------
+    # FORENSIC AGGREGATION (RULE BASED)
+    # -------------------------------------------------
+    def fusion(ela, noise, compression, font, metadata, structure, revisions):
+        return _forensic_risk(
+            max(structure, revisions),
+            ela_score=ela,
+            noise_score=noise,
+            compression_score=compression,
+            font_score=font,
+            metadata_score=metadata
+        )
+
+    # -------------------------------------------------
+    # ML PROBABILITY (SOFT SIGNAL, ignored for clean docs)
+    # -------------------------------------------------
+    def ml(ela, noise, compression, font, metadata, fusion):
+        if fusion < CLEAN_GATE:
+            return 0.0
+
+        ml_result = predict_risk({
+            "ela_score": ela,
+            "noise_score": noise,
+            "compression_score": compression,
+            "font_score": font,
+            "metadata_score": metadata,
+            "forensic_risk": fusion
+        })
+        return ml_result.get("probability", 0.5)
+
+    def verdict(fusion, ml):
+        return _verdict(fusion, ml)
+
+    return build_graph([
+        Node("render", ("forensic_output_dir",), render),
+        Node("text_layer", ("pdf_document",), text_layer),
+        Node("residuals", ("forensic_output_dir", "render", "text_layer"), residuals),
+        Node("compression_gate", ("forensic_output_dir", "residuals"), compression_gate),
+        Node("ela", ("forensic_output_dir", "compression_gate"), ela),
+        Node("compression", ("compression_gate",), compression),
+        Node("noise", ("forensic_output_dir", "residuals"), noise),
+        Node("font", ("forensic_output_dir", "residuals", "text_layer"), font),
+        Node("structure", ("pdf_path", "pdf_document"), structure),
+        Node("revisions", ("pdf_path", "pdf_structure"), revisions),
+        Node("metadata", ("pdf_path", "pdf_metadata"), metadata),
+        Node("fusion", ("ela", "noise", "compression", "font", "metadata", "structure", "revisions"), fusion),
+        Node("ml", ("ela", "noise", "compression", "font", "metadata", "fusion"), ml),
+        Node("verdict", ("fusion", "ml"), verdict),
+    ], inputs=("pdf_path", "forensic_output_dir", "pdf_metadata", "pdf_structure", "pdf_document"))
+
+
+def _scorer_tasks(names, forensic_output_dir, compression_gate, on_page=None, text_layer=None) -> dict:
+    """
+    Picklable (function, args, kwargs) per scorer for concurrent_scoring.
+
+    on_page is a live callback: only pass it for the thread pool.
+    """
+    tasks = {}
+    for name in names:
+        if name == "ela":
+            tasks[name] = (
+                compute_ela_score,
+                (forensic_output_dir,),
+                {"compression_score": compression_gate, "stats": {}, "on_page": on_page}
+            )
+        elif name == "noise":
+            if NOISE_ENGINE == "legacy":
+                tasks[name] = (compute_noise_score, (forensic_output_dir,), {})
+            else:
+                tasks[name] = (compute_noise_engine_score, (forensic_output_dir,), {"stats": {}})
+        elif name == "font":
+            if text_layer is None:
+                tasks[name] = (_font_score, (forensic_output_dir,), {})
+            else:
+                tasks[name] = (
+                    _font_score,
+                    (forensic_output_dir, _text_pages(text_layer), text_layer.scanned_pages),
+                    {"stats": {}}
+                )
+    return tasks
+
+
+def run_scoring(
+    record_id: int,
+    pdf_path: str,
+    workspace: Optional[Workspace] = None,
+    on_event: Optional[EventSink] = None,
+    context: Optional[DocumentContext] = None
+) -> dict:
     """
     FINAL scoring runner (LOCKED – OPTION 2)
 
@@ -21,14 +354,34 @@ def run_scoring(record_id: int, pdf_path: str) -> dict:
     ✔ Forensics (70%) + ML (30%)
     ✔ Final score: 0–100
     ✔ Professional verdicts
+
+    on_event(kind, payload) receives component / page scores and the
+    provisional risk range while the run is in progress (see events.py).
+    context: the DocumentContext the caller already opened; its metadata is
+    reused instead of parsing the PDF again.
     """
 
-    PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    FORENSICS_OUTPUT_ROOT = os.path.join(PROJECT_ROOT, "Forensics_Output")
-    REPORTS_DIR = os.path.join(PROJECT_ROOT, "reports")
+    # Private workspace (concurrent jobs) or the old shared project folders
+    if workspace is not None:
+        FORENSICS_OUTPUT_ROOT = workspace.forensics
+        REPORTS_DIR = workspace.reports
+    else:
+        PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        FORENSICS_OUTPUT_ROOT = os.path.join(PROJECT_ROOT, "Forensics_Output")
+        REPORTS_DIR = os.path.join(PROJECT_ROOT, "reports")
 
     os.makedirs(REPORTS_DIR, exist_ok=True)
 
+    # -------------------------------------------------
+    # STAGE PLAN (only what the active scorers read)
+    # -------------------------------------------------
+    scorers = active_scorers()
+    needed_stages, pruned_stages = plan_stages(scorers)
+
+    # Also in report["pipeline"]["pruned_stages"]; Preprocessed is pruned on every run
+    if pruned_stages and os.getenv("DEBUG_FORENSICS", "0") == "1":
+        print(f"Pruned stages: {', '.join(pruned_stages)}")
+
     # -------------------------------------------------
     # PICK FORENSICS FOLDER FOR THIS PDF
     # -------------------------------------------------
@@ -38,7 +391,11 @@ def run_scoring(record_id: int, pdf_path: str) -> dict:
     pdf_base = os.path.splitext(os.path.basename(pdf_path))[0]
     forensic_output_dir = os.path.join(FORENSICS_OUTPUT_ROOT, pdf_base)
 
-    if not os.path.isdir(forensic_output_dir):
+    if not os.path.isdir(forensic_output_dir) and "Images" in needed_stages:
+        # A private workspace only ever holds this document: never guess
+        if workspace is not None:
+            raise FileNotFoundError(f"Forensics folder missing in workspace: {forensic_output_dir}")
+
         # Fallback: old behaviour (latest folder) if something is off
         all_dirs = [
             d for d in os.listdir(FORENSICS_OUTPUT_ROOT)
@@ -52,70 +409,101 @@ def run_scoring(record_id: int, pdf_path: str) -> dict:
         pdf_base = latest_dir
 
     # -------------------------------------------------
-    # FORENSIC SCORES (0–1)
+    # PIPELINE DAG (each node runs once for this document)
     # -------------------------------------------------
-    ela_score = compute_ela_score(forensic_output_dir)
-    noise_score = compute_noise_score(forensic_output_dir)
-    compression_score = compute_compression_score(forensic_output_dir)
-    font_score = compute_font_alignment_score(forensic_output_dir)
-    metadata_score = compute_metadata_score(pdf_path)
+    page_scan = {}
+    scorer_failures = {}
+    progress = ScoreProgress(on_event, scorers, compute_final_score, _verdict)
+    on_page = partial(progress.page, "ela") if on_event is not None else None
 
-    # -------------------------------------------------
-    # FORENSIC AGGREGATION (RULE BASED)
-    # -------------------------------------------------
-    forensic_risk = compute_final_score(
-        ela_score=ela_score,
-        noise_score=noise_score,
-        compression_score=compression_score,
-        font_score=font_score,
-        metadata_score=metadata_score
+    run = DocumentRun(
+        build_scoring_graph(scorers, needed_stages, page_scan, on_page, scorer_failures),
+        on_result=progress.final,
+        pdf_path=pdf_path,
+        forensic_output_dir=forensic_output_dir,
+        pdf_metadata=context.metadata if context is not None else None,
+        pdf_structure=context.structure._asdict() if context is not None else None,
+        pdf_document=context.doc if context is not None else None
     )
+    progress.known = run.results
+
+    # Same fused risk as the fusion node, for the staged bounds and provisional events
+    fuse = compute_final_score
+    if STRUCTURE_WEIGHT > 0:
+        fuse = partial(_forensic_risk, max(run.get("structure"), run.get("revisions")))
+        progress.fuse = fuse
 
     # -------------------------------------------------
-    # CLEAN DOCUMENT GATE (FORENSIC ONLY)
+    # STAGED SCORING (cheap first, stop at the clean gate)
     # -------------------------------------------------
-    if forensic_risk < 0.06:
-        final_score_100 = 0.0
-        risk_category = "Clean Document"
-        ml_probability = 0.0
+    skipped_scorers = []
+    risk_upper_bound = None
 
-    else:
-        # -------------------------------------------------
-        # ML PROBABILITY (SOFT SIGNAL)
-        # -------------------------------------------------
-        ml_result = predict_risk({
-            "ela_score": ela_score,
-            "noise_score": noise_score,
-            "compression_score": compression_score,
-            "font_score": font_score,
-            "metadata_score": metadata_score,
-            "forensic_risk": forensic_risk
-        })
+    # thread (default) | process | sequential
+    scoring_mode = os.getenv("FORENSICS_SCORING_MODE", "thread").lower()
+
+    def run_batch(names):
+        """
+        Independent scorers in parallel; shared inputs are resolved first.
+        """
+        run.get("residuals")
+        gate = run.get("compression_gate")
+
+        text_layer = run.get("text_layer")
+
+        # compression IS the gate value, nothing left to run for it;
+        # metadata is cheap and reads the context's fields;
+        # font on a fully born-digital document is already answered by the text layer
+        inline = ["compression", "metadata"]
+        if text_layer is not None and not text_layer.scanned_pages:
+            inline.append("font")
+
+        for name in inline:
+            if name in names:
+                run.get(name)
 
-        ml_probability = ml_result.get("probability", 0.5)
-
-        # -------------------------------------------------
-        # FINAL COMBINED SCORE (0–100)
-        # -------------------------------------------------
-        final_score_01 = (0.7 * forensic_risk) + (0.3 * ml_probability)
-        final_score_100 = round(final_score_01 * 100, 2)
-
-        # -------------------------------------------------
-        # PROFESSIONAL VERDICTS
-        # -------------------------------------------------
-        if final_score_100 < 10:
-            final_score_100 = 0.0
-            risk_category = "Clean Document"
-        elif final_score_100 < 35:
-            risk_category = "Low Risk"
-        elif final_score_100 < 55:
-            risk_category = "Moderate Risk"
-        elif final_score_100 < 75:
-            risk_category = "High Risk"
-        elif final_score_100 < 90:
-            risk_category = "Very High Risk"
-        else:
-            risk_category = "Critical Risk"
+        tasks = _scorer_tasks(
+            [n for n in names if n in scorers and n not in inline],
+            forensic_output_dir, gate,
+            on_page=on_page if scoring_mode == "thread" else None,
+            text_layer=text_layer
+        )
+        # Each score lands in the run (and the event stream) as soon as it finishes
+        _, failures, stats = run_scorers_concurrently(
+            tasks,
+            defaults={n: SCORERS[n]["default"] for n in tasks},
+            mode=scoring_mode,
+            on_result=run.provide
+        )
+        scorer_failures.update(failures)
+        # Merge: the text layer already filed its font counters under "font"
+        for name, task_stats in stats.items():
+            page_scan.setdefault(name, {}).update(task_stats)
+
+        return {n: run.get(n) for n in names}
+
+    batch = run_batch if scoring_mode in ("thread", "process") else None
+
+    if os.getenv("FORENSICS_STAGED", "1") == "1":
+        skipped_scorers, risk_upper_bound = run_staged(
+            run, scorers, fuse, CLEAN_GATE, batch=batch
+        )
+        # Cannot change the verdict: report them as 0.0 and list them as skipped
+        for name in skipped_scorers:
+            run.provide(name, 0.0)
+
+    elif batch is not None:
+        batch(scorers)
+
+    ela_score = run.get("ela")
+    noise_score = run.get("noise")
+    compression_score = run.get("compression")
+    font_score = run.get("font")
+    metadata_score = run.get("metadata")
+    forensic_risk = run.get("fusion")
+    ml_probability = run.get("ml")
+    final_score_100, risk_category = run.get("verdict")
+    structure_features = page_scan.pop("structure", None)
 
     # -------------------------------------------------
     # FINAL REPORT
@@ -137,17 +525,51 @@ def run_scoring(record_id: int, pdf_path: str) -> dict:
                 "compression_score": compression_score,
                 "font_score": font_score,
                 "metadata_score": metadata_score,
+                # Not inputs of compute_final_score / the ML model (STRUCTURE_WEIGHT)
+                "structure_score": run.get("structure"),
+                "revision_score": run.get("revisions"),
                 "forensic_risk": forensic_risk
             },
             "ml": {
                 "ml_probability": ml_probability
             }
+        },
+
+        # Fonts / image overlays behind structure_score
+        "structure_features": structure_features,
+
+        # Per-page render zoom; scorer pixel thresholds are scaled from reference_zoom
+        "render": read_manifest(images_dir_for(forensic_output_dir)) or {
+            "reference_zoom": REFERENCE_ZOOM, "pages": {}
+        },
+
+        # Info dictionary as the DocumentContext read it (the UI stores it for the
+        # upload record instead of parsing the file again); None without a context
+        "pdf_metadata": run.get("pdf_metadata"),
+
+        # Raw-byte revision structure (None when no DocumentContext was given)
+        "pdf_structure": {
+            k: v for k, v in (run.get("pdf_structure") or {}).items() if k != "eof_offsets"
+        } or None,
+
+        "pipeline": {
+            "active_scorers": scorers,
+            "stages_run": needed_stages,
+            "pruned_stages": pruned_stages,
+            "skipped_scorers": skipped_scorers,
+            "forensic_risk_upper_bound": risk_upper_bound,
+            "scoring_mode": scoring_mode,
+            "structure_weight": STRUCTURE_WEIGHT,
+            "scorer_failures": scorer_failures,
+            "node_seconds": run.timings,
+            "page_scan": page_scan
         }
     }
 
+    # Batch runs have no DB record: name the report after the document
     report_path = os.path.join(
         REPORTS_DIR,
-        f"{record_id}_final_report.json"
+        f"{record_id if record_id is not None else pdf_base}_final_report.json"
     )
 
     with open(report_path, "w", encoding="utf-8") as f:
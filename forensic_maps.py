@@ -0,0 +1,135 @@
+from io import BytesIO
+
+import numpy as np
+from PIL import Image, ImageChops, ImageEnhance
+
+
+# perform_ela boosts the residual by this factor before saving
+ELA_BRIGHTNESS = 10.0
+
+
+def _recompress(original: Image.Image, quality: int) -> Image.Image:
+    """
+    JPEG round-trip in memory (no temp files on disk), same mode as the input.
+    """
+    buf = BytesIO()
+    original.save(buf, format="JPEG", quality=quality)
+    buf.seek(0)
+
+    with Image.open(buf) as tmp:
+        return tmp.convert(original.mode)
+
+
+def _saved_jpeg(image: Image.Image) -> Image.Image:
+    """
+    What a scorer reads back after the generator's final image.save(path, "JPEG")
+    (PIL default quality), without the file.
+    """
+    buf = BytesIO()
+    image.save(buf, format="JPEG")
+    buf.seek(0)
+
+    with Image.open(buf) as tmp:
+        tmp.load()
+        return tmp.copy()
+
+
+def _normalize_diff(diff: Image.Image) -> Image.Image:
+    """
+    Scale a difference image to 0..255 by its page max (non-saturating).
+    """
+    arr = np.array(diff, dtype=np.float32)
+    maxv = float(arr.max())
+    if maxv < 1.0:
+        maxv = 1.0
+
+    arr = np.clip(arr * (255.0 / maxv), 0, 255).astype(np.uint8)
+    return Image.fromarray(arr, mode=diff.mode)
+
+
+def _on_content(original: Image.Image, box, make_map) -> Image.Image:
+    """
+    Run a map generator on the content box only (page_content.PageContent.box)
+    and place it on a black full-page canvas.
+
+    The box is MCU-aligned and padded, so the crop re-encodes block for block
+    like the page and the white margins (residual 0) are never touched.
+    The box is kept in image.info["content_box"] for the scorers.
+    """
+    if box is None or tuple(box) == (0, 0) + original.size:
+        return make_map(original)
+
+    canvas = Image.new(original.mode, original.size)
+    if box[2] > box[0] and box[3] > box[1]:
+        canvas.paste(make_map(original.crop(box)), box[:2])
+    canvas.info["content_box"] = tuple(box)
+    return canvas
+
+
+def _ela_residual(img: Image.Image, quality: int = 90) -> Image.Image:
+    diff = ImageChops.difference(img, _recompress(img, quality))
+    return ImageEnhance.Brightness(diff).enhance(ELA_BRIGHTNESS)
+
+
+def _compression_residual(img: Image.Image, low_quality: int = 70, high_quality: int = 95) -> Image.Image:
+    low = _recompress(img, low_quality)
+    high = _recompress(img, high_quality)
+    return _normalize_diff(ImageChops.difference(low, high))
+
+
+def ela_map(original: Image.Image, quality: int = 90, box=None, mode: str = "RGB") -> Image.Image:
+    """
+    In-memory ELA map, step for step what perform_ela writes to disk:
+    JPEG round-trip at `quality`, difference, Brightness x10, saved as JPEG.
+
+    Returns an image in `mode`; nothing is written to disk. mode="L"
+    (page_content.PageContent.mode) is the single-channel path for
+    monochrome pages: the JPEG luma plane is all a gray page has.
+    """
+    def make_map(img):
+        return _saved_jpeg(_ela_residual(img, quality))
+
+    return _on_content(original.convert(mode), box, make_map)
+
+
+def compression_map(
+    original: Image.Image,
+    low_quality: int = 70,
+    high_quality: int = 95,
+    box=None
+) -> Image.Image:
+    """
+    In-memory compression difference map, step for step what
+    compression_difference writes to disk: Q70 and Q95 round-trips,
+    difference scaled by the page max, saved as JPEG.
+
+    Returns an RGB image; nothing is written to disk.
+    """
+    def make_map(img):
+        return _saved_jpeg(_compression_residual(img, low_quality, high_quality))
+
+    return _on_content(original.convert("RGB"), box, make_map)
+
+
+# Evidence kinds that can be produced without touching the disk
+IN_MEMORY_MAPS = {
+    "ELA": ela_map,
+    "Compression": compression_map,
+}
+
+# Maps that take mode="L" on monochrome pages. The compression scorer measures
+# the spread between channels, so the Compression map always keeps all three.
+SINGLE_CHANNEL_MAPS = ("ELA",)
+
+
+def save_map(kind: str, original: Image.Image, path: str, mode: str = "RGB") -> None:
+    """
+    Write one evidence JPEG byte for byte like the disk generator.
+
+    Saving a cached map would JPEG-encode it a second time, so the residual
+    is rebuilt for the full page and encoded once.
+    """
+    if kind not in SINGLE_CHANNEL_MAPS:
+        mode = "RGB"
+    residual = {"ELA": _ela_residual, "Compression": _compression_residual}[kind]
+    residual(original.convert(mode)).save(path, "JPEG")
@@ -4,6 +4,7 @@ from ela import perform_ela
 from compression import compression_difference
 from noise import noise_pattern_analysis
 from font_alignment import font_alignment_check
+from pipeline_stages import plan_stages
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,24 +13,39 @@ PROJECT_ROOT = os.path.dirname(BASE_DIR)
 IMAGE_ROOT = os.path.join(PROJECT_ROOT, "Images")
 OUTPUT_ROOT = os.path.join(PROJECT_ROOT, "Forensics_Output")
 
-os.makedirs(OUTPUT_ROOT, exist_ok=True)
+# lazy  -> only create the document folder; scoring works on in-memory maps and
+#          evidence JPEGs are rendered on first download (see evidence.py)
+# eager -> old behaviour, write every evidence JPEG for every page now
+EVIDENCE_MODE = os.getenv("FORENSICS_EVIDENCE", "lazy").lower()
 
-for folder in os.listdir(IMAGE_ROOT):
-    img_folder = os.path.join(IMAGE_ROOT, folder)
-    if not os.path.isdir(img_folder):
-        continue
+# Stage name -> generator(img_path, save_path)
+GENERATORS = {
+    "Preprocessed": preprocess_image,
+    "ELA": perform_ela,
+    "Compression": compression_difference,
+    "Noise": noise_pattern_analysis,
+    "Font_Alignment": font_alignment_check,
+}
 
-    print(f"Processing: {folder}")
 
-    base_out = os.path.join(OUTPUT_ROOT, folder)
+def process_folder(img_folder: str, base_out: str, needed_stages=None) -> None:
+    """
+    Forensics for ONE document: Images/<doc> -> Forensics_Output/<doc>.
+    """
+    if needed_stages is None:
+        needed_stages, _ = plan_stages()
 
-    pre_dir = os.path.join(base_out, "Preprocessed")
-    ela_dir = os.path.join(base_out, "ELA")
-    comp_dir = os.path.join(base_out, "Compression")
-    noise_dir = os.path.join(base_out, "Noise")
-    font_dir = os.path.join(base_out, "Font_Alignment")
+    if EVIDENCE_MODE == "lazy":
+        os.makedirs(base_out, exist_ok=True)
+        return
 
-    for d in [pre_dir, ela_dir, comp_dir, noise_dir, font_dir]:
+    stage_dirs = {
+        stage: os.path.join(base_out, stage)
+        for stage in needed_stages
+        if stage in GENERATORS
+    }
+
+    for d in stage_dirs.values():
         os.makedirs(d, exist_ok=True)
 
     for img in os.listdir(img_folder):
@@ -39,16 +55,29 @@ for folder in os.listdir(IMAGE_ROOT):
             # Keep output names as .jpg for compatibility in downstream scoring
             out_name = os.path.splitext(img)[0] + ".jpg"
 
-            pre_path = os.path.join(pre_dir, out_name)
-            ela_path = os.path.join(ela_dir, out_name)
-            comp_path = os.path.join(comp_dir, out_name)
-            noise_path = os.path.join(noise_dir, out_name)
-            font_out = os.path.join(font_dir, out_name)
+            for stage, out_dir in stage_dirs.items():
+                GENERATORS[stage](img_path, os.path.join(out_dir, out_name))
+
+
+def main() -> None:
+    # Only stages whose output feeds an active scorer are computed
+    needed_stages, pruned_stages = plan_stages()
+    if pruned_stages:
+        print(f"Pruned stages (no active scorer reads them): {', '.join(pruned_stages)}")
+
+    os.makedirs(OUTPUT_ROOT, exist_ok=True)
+
+    for folder in os.listdir(IMAGE_ROOT):
+        img_folder = os.path.join(IMAGE_ROOT, folder)
+        if not os.path.isdir(img_folder):
+            continue
+
+        print(f"Processing: {folder}")
+
+        process_folder(img_folder, os.path.join(OUTPUT_ROOT, folder), needed_stages)
+
+    print("Image Forensics completed successfully")
 
-            preprocess_image(img_path, pre_path)
-            perform_ela(img_path, ela_path)
-            compression_difference(img_path, comp_path)
-            noise_pattern_analysis(img_path, noise_path)
-            font_alignment_check(img_path, font_out)
 
-print("Image Forensics completed successfully")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+from typing import NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+
+Size = Union[int, Tuple[int, int]]
+
+
+# =====================================================
+# SUMMED-AREA TABLES
+# =====================================================
+def integral(x: np.ndarray, dtype=np.float64) -> np.ndarray:
+    """
+    Summed-area table with a zero row / column in front, so the sum over
+    rows y0:y1 and columns x0:x1 is s[y1, x1] - s[y0, x1] - s[y1, x0] + s[y0, x0].
+    """
+    s = np.zeros((x.shape[0] + 1, x.shape[1] + 1), dtype=dtype)
+    np.cumsum(np.cumsum(x, axis=0, dtype=dtype), axis=1, out=s[1:, 1:])
+    return s
+
+
+def box_sum(s: np.ndarray, y0: np.ndarray, y1: np.ndarray, x0: np.ndarray, x1: np.ndarray) -> np.ndarray:
+    """
+    Sums over every (row range, column range) pair at once: result[i, j]
+    covers rows y0[i]:y1[i] and columns x0[j]:x1[j].
+    """
+    return s[y1][:, x1] - s[y0][:, x1] - s[y1][:, x0] + s[y0][:, x0]
+
+
+def box_mean(x: np.ndarray, win: int, sat: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Mean over a win x win window centred on each pixel (edge-clamped), O(1) per pixel.
+    """
+    h, w = x.shape
+    s = integral(x) if sat is None else sat
+    r = win // 2
+
+    y0 = np.clip(np.arange(h) - r, 0, h)
+    y1 = np.clip(np.arange(h) + r + 1, 0, h)
+    x0 = np.clip(np.arange(w) - r, 0, w)
+    x1 = np.clip(np.arange(w) + r + 1, 0, w)
+
+    return box_sum(s, y0, y1, x0, x1) / np.outer(y1 - y0, x1 - x0)
+
+
+def _pair(v: Size) -> Tuple[int, int]:
+    return (v, v) if isinstance(v, int) else (int(v[0]), int(v[1]))
+
+
+def _starts(n: int, size: int, step: int) -> np.ndarray:
+    """
+    Window start offsets along one axis.
+
+    - step >= size: plain tiling from 0, the last window clipped at the edge
+    - step <  size: sliding full-size windows, the last one flush with the edge
+    """
+    if step >= size or size >= n:
+        return np.arange(0, n, step)
+    starts = np.arange(0, n - size + 1, step)
+    if starts[-1] != n - size:
+        starts = np.append(starts, n - size)
+    return starts
+
+
+# =====================================================
+# WINDOW STATISTICS
+# =====================================================
+class WindowStats(NamedTuple):
+    y: np.ndarray                # top edge of each window row
+    x: np.ndarray                # left edge of each window column
+    mean: np.ndarray             # [rows, cols] mean of active values (NaN: none active)
+    var: np.ndarray              # [rows, cols] variance of active values
+    active_fraction: np.ndarray  # [rows, cols] share of active pixels in the window
+
+
+class IntegralStats:
+    """
+    Summed-area tables of a page map, its square and its active-pixel mask,
+    built once per page.
+
+    Mean, variance and active fraction of ANY window then cost four lookups
+    each, so a whole window grid is almost free compared to re-slicing the
+    page for every patch.
+
+    Usage:
+        table = IntegralStats(gray, page_content.active_mask(gray))
+        grid = table.windows(36)                # 36x36 tiles
+        sliding = table.windows(36, step=18)    # half-overlapping tiles
+    """
+
+    def __init__(self, values: np.ndarray, active: Optional[np.ndarray] = None):
+        values = np.asarray(values, dtype=np.float64)
+        if active is None:
+            active = np.ones(values.shape, dtype=bool)
+
+        masked = np.where(active, values, 0.0)
+        self.shape = values.shape
+        self.sum = integral(masked)
+        self.sum_sq = integral(masked * masked)
+        self.count = integral(active, dtype=np.int64)
+
+    def windows(self, size: Size, step: Optional[Size] = None) -> WindowStats:
+        """
+        Statistics for a whole grid of (h, w) windows.
+
+        step defaults to the window size (non-overlapping tiles, edge tiles
+        clipped); a smaller step gives sliding windows.
+        """
+        h, w = self.shape
+        sh, sw = _pair(size)
+        th, tw = _pair(step) if step is not None else (sh, sw)
+
+        ys = _starts(h, sh, th)
+        xs = _starts(w, sw, tw)
+        return self._stats(ys, np.minimum(ys + sh, h), xs, np.minimum(xs + sw, w))
+
+    def _stats(self, y0, y1, x0, x1) -> WindowStats:
+        n = box_sum(self.count, y0, y1, x0, x1)
+        total = box_sum(self.sum, y0, y1, x0, x1)
+        total_sq = box_sum(self.sum_sq, y0, y1, x0, x1)
+        area = np.outer(y1 - y0, x1 - x0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / n
+            var = np.maximum(total_sq / n - mean * mean, 0.0)
+
+        return WindowStats(y0, x0, mean, var, n / np.maximum(area, 1))
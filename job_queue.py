@@ -0,0 +1,331 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BASE_DIR)
+
+JOB_DB_PATH = os.getenv("FORENSICS_JOB_DB", os.path.join(PROJECT_ROOT, "jobs.db"))
+
+# queued -> running -> done | failed
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+# A job whose worker died this many times (claims) is failed, not requeued again
+MAX_ATTEMPTS = int(os.getenv("FORENSICS_JOB_MAX_ATTEMPTS", "3"))
+
+
+@contextmanager
+def _connect(db_path: str = JOB_DB_PATH) -> Iterator[sqlite3.Connection]:
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    try:
+        # WAL: pollers (UI) never block the workers writing progress
+        conn.execute("PRAGMA journal_mode=WAL")
+        yield conn
+    finally:
+        conn.close()
+
+
+def init_queue(db_path: str = JOB_DB_PATH) -> None:
+    with _connect(db_path) as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                record_id INTEGER,
+                pdf_path TEXT NOT NULL,
+                stage TEXT,
+                progress REAL NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                worker_pid INTEGER,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)")
+
+        # Added after the first release: older job DBs get the column here
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "content_sha256" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN content_sha256 TEXT")
+        if "attempts" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+        if "metadata_saved" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN metadata_saved INTEGER NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_sha256 ON jobs (content_sha256)")
+
+        # Progressive results (events.py): polled by the UI with after_id while
+        # the job is queued / running, deleted once it is done or failed
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events (job_id, id)")
+        # Job DBs from before events were pruned
+        conn.execute(
+            "DELETE FROM job_events WHERE job_id IN (SELECT id FROM jobs WHERE status IN ('done', 'failed'))"
+        )
+
+
+def _row_to_job(row: Optional[sqlite3.Row]) -> Optional[dict]:
+    if row is None:
+        return None
+
+    job = dict(row)
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def submit_job(
+    record_id: int,
+    pdf_path: str,
+    content_sha256: Optional[str] = None,
+    db_path: str = JOB_DB_PATH
+) -> int:
+    """
+    Queue one analysis; returns the job id the UI polls.
+    content_sha256 (computed while saving the upload) allows dedup lookups.
+    """
+    now = time.time()
+    with _connect(db_path) as conn:
+        cur = conn.execute(
+            "INSERT INTO jobs (status, record_id, pdf_path, content_sha256, created_at, updated_at) "
+            "VALUES ('queued', ?, ?, ?, ?, ?)",
+            (record_id, pdf_path, content_sha256, now, now)
+        )
+        return int(cur.lastrowid)
+
+
+def claim_job(worker_pid: int, db_path: str = JOB_DB_PATH) -> Optional[dict]:
+    """
+    Atomically move the oldest queued job to 'running' for this worker
+    (one more attempt on it).
+    """
+    with _connect(db_path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker_pid = ?, attempts = attempts + 1, "
+                    "updated_at = ? WHERE id = ?",
+                    (worker_pid, time.time(), row["id"])
+                )
+            conn.execute("COMMIT")
+
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    if row is None:
+        return None
+
+    job = _row_to_job(row)
+    job["status"] = "running"
+    job["worker_pid"] = worker_pid
+    job["attempts"] += 1
+    return job
+
+
+def update_progress(job_id: int, stage: str, progress: float, db_path: str = JOB_DB_PATH) -> None:
+    with _connect(db_path) as conn:
+        conn.execute(
+            "UPDATE jobs SET stage = ?, progress = ?, updated_at = ? WHERE id = ?",
+            (stage, float(progress), time.time(), job_id)
+        )
+
+
+def _finish(conn: sqlite3.Connection, job_id: int, sql: str, params: tuple) -> None:
+    """
+    Final status update; the live events (only read while the job runs)
+    go in the same transaction.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(sql, params)
+        conn.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def complete_job(job_id: int, result: dict, db_path: str = JOB_DB_PATH) -> None:
+    with _connect(db_path) as conn:
+        _finish(
+            conn, job_id,
+            "UPDATE jobs SET status = 'done', stage = 'done', progress = 1, result = ?, "
+            "updated_at = ? WHERE id = ?",
+            (json.dumps(result), time.time(), job_id)
+        )
+
+
+def fail_job(job_id: int, error: str, db_path: str = JOB_DB_PATH) -> None:
+    with _connect(db_path) as conn:
+        _finish(
+            conn, job_id,
+            "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+            (error, time.time(), job_id)
+        )
+
+
+def get_job(job_id: int, db_path: str = JOB_DB_PATH) -> Optional[dict]:
+    with _connect(db_path) as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return _row_to_job(row)
+
+
+class EventWriter:
+    """
+    events.EventSink for one job over a single connection: a document emits
+    an event per page and scorer, from the scorer threads too (hence the lock).
+
+        with EventWriter(job_id) as on_event:
+            analyze_document(..., on_event=on_event)
+    """
+
+    def __init__(self, job_id: int, db_path: str = JOB_DB_PATH):
+        self.job_id = job_id
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+
+    def __call__(self, kind: str, payload: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO job_events (job_id, kind, payload, created_at) VALUES (?, ?, ?, ?)",
+                (self.job_id, kind, json.dumps(payload), time.time())
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "EventWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def get_events(job_id: int, after_id: int = 0, db_path: str = JOB_DB_PATH) -> list:
+    """
+    Events of one job newer than `after_id`, oldest first.
+    """
+    with _connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT id, kind, payload, created_at FROM job_events "
+            "WHERE job_id = ? AND id > ? ORDER BY id",
+            (job_id, after_id)
+        ).fetchall()
+
+    return [
+        {"id": r["id"], "kind": r["kind"], "payload": json.loads(r["payload"]), "created_at": r["created_at"]}
+        for r in rows
+    ]
+
+
+def find_done_job(content_sha256: str, db_path: str = JOB_DB_PATH) -> Optional[dict]:
+    """
+    Latest finished job for the same file content (dedup / cache lookup).
+    """
+    with _connect(db_path) as conn:
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE content_sha256 = ? AND status = 'done' ORDER BY id DESC LIMIT 1",
+            (content_sha256,)
+        ).fetchone()
+    return _row_to_job(row)
+
+
+def claim_metadata(job_id: int, db_path: str = JOB_DB_PATH) -> bool:
+    """
+    True for exactly one caller per job: whoever stores the job's PDF
+    metadata (UI sessions polling the same job race for it).
+    """
+    with _connect(db_path) as conn:
+        cur = conn.execute("UPDATE jobs SET metadata_saved = 1 WHERE id = ? AND metadata_saved = 0", (job_id,))
+        return cur.rowcount == 1
+
+
+def active_pdf_paths(db_path: str = JOB_DB_PATH) -> list:
+    """
+    Uploads of queued / running jobs (their workspaces must stay).
+    """
+    with _connect(db_path) as conn:
+        rows = conn.execute("SELECT pdf_path FROM jobs WHERE status IN ('queued', 'running')").fetchall()
+    return [r["pdf_path"] for r in rows]
+
+
+def get_jobs(job_ids, db_path: str = JOB_DB_PATH) -> list:
+    """
+    Several jobs in one query (multi-document uploads), in the order asked for.
+    """
+    job_ids = [int(j) for j in job_ids]
+    if not job_ids:
+        return []
+
+    placeholders = ",".join("?" for _ in job_ids)
+    with _connect(db_path) as conn:
+        rows = conn.execute(f"SELECT * FROM jobs WHERE id IN ({placeholders})", job_ids).fetchall()
+
+    by_id = {row["id"]: _row_to_job(row) for row in rows}
+    return [by_id[j] for j in job_ids if j in by_id]
+
+
+def requeue_orphans(alive_pids, max_attempts: int = MAX_ATTEMPTS, db_path: str = JOB_DB_PATH) -> int:
+    """
+    Jobs left 'running' by a worker that no longer exists go back to the queue.
+
+    A job that already took down `max_attempts` workers (a PDF that crashes
+    the renderer, runs out of memory, ...) is failed instead, so it cannot
+    kill every new worker in turn. Returns the number of jobs requeued.
+    """
+    alive_pids = list(alive_pids)
+
+    orphaned = "status = 'running'"
+    if alive_pids:
+        placeholders = ",".join("?" for _ in alive_pids)
+        orphaned += f" AND (worker_pid IS NULL OR worker_pid NOT IN ({placeholders}))"
+
+    now = time.time()
+    with _connect(db_path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # The dead attempt's live events: a retry starts over, a failed job has none
+            conn.execute(
+                f"DELETE FROM job_events WHERE job_id IN (SELECT id FROM jobs WHERE {orphaned})",
+                tuple(alive_pids)
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', worker_pid = NULL, updated_at = ?, "
+                "error = 'worker died ' || attempts || ' times on this job' "
+                f"WHERE {orphaned} AND attempts >= ?",
+                (now, *alive_pids, max_attempts)
+            )
+            cur = conn.execute(
+                f"UPDATE jobs SET status = 'queued', worker_pid = NULL, updated_at = ? WHERE {orphaned}",
+                (now, *alive_pids)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cur.rowcount
@@ -1,24 +1,49 @@
-from PyPDF2 import PdfReader
+from typing import Optional
 
 
-def compute_metadata_score(pdf_path: str) -> float:
+def compute_metadata_score(
+    pdf_path: Optional[str] = None,
+    metadata: Optional[dict] = None
+) -> float:
     """
-    Soft metadata scoring (0.0 – 1.0)
+    Soft metadata scoring (0.0 – 1.0) from the producer / creator fields
+    (see _producer_score).
 
+    Pass `metadata` (producer / creator already extracted, e.g.
+    DocumentContext.metadata; {} when the file has no Info dictionary) to
+    skip re-parsing the PDF with PyPDF2.
+
+    Incremental updates (pdf_structure.revision_risk) are a separate report
+    component, not part of this score.
+    """
+    return _producer_score(pdf_path, metadata)
+
+
+def _producer_score(pdf_path: Optional[str], metadata: Optional[dict]) -> float:
+    """
     Fix:
     - Treat common programmatic PDF generators (reportlab, fpdf, pymupdf, etc.)
       as LOW risk, not medium.
     """
 
     try:
-        reader = PdfReader(pdf_path)
-        meta = reader.metadata
+        if metadata is not None:
+            if not metadata:
+                return 0.2  # unknown metadata → mild risk
+
+            producer = (metadata.get("producer") or "").lower()
+            creator = (metadata.get("creator") or "").lower()
+        else:
+            from PyPDF2 import PdfReader
+
+            reader = PdfReader(pdf_path)
+            meta = reader.metadata
 
-        if not meta:
-            return 0.2  # unknown metadata → mild risk
+            if not meta:
+                return 0.2  # unknown metadata → mild risk
 
-        producer = (meta.producer or "").lower()
-        creator = (meta.creator or "").lower()
+            producer = (meta.producer or "").lower()
+            creator = (meta.creator or "").lower()
 
         text = (producer + " " + creator).strip()
 
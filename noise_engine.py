@@ -0,0 +1,188 @@
+import os
+import warnings
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from evidence import images_dir_for, list_pages
+from integral_stats import box_mean
+from page_content import page_content
+from page_scan import MaxPageScan
+from prescreen import is_blank
+from render_manifest import length_scale
+
+
+# =====================================================
+# PARAMETERS (page renders at ZOOM=2, i.e. ~144 DPI)
+# =====================================================
+RESIDUAL_WIN = 3        # box filter for the high-pass residual
+FLAT_WIN = 7            # window for the local variance (content) map
+FLAT_VAR = 60.0         # gray-level variance above this = edge / text, not noise
+SATURATED = (6, 249)    # clipped pixels carry no sensor noise
+TILE = 64               # noise level is estimated per TILE x TILE block
+MIN_TILE_FILL = 0.25    # share of usable pixels for a tile to count
+MIN_ACTIVE_TILES = 8    # fewer usable tiles than this: no opinion on the page
+Z_OUTLIER = 3.5         # robust z-score that marks a tile as inconsistent
+Z_RANGE = 6.0           # z beyond Z_OUTLIER that maps to a full score
+
+MAD_TO_SIGMA = 1.4826
+
+
+# =====================================================
+# VECTORIZED BUILDING BLOCKS (integral images: integral_stats.py)
+# =====================================================
+def noise_residual(gray: np.ndarray) -> np.ndarray:
+    """
+    High-pass residual: image minus its RESIDUAL_WIN box blur (separable low-pass).
+    """
+    return gray - box_mean(gray, RESIDUAL_WIN)
+
+
+def local_variance(gray: np.ndarray, win: int = FLAT_WIN) -> np.ndarray:
+    """
+    E[x²] - E[x]² over a sliding window, from integral images of x and x².
+    """
+    mean = box_mean(gray, win)
+    mean_sq = box_mean(gray * gray, win)
+    return np.maximum(mean_sq - mean * mean, 0.0)
+
+
+def tile_sigma(residual: np.ndarray, usable: np.ndarray, tile: int = TILE):
+    """
+    Per-tile noise sigma (MAD estimate over usable pixels) in one pass.
+
+    Returns (sigma[ty, tx], fill[ty, tx]); sigma is NaN where a tile has
+    too few usable pixels.
+    """
+    ty, tx = residual.shape[0] // tile, residual.shape[1] // tile
+    if ty == 0 or tx == 0:
+        empty = np.full((ty, tx), np.nan)
+        return empty, np.zeros((ty, tx))
+
+    def blocks(a):
+        a = a[:ty * tile, :tx * tile]
+        return a.reshape(ty, tile, tx, tile).swapaxes(1, 2).reshape(ty, tx, tile * tile)
+
+    r = blocks(residual).astype(np.float64)
+    m = blocks(usable)
+
+    fill = m.mean(axis=2)
+    r = np.where(m, r, np.nan)
+
+    # All-NaN tiles (nothing usable) just give NaN
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        med = np.nanmedian(r, axis=2, keepdims=True)
+        sigma = MAD_TO_SIGMA * np.nanmedian(np.abs(r - med), axis=2)
+
+    sigma[fill < MIN_TILE_FILL] = np.nan
+    return sigma, fill
+
+
+# =====================================================
+# PAGE ANALYSIS
+# =====================================================
+def noise_inconsistency(gray: np.ndarray, tile: int = TILE) -> dict:
+    """
+    Tile-level noise statistics for one grayscale page (float array 0..255).
+
+    Spliced regions from another source carry a different noise level, so
+    their tiles sit far from the page's typical sigma.
+    """
+    gray = gray.astype(np.float64)
+
+    residual = noise_residual(gray)
+    flat = local_variance(gray) < FLAT_VAR
+    unsaturated = (gray > SATURATED[0]) & (gray < SATURATED[1])
+
+    sigma, _ = tile_sigma(residual, flat & unsaturated, tile)
+    active = sigma[~np.isnan(sigma)]
+
+    stats = {
+        "tiles": int(sigma.size),
+        "active_tiles": int(active.size),
+        "sigma_median": None,
+        "max_z": 0.0,
+        "outlier_tiles": 0,
+        "outlier_fraction": 0.0,
+        "sigma_spread": None,
+    }
+
+    if active.size < MIN_ACTIVE_TILES:
+        return stats
+
+    centre = float(np.median(active))
+    spread = MAD_TO_SIGMA * float(np.median(np.abs(active - centre)))
+    # Perfectly uniform noise has ~0 spread: floor it so tiny differences do not explode
+    spread = max(spread, 0.05 * centre, 0.05)
+
+    z = np.abs(active - centre) / spread
+    outliers = int(np.count_nonzero(z > Z_OUTLIER))
+
+    p5, p95 = np.percentile(active, [5, 95])
+    stats.update({
+        "sigma_median": round(centre, 3),
+        "max_z": round(float(z.max()), 3),
+        "outlier_tiles": outliers,
+        "outlier_fraction": round(outliers / active.size, 4),
+        "sigma_spread": round(float(p95 / max(p5, 1e-6)), 3),
+    })
+    return stats
+
+
+def noise_page_score(stats: dict) -> float:
+    """
+    0.0 – 1.0: how far the most inconsistent tile is beyond Z_OUTLIER,
+    boosted when several tiles disagree (a region, not a single tile).
+    """
+    if stats["active_tiles"] < MIN_ACTIVE_TILES or stats["outlier_tiles"] == 0:
+        return 0.0
+
+    base = min(1.0, (stats["max_z"] - Z_OUTLIER) / Z_RANGE)
+    region = min(1.0, stats["outlier_tiles"] / 4.0)
+    return float(round(min(1.0, 0.5 * base + 0.5 * base * region + 0.1 * region), 3))
+
+
+# =====================================================
+# DOCUMENT SCORER
+# =====================================================
+def compute_noise_engine_score(forensic_output_dir: str, stats: Optional[dict] = None) -> float:
+    """
+    Noise inconsistency score (0.0 – 1.0) straight from the page renders.
+
+    No Noise evidence images are written or re-read; per-page tile statistics
+    go into `stats["pages"]` when `stats` is given.
+    """
+    images_dir = images_dir_for(forensic_output_dir)
+    if not os.path.isdir(images_dir):
+        return 0.0
+
+    # Near-blank pages have no usable tiles anyway
+    pages = [p for p in list_pages(images_dir) if not is_blank(os.path.join(images_dir, p))]
+
+    def gray_pages():
+        for name in pages:
+            path = os.path.join(images_dir, name)
+            with Image.open(path) as img:
+                content = page_content(path, img)
+                # Margins are saturated white (never usable): only the content box is tiled
+                gray = img.convert("L") if content.is_blank else img.convert("L").crop(content.box)
+                yield name, np.asarray(gray)
+
+    page_stats = []
+    scan = MaxPageScan(gray_pages(), total=len(pages))
+    for name, gray in scan:
+        # Tiles cover the same paper area whatever zoom the page was rendered at
+        tile = max(16, int(round(TILE * length_scale(images_dir, name))))
+        page = noise_inconsistency(gray, tile)
+        page["page"] = name
+        page["score"] = noise_page_score(page)
+        page_stats.append(page)
+        scan.add(page["score"])
+
+    if stats is not None:
+        stats["pages"] = page_stats
+        scan.report(stats)
+
+    return scan.value
@@ -0,0 +1,204 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from sparse_maps import SparseMap, components
+
+
+# =====================================================
+# SHARED THRESHOLDS
+# =====================================================
+WHITE_LEVEL = 245       # page render (0..255): brighter than this is paper
+ACTIVE_LEVEL = 2.0      # residual map (0..255): at or below this carries no signal
+WATERMARK_V = 200       # bright ...
+WATERMARK_S = 40        # ... and unsaturated = watermark / light overlay
+
+# A page is monochrome when its colored pixels are only scattered JPEG chroma
+# noise: any connected colored region (signature, stamp, logo) keeps it RGB
+CHROMA_TOL = 12             # max(R, G, B) - min(R, G, B)
+CHROMA_FRACTION = 0.001     # share of colored pixels still treated as grayscale
+CHROMA_REGION = 8           # sampled pixels in one 8-connected colored region (~32 page pixels)
+CHROMA_STRIDE = 2           # chroma is sampled on every 2nd row / column
+
+# FORENSICS_GRAYSCALE_PATH=0 always runs the maps on three channels
+GRAYSCALE_PATH = os.getenv("FORENSICS_GRAYSCALE_PATH", "1") == "1"
+
+# JPEG MCU with 4:2:0 chroma: a crop on this grid re-encodes block for block
+# like the full page, so ELA / compression maps of the crop match the page
+MCU = 16
+CONTENT_PAD = MCU       # keep one MCU of margin around the content
+
+
+Box = Tuple[int, int, int, int]     # (left, upper, right, lower), PIL crop order
+
+
+class PageContent(NamedTuple):
+    box: Box                  # MCU-aligned content bounding box
+    size: Tuple[int, int]     # full page (width, height)
+    content_pixels: int       # pixels darker than WHITE_LEVEL
+    chroma_fraction: float    # share of sampled pixels with real color
+    chroma_region: int        # largest connected colored region, in sampled pixels
+
+    @property
+    def area(self) -> int:
+        return max(0, self.box[2] - self.box[0]) * max(0, self.box[3] - self.box[1])
+
+    @property
+    def is_blank(self) -> bool:
+        return self.content_pixels == 0
+
+    @property
+    def grayscale(self) -> bool:
+        return self.chroma_fraction < CHROMA_FRACTION and self.chroma_region < CHROMA_REGION
+
+    @property
+    def mode(self) -> str:
+        """
+        PIL mode the forensic maps should run in: "L" skips two of three
+        channels on monochrome pages.
+        """
+        return "L" if GRAYSCALE_PATH and self.grayscale else "RGB"
+
+
+# =====================================================
+# MASKS
+# =====================================================
+def content_mask(gray: np.ndarray, white: float = WHITE_LEVEL) -> np.ndarray:
+    """
+    Ink / content pixels of a page render (gray 0..255).
+    """
+    return gray < white
+
+
+def active_mask(residual: np.ndarray, level: float = ACTIVE_LEVEL) -> np.ndarray:
+    """
+    Pixels of a residual map that carry signal. The default level is for
+    0..255 maps; a scorer working on another scale passes its own.
+    """
+    return residual > level
+
+
+def watermark_mask(rgb: np.ndarray) -> np.ndarray:
+    """
+    Bright, unsaturated pixels (HSV V > 200, S < 40) without an HSV conversion:
+    V = max(R, G, B), S = 255 * (V - min) / V.
+    """
+    rgb = np.asarray(rgb)
+    v = rgb.max(axis=2).astype(np.float32)
+    spread = v - rgb.min(axis=2)
+    # S < 40  <=>  255 * spread < 40 * V   (no division, V = 0 is never bright)
+    return (v > WATERMARK_V) & (255.0 * spread < WATERMARK_S * v)
+
+
+# =====================================================
+# CONTENT BOUNDING BOX
+# =====================================================
+def _align(lo: int, hi: int, limit: int) -> Tuple[int, int]:
+    lo = max(0, (lo - CONTENT_PAD) // MCU * MCU)
+    hi = min(limit, -(-(hi + CONTENT_PAD) // MCU) * MCU)
+    return lo, hi
+
+
+def content_box(mask: np.ndarray) -> Optional[Box]:
+    """
+    MCU-aligned bounding box of a content mask; None for a blank page.
+    """
+    rows = np.flatnonzero(mask.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+
+    upper, lower = _align(int(rows[0]), int(rows[-1]) + 1, mask.shape[0])
+    left, right = _align(int(cols[0]), int(cols[-1]) + 1, mask.shape[1])
+    return left, upper, right, lower
+
+
+def chroma(image: Image.Image) -> Tuple[float, int]:
+    """
+    (share of sampled pixels whose channels disagree by more than CHROMA_TOL,
+    size of the largest 8-connected region of them).
+
+    Regions are only measured below CHROMA_FRACTION, where the page could
+    still pass as grayscale.
+    """
+    if image.mode in ("L", "1"):
+        return 0.0, 0
+    rgb = np.asarray(image.convert("RGB"))[::CHROMA_STRIDE, ::CHROMA_STRIDE]
+    if rgb.size == 0:
+        return 0.0, 0
+    spread = rgb.max(axis=2).astype(np.int16) - rgb.min(axis=2)
+    colored = spread > CHROMA_TOL
+
+    count = int(np.count_nonzero(colored))
+    fraction = count / float(spread.size)
+    if count == 0 or fraction >= CHROMA_FRACTION:
+        return fraction, count
+
+    ys, xs = np.nonzero(colored)
+    sparse = SparseMap(colored.shape, ys.astype(np.int64) * colored.shape[1] + xs, np.ones((count, 1), np.uint8))
+    return fraction, int(components(sparse).area.max())
+
+
+def analyze_page(image: Image.Image) -> PageContent:
+    """
+    One pass over the page render: content mask -> bounding box, plus
+    chroma detection for the grayscale fast path.
+    """
+    gray = np.asarray(image.convert("L"))
+    mask = content_mask(gray)
+    box = content_box(mask)
+    if box is None:
+        box = (0, 0, 0, 0)
+    return PageContent(box, image.size, int(np.count_nonzero(mask)), *chroma(image))
+
+
+_CACHE_SIZE = 4 * int(os.getenv("FORENSICS_MAP_CACHE", "64"))
+_content_cache: "OrderedDict[tuple, PageContent]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def page_content(page_path: str, image: Optional[Image.Image] = None) -> PageContent:
+    """
+    analyze_page() for a page image on disk, computed once per file version
+    and shared by every map generator and scorer.
+
+    Pass `image` when the caller already has the page decoded.
+    """
+    key = (page_path, os.path.getmtime(page_path))
+
+    with _cache_lock:
+        if key in _content_cache:
+            _content_cache.move_to_end(key)
+            return _content_cache[key]
+
+    if image is not None:
+        content = analyze_page(image)
+    else:
+        with Image.open(page_path) as im:
+            content = analyze_page(im)
+
+    with _cache_lock:
+        _content_cache[key] = content
+        while len(_content_cache) > _CACHE_SIZE:
+            _content_cache.popitem(last=False)
+
+    return content
+
+
+def crop_to_content(image: Image.Image) -> Image.Image:
+    """
+    Crop an in-memory map to the content box it was computed on
+    (forensic_maps stores it in image.info); other images are returned as-is.
+    Pixels outside the box are zero, so masks and percentiles do not change.
+    """
+    box = image.info.get("content_box")
+    if box is None or tuple(box) == (0, 0) + image.size:
+        return image
+    if box[2] <= box[0] or box[3] <= box[1]:
+        # Blank page: keep the (all-zero) map, scorers expect a non-empty array
+        return image
+    return image.crop(box)
@@ -0,0 +1,90 @@
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class MaxPageScan:
+    """
+    Page iterator for scorers that reduce pages with max(page_scores).
+
+    Once one page has hit `cap` the document score cannot change any more,
+    so iteration stops and the remaining pages are never decoded or scored.
+
+    Usage:
+        scan = MaxPageScan(iter_evidence(folder, "ELA"), total=n_pages)
+        for name, img in scan:
+            ...
+            scan.add(score)
+        doc_score = scan.value
+
+    on_page(page_number, score), when given, is called for every added page
+    (progressive results in the UI).
+    """
+
+    def __init__(
+        self,
+        pages: Iterable[T],
+        cap: float = 1.0,
+        total: Optional[int] = None,
+        on_page: Optional[Callable[[int, float], None]] = None
+    ):
+        self._pages = pages
+        self.cap = cap
+        self.total = total
+        self.on_page = on_page
+        self.page_scores = []
+        self.pages_seen = 0
+        self._max = None
+
+    def __iter__(self) -> Iterator[T]:
+        pages = iter(self._pages)
+
+        # Check before pulling the next page, so a saturated scan never decodes one more
+        while not self.saturated:
+            try:
+                item = next(pages)
+            except StopIteration:
+                return
+
+            self.pages_seen += 1
+            yield item
+
+    def add(self, score: float) -> None:
+        score = float(score)
+        self.page_scores.append(score)
+        self._max = score if self._max is None else max(self._max, score)
+
+        if self.on_page is not None:
+            self.on_page(len(self.page_scores), score)
+
+    @property
+    def saturated(self) -> bool:
+        return self._max is not None and self._max >= self.cap
+
+    @property
+    def value(self) -> float:
+        return self._max if self._max is not None else 0.0
+
+    @property
+    def stopped_early(self) -> bool:
+        return self.saturated and self.pages_skipped > 0
+
+    @property
+    def pages_skipped(self) -> int:
+        if not self.saturated or self.total is None:
+            return 0
+        return max(0, self.total - self.pages_seen)
+
+    def report(self, stats: Optional[dict] = None) -> dict:
+        """
+        Page counters, optionally merged into a caller-provided dict.
+        """
+        out = {
+            "pages_scored": self.pages_seen,
+            "pages_skipped": self.pages_skipped,
+            "stopped_early": self.stopped_early,
+        }
+        if stats is not None:
+            stats.update(out)
+        return out
@@ -1,4 +1,5 @@
 import os
+import sys
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 from reportlab.pdfgen import canvas
@@ -123,10 +124,70 @@ def generate_statement(misalign_px, noise_sigma, blur_radius, jpeg_quality):
 def random_amount():
     return np.random.uniform(120, 12000)
 
+# ==================================================
+# BORN-DIGITAL VARIANT (real text layer, no raster)
+# ==================================================
+def generate_statement_pdf(pdf_path, misalign_px):
+    """
+    Same layout and the same misalign_px jitter as generate_statement, but
+    drawn as PDF text: a test case for the text-layer font alignment check.
+    """
+    # Layout coordinates are the 150 DPI pixels used above
+    sx = A4[0] / W
+    sy = A4[1] / H
+
+    def text(c, x, y, s, font, size):
+        c.setFont(font, size * sy)
+        c.drawString(x * sx, A4[1] - (y + size) * sy, s)
+
+    c = canvas.Canvas(pdf_path, pagesize=A4)
+
+    text(c, 130, 45, "Standard Chartered", "Helvetica", 28)
+    y = 170
+    text(c, 60, y, "Credit Card Statement", "Helvetica", 28)
+    y += 50
+
+    meta = [
+        ("Account Holder", "BABIN DAS"),
+        ("Account Number", "109000000671452"),
+        ("Statement Period", "12 Nov 2024 – 11 Dec 2024"),
+        ("Credit Limit (INR)", "100,500.00"),
+        ("Total Due (INR)", "19,998.61"),
+        ("Minimum Due (INR)", "1,998.61"),
+    ]
+
+    for k, v in meta:
+        text(c, 60, y, k, "Helvetica", 28)
+        text(c, 520 + np.random.randint(-misalign_px, misalign_px + 1), y, v, "Courier", 26)
+        y += 38
+
+    y += 15
+    text(c, 60, y + 8, "Transactions", "Helvetica", 28)
+    y += 55
+
+    for i in range(30):
+        text(c, 60, y, f"{i+1:02d}/12/24", "Helvetica", 28)
+        text(c, 180, y, f"Retail Spend #{i+1}", "Courier", 26)
+        text(
+            c,
+            920 + np.random.randint(-misalign_px, misalign_px + 1),
+            y,
+            f"{random_amount():,.2f}",
+            "Helvetica",
+            28,
+        )
+        y += 32
+
+        if y > H - 100:
+            break
+
+    c.showPage()
+    c.save()
+
 # ==================================================
 # GENERATE ALL PDFs (ALL HEAVILY MANIPULATED)
 # ==================================================
-def generate_all():
+def generate_all(born_digital=False):
     specs = [
         ("manipulated_A.pdf", 12, 14.0, 1.2, 55),
         ("manipulated_B.pdf", 18, 20.0, 1.8, 45),
@@ -134,10 +195,18 @@ def generate_all():
     ]
 
     for name, misalign, noise, blur, quality in specs:
+        if born_digital:
+            generate_statement_pdf(os.path.join(OUT_DIR, name.replace(".pdf", "_digital.pdf")), misalign)
+            continue
         img = generate_statement(misalign, noise, blur, quality)
         embed_pdf(img, os.path.join(OUT_DIR, name), quality)
 
+    if born_digital:
+        # Control: same layout, no jitter
+        generate_statement_pdf(os.path.join(OUT_DIR, "clean_digital.pdf"), 0)
+
     print("✅ All heavily manipulated PDFs generated.")
 
 if __name__ == "__main__":
-    generate_all()
+    # python pdf_genrator.py --born-digital  -> text-layer PDFs instead of rasters
+    generate_all(born_digital="--born-digital" in sys.argv)
@@ -0,0 +1,86 @@
+import os
+from typing import Callable, Optional
+
+from details import render_pdf
+from forensics import process_folder
+from final_runner import run_scoring
+from pipeline_stages import plan_stages
+from workspace import Workspace, create_workspace
+from events import EventSink, emit
+from doc_context import DocumentContext
+
+
+def analyze_document(
+    record_id: int,
+    pdf_path: str,
+    progress: Optional[Callable[[str, float], None]] = None,
+    workspace: Optional[Workspace] = None,
+    on_event: Optional[EventSink] = None
+) -> dict:
+    """
+    Render -> forensics -> scoring for ONE document, in the calling process.
+
+    Same steps the UI used to run as `python details.py` / `python forensics.py`
+    subprocesses, but only for this PDF and without a cold interpreter start.
+
+    Every artifact goes to `workspace` (a fresh private one if not given), so
+    any number of analyses can run side by side without seeing each other's files.
+    progress(stage, fraction 0..1) is called as the run advances (optional).
+    on_event(kind, payload) streams partial results (optional, see events.py).
+
+    The PDF is parsed once (DocumentContext) and shared by rendering and scoring.
+    """
+    if workspace is None:
+        workspace = create_workspace()
+
+    last_stage = [None]
+
+    def report(stage: str, fraction: float) -> None:
+        if stage != last_stage[0]:
+            last_stage[0] = stage
+            emit(on_event, "stage", stage=stage)
+        if progress is not None:
+            progress(stage, round(fraction, 3))
+
+    def rendered(done: int, total: int) -> None:
+        emit(on_event, "pages_rendered", done=done, total=total)
+        report("render", 0.4 * done / max(total, 1))
+
+    pdf_base = os.path.splitext(os.path.basename(pdf_path))[0]
+    img_folder = os.path.join(workspace.images, pdf_base)
+
+    needed_stages, _ = plan_stages()
+
+    with DocumentContext(pdf_path) as context:
+        # -------------------------------------------------
+        # RENDER (0% – 40%)
+        # -------------------------------------------------
+        if "Images" in needed_stages:
+            report("render", 0.0)
+            render_pdf(
+                pdf_path,
+                img_folder,
+                progress=rendered,
+                context=context
+            )
+
+        # -------------------------------------------------
+        # FORENSICS (40% – 50%)
+        # -------------------------------------------------
+        report("forensics", 0.4)
+        process_folder(img_folder, os.path.join(workspace.forensics, pdf_base), needed_stages)
+
+        # -------------------------------------------------
+        # SCORING + ML (50% – 100%)
+        # -------------------------------------------------
+        report("scoring", 0.5)
+        final_report = run_scoring(
+            record_id=record_id,
+            pdf_path=pdf_path,
+            workspace=workspace,
+            on_event=on_event,
+            context=context
+        )
+
+    report("done", 1.0)
+    return final_report
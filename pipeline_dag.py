@@ -0,0 +1,89 @@
+import time
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+
+class Node(NamedTuple):
+    """
+    One pipeline step. `fn` is called with its dependencies as keyword args.
+    """
+    name: str
+    deps: Tuple[str, ...]
+    fn: Callable[..., Any]
+
+
+def build_graph(nodes: Iterable[Node], inputs: Iterable[str] = ()) -> Dict[str, Node]:
+    """
+    Validates node names / dependencies. `inputs` are names supplied by DocumentRun.
+    """
+    inputs = set(inputs)
+    graph = {}
+    for node in nodes:
+        if node.name in graph:
+            raise ValueError(f"Duplicate pipeline node: {node.name}")
+        graph[node.name] = node
+
+    for node in graph.values():
+        missing = [d for d in node.deps if d not in graph and d not in inputs]
+        if missing:
+            raise ValueError(f"Node '{node.name}' depends on unknown nodes: {missing}")
+
+    return graph
+
+
+class DocumentRun:
+    """
+    Memoized evaluation of a pipeline DAG for ONE document.
+
+    - Every node runs at most once per run, no matter how many nodes depend on it
+    - Inputs (pdf_path, forensic_output_dir, ...) are passed as constant nodes
+    - Per-node wall time is kept in `timings` for the report
+    - on_result(name, value) fires once per node as soon as its value is known
+    """
+
+    def __init__(
+        self,
+        graph: Dict[str, Node],
+        on_result: Optional[Callable[[str, Any], None]] = None,
+        **inputs: Any
+    ):
+        self.graph = graph
+        self.results: Dict[str, Any] = dict(inputs)
+        self.timings: Dict[str, float] = {}
+        self.on_result = on_result
+        self._running = set()
+
+    def get(self, name: str) -> Any:
+        if name in self.results:
+            return self.results[name]
+
+        if name not in self.graph:
+            raise KeyError(f"Unknown pipeline node: {name}")
+
+        if name in self._running:
+            raise ValueError(f"Cycle detected at pipeline node: {name}")
+
+        node = self.graph[name]
+        self._running.add(name)
+        try:
+            kwargs = {dep: self.get(dep) for dep in node.deps}
+
+            start = time.perf_counter()
+            value = node.fn(**kwargs)
+            self.timings[name] = round(time.perf_counter() - start, 4)
+        finally:
+            self._running.discard(name)
+
+        self._store(name, value)
+        return value
+
+    def provide(self, name: str, value: Any) -> None:
+        """
+        Fix a node's value without running it (e.g. a scorer skipped by a bound).
+        """
+        self.timings.setdefault(name, 0.0)
+        self._store(name, value)
+
+    def _store(self, name: str, value: Any) -> None:
+        self.results[name] = value
+        if self.on_result is not None:
+            self.on_result(name, value)
@@ -0,0 +1,128 @@
+import os
+from typing import Iterable, List, Optional, Tuple
+
+
+# =====================================================
+# STAGES: what each stage reads and what it writes
+# =====================================================
+# "pdf" is the uploaded file itself (always available)
+STAGES = {
+    "Images": {"inputs": ("pdf",), "output": "Images"},
+    "Preprocessed": {"inputs": ("Images",), "output": "Preprocessed"},
+    "ELA": {"inputs": ("Images",), "output": "ELA"},
+    "Compression": {"inputs": ("Images",), "output": "Compression"},
+    "Noise": {"inputs": ("Images",), "output": "Noise"},
+    "Font_Alignment": {"inputs": ("Images",), "output": "Font_Alignment"},
+}
+
+# The default "legacy" engine scores noise from the Noise evidence images;
+# FORENSICS_NOISE_ENGINE=tiles (noise_engine.py) works on the page renders
+# directly. Its thresholds are not calibrated yet, so it is opt-in.
+NOISE_ENGINE = os.getenv("FORENSICS_NOISE_ENGINE", "legacy").strip().lower()
+
+# =====================================================
+# SCORERS: which artifacts each scorer reads
+# =====================================================
+# cost      -> relative run time, cheapest scorers run first in staged mode
+# max_score -> highest value the scorer can return (bound for compute_final_score)
+# gate      -> (value, [(below, max_score), ...]) tighter bound once that value is known
+#              (set by declare_gate: a gate belongs to the deployed implementation)
+# default   -> score used when the scorer fails or times out (concurrent mode)
+# provides  -> DAG value the scorer resolves that gates another scorer
+SCORERS = {
+    # producer / creator fields only, far cheaper than any raster scorer
+    "metadata": {"inputs": ("pdf",), "cost": 2, "max_score": 0.8, "default": 0.2},
+    "compression": {
+        "inputs": ("Compression",),
+        "cost": 20,
+        "max_score": 1.0,
+        "default": 0.0,
+        "provides": "compression_gate",
+    },
+    # compute_ela_score is passed the compression score (cw4updated gates on it)
+    "ela": {
+        "inputs": ("ELA", "Compression"),
+        "cost": 30,
+        "max_score": 1.0,
+        "default": 0.0,
+    },
+    "noise": {
+        "inputs": ("Noise",) if NOISE_ENGINE == "legacy" else ("Images",),
+        "cost": 40,
+        "max_score": 1.0,
+        "default": 0.0,
+    },
+    "font": {"inputs": ("Font_Alignment",), "cost": 40, "max_score": 1.0, "default": 0.0},
+}
+
+
+def declare_gate(name: str, value: str, bands) -> None:
+    """
+    Bound SCORERS[name] by the DAG value `value` with (below, max_score)
+    bands - only for an implementation that really applies them
+    (cw4updated.COMPRESSION_GATE for ELA). No bands: ungated.
+    """
+    if bands:
+        SCORERS[name]["gate"] = (value, [(float(b), float(c)) for b, c in bands])
+    else:
+        SCORERS[name].pop("gate", None)
+
+
+def gate_cap(name: str, gate_value: float) -> float:
+    """
+    Highest score SCORERS[name] can return once its gate value is known
+    (its max_score when it has no gate or the gate is open).
+    """
+    spec = SCORERS[name]
+    gate = spec.get("gate")
+    if gate:
+        for below, capped in gate[1]:
+            if gate_value < below:
+                return float(capped)
+    return float(spec["max_score"])
+
+
+def active_scorers() -> List[str]:
+    """
+    Scorer set for this run.
+
+    FORENSICS_SCORERS=ela,compression limits the run; default is every scorer.
+    """
+    raw = os.getenv("FORENSICS_SCORERS", "").strip()
+    if not raw:
+        return list(SCORERS)
+
+    names = [n.strip().lower() for n in raw.split(",") if n.strip()]
+    unknown = [n for n in names if n not in SCORERS]
+    if unknown:
+        raise ValueError(f"Unknown scorers in FORENSICS_SCORERS: {unknown}")
+
+    return names
+
+
+def plan_stages(scorers: Optional[Iterable[str]] = None) -> Tuple[List[str], List[str]]:
+    """
+    Returns (needed_stages, pruned_stages) for a scorer set.
+
+    A stage is needed only if its output is read by an active scorer,
+    directly or through another needed stage. Everything else is pruned.
+    """
+    scorers = list(scorers) if scorers is not None else active_scorers()
+
+    producers = {spec["output"]: name for name, spec in STAGES.items()}
+
+    needed = set()
+    pending = [art for s in scorers for art in SCORERS[s]["inputs"]]
+
+    while pending:
+        artifact = pending.pop()
+        stage = producers.get(artifact)
+        if stage is None or stage in needed:
+            continue
+
+        needed.add(stage)
+        pending.extend(STAGES[stage]["inputs"])
+
+    ordered = [name for name in STAGES if name in needed]
+    pruned = [name for name in STAGES if name not in needed]
+    return ordered, pruned
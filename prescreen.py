@@ -0,0 +1,81 @@
+import os
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+import numpy as np
+from PIL import Image
+
+from render_manifest import area_scale
+
+
+# =====================================================
+# PARAMETERS
+# =====================================================
+THUMB_EDGE = 256            # long edge of the pre-screen thumbnail
+PAPER_LEVEL = 250.0         # thumbnail gray above this is paper (JPEG noise included)
+
+# Estimated full-resolution ink pixels below which a page is blank.
+# The guard a page has to fail is cw4updated's 500 valid ELA pixels: ELA
+# lights up both sides of every stroke, so small glyphs give up to 8.5 valid
+# ELA pixels per ink pixel (ELA > 0.04 in ela_score: 7.2, content pixels in
+# compression: 2.6), measured at zoom 2 on page numbers, "intentionally left
+# blank" lines and real PDF pages. 500 / 8.5 = 59; 30 keeps a 2x margin, so
+# a skipped page stays under every guard and scores what it would have: nothing.
+BLANK_INK_PIXELS = 30
+
+# FORENSICS_PRESCREEN=0 sends every page through the full-resolution scorers
+PRESCREEN = os.getenv("FORENSICS_PRESCREEN", "1") == "1"
+
+
+class Prescreen(NamedTuple):
+    size: Tuple[int, int]         # full page (width, height)
+    thumb_size: Tuple[int, int]
+    ink_pixels: float             # darkness-weighted ink, in full-resolution pixels
+
+
+def prescreen_image(image: Image.Image) -> Prescreen:
+    """
+    Content density from a thumbnail.
+
+    For JPEG page renders draft() makes the decoder scale down inside the
+    DCT (1/2 .. 1/8), so the full-resolution page is never decoded.
+    Downscaling averages thin strokes into light gray; measuring darkness
+    (not a threshold) keeps their ink mass.
+    """
+    size = image.size
+    image.draft("L", (THUMB_EDGE, THUMB_EDGE))
+    thumb = image.convert("L")
+    thumb.thumbnail((THUMB_EDGE, THUMB_EDGE))
+
+    gray = np.asarray(thumb, dtype=np.float32)
+    darkness = np.clip(PAPER_LEVEL - gray, 0.0, None) / PAPER_LEVEL
+    coverage = float(darkness.mean()) if darkness.size else 0.0
+
+    return Prescreen(size, thumb.size, coverage * size[0] * size[1])
+
+
+@lru_cache(maxsize=1024)
+def _prescreen(page_path: str, mtime: float) -> Prescreen:
+    with Image.open(page_path) as im:
+        return prescreen_image(im)
+
+
+def prescreen_page(page_path: str) -> Prescreen:
+    return _prescreen(page_path, os.path.getmtime(page_path))
+
+
+def is_blank(page_path: str) -> bool:
+    """
+    True for near-blank pages (cover, "intentionally left blank", T&C backs)
+    that skip the full-resolution pipeline. Unreadable pages are not blank:
+    the scorers decide what to do with them.
+    """
+    if not PRESCREEN:
+        return False
+    try:
+        screen = prescreen_page(page_path)
+        scale = area_scale(os.path.dirname(page_path), os.path.basename(page_path))
+    except Exception:
+        return False
+    # BLANK_INK_PIXELS is set at the reference render zoom
+    return screen.ink_pixels < BLANK_INK_PIXELS * scale
@@ -0,0 +1,71 @@
+import json
+import os
+from typing import Dict, Optional
+
+
+MANIFEST_NAME = "render_manifest.json"
+
+# Every pixel-count threshold in the scorers was calibrated on pages rendered at this zoom
+REFERENCE_ZOOM = 2.0
+
+
+def write_manifest(output_folder: str, pages: Dict[str, dict]) -> str:
+    """
+    Record the resolution each page image was rendered at (details.render_pdf).
+    """
+    path = os.path.join(output_folder, MANIFEST_NAME)
+    tmp_path = os.path.join(output_folder, "." + MANIFEST_NAME)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"reference_zoom": REFERENCE_ZOOM, "pages": pages}, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+_manifests: Dict[tuple, dict] = {}
+
+
+def read_manifest(images_dir: str) -> Optional[dict]:
+    """
+    The page folder's manifest, or None for renders made before it existed
+    (those are all at REFERENCE_ZOOM).
+    """
+    path = os.path.join(images_dir, MANIFEST_NAME)
+    try:
+        key = (path, os.path.getmtime(path))
+    except OSError:
+        return None
+
+    if key not in _manifests:
+        with open(path, "r", encoding="utf-8") as f:
+            _manifests[key] = json.load(f)
+    return _manifests[key]
+
+
+def page_zoom(images_dir: str, page_name: str) -> float:
+    """
+    Zoom of one page image; evidence files share the page's stem (page-N.jpg).
+    """
+    manifest = read_manifest(images_dir)
+    if not manifest:
+        return REFERENCE_ZOOM
+
+    pages = manifest.get("pages", {})
+    stem = os.path.splitext(page_name)[0]
+    for name, info in pages.items():
+        if os.path.splitext(name)[0] == stem:
+            return float(info.get("zoom", REFERENCE_ZOOM))
+    return REFERENCE_ZOOM
+
+
+def length_scale(images_dir: str, page_name: str) -> float:
+    """
+    Factor for thresholds in pixels along one axis (widths, tile sizes).
+    """
+    return page_zoom(images_dir, page_name) / REFERENCE_ZOOM
+
+
+def area_scale(images_dir: str, page_name: str) -> float:
+    """
+    Factor for pixel-count thresholds: (zoom / REFERENCE_ZOOM) ** 2.
+    """
+    return length_scale(images_dir, page_name) ** 2
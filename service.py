@@ -0,0 +1,377 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from batch_score import _preload, score_document
+from uploads import CHUNK_SIZE, HashingWriter, SavedUpload
+from workspace import WORKSPACE_ROOT
+
+
+SERVICE_UPLOAD_DIR = os.path.join(WORKSPACE_ROOT, "service-uploads")
+
+MAX_UPLOAD_BYTES = int(os.getenv("FORENSICS_MAX_UPLOAD_MB", "50")) * 1024 * 1024
+
+# A rejected body is read and dropped up to this much after the response, so
+# a client still sending gets the answer instead of a connection reset
+DRAIN_BYTES = 256 * 1024
+DRAIN_TIMEOUT = 2.0
+
+
+class ScoringService:
+    """
+    Admission control in front of a pool of warm scoring processes.
+
+    - at most `workers` documents are scored at once
+    - at most `queue_depth` more wait for a slot; anything beyond that is
+      rejected immediately (429) instead of piling up
+    - a document that runs longer than `timeout` seconds gets 504; the worker
+      process cannot be interrupted, so its slot is only released when it ends
+    """
+
+    def __init__(self, workers: int, queue_depth: int, timeout: float):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_preload)
+        self.slots = asyncio.Semaphore(workers)
+        self.in_flight = 0
+        self.waiting = 0
+        self.served = 0
+        self.rejected = 0
+        self.started = time.time()
+
+    def admit(self) -> bool:
+        if self.in_flight + self.waiting >= self.workers + self.queue_depth:
+            self.rejected += 1
+            return False
+        self.waiting += 1
+        return True
+
+    async def score(self, pdf_path: str) -> dict:
+        """
+        Call only after admit() returned True. The uploaded PDF is deleted
+        once its worker is done with it.
+        """
+        loop = asyncio.get_running_loop()
+
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        future = loop.run_in_executor(self.pool, score_document, pdf_path)
+
+        def release(_):
+            self.in_flight -= 1
+            self.slots.release()
+            _remove(pdf_path)
+
+        # The slot follows the worker, not the HTTP request (see timeout note above)
+        future.add_done_callback(release)
+
+        report = await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+        self.served += 1
+        return report
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queued": self.waiting,
+            "queue_depth": self.queue_depth,
+            "served": self.served,
+            "rejected": self.rejected,
+            "uptime_seconds": round(time.time() - self.started, 1),
+        }
+
+
+# =====================================================
+# MINIMAL HTTP/1.1 (one request per connection)
+# =====================================================
+async def _send(writer: asyncio.StreamWriter, status: HTTPStatus, body: dict, headers: Optional[dict] = None) -> None:
+    payload = json.dumps(body).encode("utf-8")
+    lines = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(payload)}",
+        "Connection: close",
+    ]
+    for name, value in (headers or {}).items():
+        lines.append(f"{name}: {value}")
+
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+    await writer.drain()
+
+
+async def _reject(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    length: int,
+    status: HTTPStatus,
+    body: dict,
+    headers: Optional[dict] = None
+) -> None:
+    """
+    Answer without reading the body, then half-close and drain what the
+    client already sent (up to DRAIN_BYTES) before the connection closes.
+    """
+    await _send(writer, status, body, headers)
+    if writer.can_write_eof():
+        writer.write_eof()
+
+    remaining = min(max(length, 0), DRAIN_BYTES)
+    try:
+        while remaining > 0:
+            chunk = await asyncio.wait_for(reader.read(min(CHUNK_SIZE, remaining)), timeout=DRAIN_TIMEOUT)
+            if not chunk:
+                break
+            remaining -= len(chunk)
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Tuple[str, str, dict]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    request_line, *header_lines = head.decode("latin-1").split("\r\n")
+    method, target, _ = request_line.split(" ", 2)
+
+    headers = {}
+    for line in header_lines:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return method.upper(), target, headers
+
+
+async def _save_body(reader: asyncio.StreamReader, length: int, filename: str) -> SavedUpload:
+    """
+    Stream the request body to disk in chunks (never fully in memory),
+    hashing it on the way (uploads.HashingWriter).
+    """
+    safe_name = os.path.basename(filename) or "upload.pdf"
+    writer = HashingWriter(os.path.join(SERVICE_UPLOAD_DIR, f"{uuid.uuid4().hex}_{safe_name}"))
+
+    remaining = length
+    try:
+        while remaining > 0:
+            chunk = await reader.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                raise ConnectionError("client closed the connection mid-upload")
+            writer.write(chunk)
+            remaining -= len(chunk)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
+
+
+def make_handler(service: ScoringService):
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        pdf_path = None
+        scoring = False
+        try:
+            method, target, headers = await asyncio.wait_for(_read_head(reader), timeout=30)
+            url = urlsplit(target)
+
+            if url.path == "/health" and method == "GET":
+                await _send(writer, HTTPStatus.OK, service.health())
+                return
+
+            if url.path != "/analyze":
+                await _send(writer, HTTPStatus.NOT_FOUND, {"error": "not found"})
+                return
+
+            if method != "POST":
+                await _send(writer, HTTPStatus.METHOD_NOT_ALLOWED, {"error": "use POST"}, {"Allow": "POST"})
+                return
+
+            if "content-length" not in headers:
+                await _send(writer, HTTPStatus.LENGTH_REQUIRED, {"error": "Content-Length required"})
+                return
+
+            try:
+                length = int(headers["content-length"])
+            except ValueError:
+                length = -1
+            if length <= 0:
+                await _send(writer, HTTPStatus.BAD_REQUEST, {"error": "Content-Length must be a positive integer"})
+                return
+
+            if length > MAX_UPLOAD_BYTES:
+                await _reject(
+                    reader, writer, length,
+                    HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": f"body must be 1..{MAX_UPLOAD_BYTES} bytes"}
+                )
+                return
+
+            # Reject before reading the upload: overload costs the server almost nothing
+            if not service.admit():
+                await _reject(
+                    reader, writer, length,
+                    HTTPStatus.TOO_MANY_REQUESTS, {"error": "overloaded"}, {"Retry-After": "5"}
+                )
+                return
+
+            try:
+                filename = parse_qs(url.query).get("filename", ["upload.pdf"])[0]
+                upload = await _save_body(reader, length, filename)
+                pdf_path = upload.path
+            except BaseException:
+                service.waiting -= 1
+                raise
+
+            scoring = True
+            try:
+                report = await service.score(pdf_path)
+            except asyncio.TimeoutError:
+                await _send(writer, HTTPStatus.GATEWAY_TIMEOUT, {"error": f"scoring exceeded {service.timeout}s"})
+                return
+            except Exception as e:
+                await _send(writer, HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"})
+                return
+
+            report.pop("source_pdf", None)
+            report["upload"] = {"size_bytes": upload.size, "sha256": upload.sha256}
+            await _send(writer, HTTPStatus.OK, report)
+
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError):
+            # Malformed / abandoned request: nothing useful to answer
+            pass
+
+        finally:
+            writer.close()
+            # Once scoring started the worker owns the file (it may outlive a 504)
+            if pdf_path and not scoring:
+                _remove(pdf_path)
+
+    return handle
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+async def serve(host: str, port: int, workers: int, queue_depth: int, timeout: float) -> None:
+    service = ScoringService(workers, queue_depth, timeout)
+    server = await asyncio.start_server(make_handler(service), host, port)
+
+    print(f"Forensics service on http://{host}:{port} ({workers} worker(s), queue {queue_depth}, timeout {timeout}s)")
+    print(f"  curl --data-binary @doc.pdf 'http://{host}:{port}/analyze?filename=doc.pdf'")
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.pool.shutdown(wait=False, cancel_futures=True)
+
+
+# =====================================================
+# LOCALHOST SELF-TEST (python service.py --self-test [doc.pdf])
+# =====================================================
+async def _request(port: int, head: str, body: bytes = b"") -> Tuple[int, dict]:
+    """
+    One raw HTTP request to the local service; (status, JSON body).
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+    except ConnectionError:
+        pass
+    data = await reader.read()
+    writer.close()
+
+    status_line, _, rest = data.partition(b"\r\n")
+    payload = rest.split(b"\r\n\r\n", 1)[-1]
+    return int(status_line.split(b" ")[1]), json.loads(payload or b"null")
+
+
+async def self_test(pdf_path: Optional[str] = None, timeout: float = 600.0) -> bool:
+    """
+    Start the service on an ephemeral localhost port and check every
+    response path. With `pdf_path` the full pipeline is run once as well.
+    """
+    service = ScoringService(workers=1, queue_depth=0, timeout=timeout)
+    server = await asyncio.start_server(make_handler(service), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    def post(length, extra: str = "") -> str:
+        return f"POST /analyze?filename=t.pdf HTTP/1.1\r\nHost: localhost\r\nContent-Length: {length}\r\n{extra}\r\n"
+
+    checks = [
+        ("health", "GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n", b"", HTTPStatus.OK),
+        ("unknown path", "GET /nope HTTP/1.1\r\nHost: localhost\r\n\r\n", b"", HTTPStatus.NOT_FOUND),
+        ("wrong method", "GET /analyze HTTP/1.1\r\nHost: localhost\r\n\r\n", b"", HTTPStatus.METHOD_NOT_ALLOWED),
+        ("no length", "POST /analyze HTTP/1.1\r\nHost: localhost\r\n\r\n", b"", HTTPStatus.LENGTH_REQUIRED),
+        ("bad length", post("abc"), b"", HTTPStatus.BAD_REQUEST),
+        ("empty body", post(0), b"", HTTPStatus.BAD_REQUEST),
+        # The client is still sending when the 413 goes out
+        ("too large", post(MAX_UPLOAD_BYTES + 1), b"%" * DRAIN_BYTES, HTTPStatus.REQUEST_ENTITY_TOO_LARGE),
+    ]
+
+    ok = True
+    try:
+        async with server:
+            for name, head, body, expected in checks:
+                status, _ = await _request(port, head, body)
+                ok &= status == expected
+                print(f"{'ok  ' if status == expected else 'FAIL'} {name}: {status} (expected {expected.value})")
+
+            # Every slot taken (queue depth 0): the next upload is turned away
+            service.in_flight += 1
+            status, _ = await _request(port, post(4096), b"%" * 4096)
+            service.in_flight -= 1
+            ok &= status == HTTPStatus.TOO_MANY_REQUESTS
+            print(f"{'ok  ' if status == 429 else 'FAIL'} overloaded: {status} (expected 429)")
+
+            if pdf_path:
+                with open(pdf_path, "rb") as f:
+                    data = f.read()
+                status, report = await _request(port, post(len(data)), data)
+                passed = status == HTTPStatus.OK and "final_result" in (report or {})
+                ok &= passed
+                print(f"{'ok  ' if passed else 'FAIL'} analyze {os.path.basename(pdf_path)}: {status}")
+    finally:
+        service.pool.shutdown(wait=False, cancel_futures=True)
+
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTP scoring service (POST /analyze, GET /health)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--queue-depth", type=int, default=8, help="requests allowed to wait for a worker")
+    parser.add_argument("--timeout", type=float, default=600.0, help="seconds per document")
+    parser.add_argument(
+        "--self-test", nargs="?", const="", metavar="PDF",
+        help="check the service on an ephemeral localhost port (and score PDF once, if given), then exit"
+    )
+    args = parser.parse_args()
+
+    if args.self_test is not None:
+        raise SystemExit(0 if asyncio.run(self_test(args.self_test or None, args.timeout)) else 1)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.queue_depth, args.timeout))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
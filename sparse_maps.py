@@ -0,0 +1,163 @@
+from typing import NamedTuple, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+class SparseMap(NamedTuple):
+    """
+    A residual map (ELA / Compression) as its non-zero pixels only.
+
+    Clean, text-light pages are almost entirely zero, so memory and every
+    kernel below scale with the number of active pixels, not the page area.
+    """
+    shape: Tuple[int, int]   # (height, width) of the full page
+    index: np.ndarray        # flat row-major pixel index, sorted (int32; int64 past 2**31 pixels)
+    values: np.ndarray       # [n, channels] uint8 values at those pixels
+
+    @property
+    def rows(self) -> np.ndarray:
+        return self.index // self.shape[1]
+
+    @property
+    def cols(self) -> np.ndarray:
+        return self.index % self.shape[1]
+
+    @property
+    def page_pixels(self) -> int:
+        return self.shape[0] * self.shape[1]
+
+    @property
+    def density(self) -> float:
+        return self.index.size / float(max(1, self.page_pixels))
+
+    def gray(self) -> np.ndarray:
+        """
+        Luma per active pixel, bit-identical to PIL convert("L").
+        """
+        if self.values.shape[1] == 1:
+            return self.values[:, 0]
+        rgb = self.values.astype(np.uint32)
+        return ((rgb[:, 0] * 19595 + rgb[:, 1] * 38470 + rgb[:, 2] * 7471 + 0x8000) >> 16).astype(np.uint8)
+
+    def select(self, keep: np.ndarray) -> "SparseMap":
+        return SparseMap(self.shape, self.index[keep], self.values[keep])
+
+    def to_image(self) -> Image.Image:
+        """
+        Dense image again (evidence preview / download).
+        """
+        channels = self.values.shape[1]
+        dense = np.zeros((self.page_pixels, channels), dtype=np.uint8)
+        dense[self.index] = self.values
+        dense = dense.reshape(self.shape + ((channels,) if channels > 1 else ()))
+        image = Image.fromarray(dense, mode="RGB" if channels == 3 else "L")
+
+        # Everything outside the active pixels' bounding box is zero (page_content.crop_to_content)
+        if self.index.size:
+            rows, cols = self.rows, self.cols
+            image.info["content_box"] = (int(cols.min()), int(rows[0]), int(cols.max()) + 1, int(rows[-1]) + 1)
+        return image
+
+
+def sparsify(image: Image.Image) -> SparseMap:
+    """
+    Non-zero pixels of a map image.
+
+    Maps from forensic_maps carry their content box in image.info; only
+    that region is scanned, everything outside it is zero by construction.
+    """
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    width, height = image.size
+    left, upper = 0, 0
+    box = image.info.get("content_box")
+    if box is not None and box[2] > box[0] and box[3] > box[1]:
+        left, upper = box[0], box[1]
+        image = image.crop(box)
+
+    arr = np.asarray(image)
+    if arr.ndim == 2:
+        arr = arr[:, :, None]
+
+    ys, xs = np.nonzero(arr.any(axis=2))
+    index = (ys.astype(np.int64) + upper) * width + (xs + left)
+    if height * width < 2 ** 31:
+        index = index.astype(np.int32)
+    return SparseMap((height, width), index, arr[ys, xs])
+
+
+# =====================================================
+# CONNECTED COMPONENTS (8-connectivity)
+# =====================================================
+class Components(NamedTuple):
+    labels: np.ndarray     # component id (0..count-1) per pixel of the map
+    area: np.ndarray       # per component, like cv2.CC_STAT_AREA
+    left: np.ndarray
+    top: np.ndarray
+    width: np.ndarray
+    height: np.ndarray
+
+    @property
+    def count(self) -> int:
+        return self.area.size
+
+
+# Forward half of the 8-neighbourhood: every adjacent pair is found exactly once
+_FORWARD = ((0, 1), (1, -1), (1, 0), (1, 1))
+
+
+def components(sparse: SparseMap) -> Components:
+    """
+    8-connected components of the map's active pixels, without a dense mask.
+
+    Neighbour pairs come from a binary search in the sorted pixel index,
+    then labels are merged by min-propagation with pointer jumping.
+    """
+    n = sparse.index.size
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return Components(empty, empty, empty, empty, empty, empty)
+
+    width = sparse.shape[1]
+    index, rows, cols = sparse.index, sparse.rows, sparse.cols
+
+    src, dst = [], []
+    for dy, dx in _FORWARD:
+        c = cols + dx
+        target = (rows + dy) * width + c
+        pos = np.minimum(np.searchsorted(index, target), n - 1)
+        hit = (c >= 0) & (c < width) & (index[pos] == target)
+        src.append(np.flatnonzero(hit))
+        dst.append(pos[hit])
+    src = np.concatenate(src)
+    dst = np.concatenate(dst)
+
+    # labels[i] always points at a pixel of the same component with index <= i
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[src], labels[dst])
+        merged = labels.copy()
+        np.minimum.at(merged, labels[src], low)
+        np.minimum.at(merged, labels[dst], low)
+        merged = merged[merged]
+        if np.array_equal(merged, labels):
+            break
+        labels = merged
+
+    _, labels = np.unique(labels, return_inverse=True)
+    order = np.argsort(labels, kind="stable")
+    starts = np.flatnonzero(np.r_[True, np.diff(labels[order]) != 0])
+
+    r, c = rows[order], cols[order]
+    top = np.minimum.reduceat(r, starts)
+    left = np.minimum.reduceat(c, starts)
+    return Components(
+        labels=labels,
+        area=np.diff(np.r_[starts, n]),
+        left=left,
+        top=top,
+        width=np.maximum.reduceat(c, starts) - left + 1,
+        height=np.maximum.reduceat(r, starts) - top + 1,
+    )
@@ -0,0 +1,156 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pipeline_stages import SCORERS, gate_cap
+
+
+# Scorers at or above this cost are raster scorers; with a batch runner
+# they are evaluated together (in parallel) after the cheap ones
+RASTER_COST = 30
+
+# scorer name -> compute_final_score keyword
+SCORE_KWARGS = {
+    "ela": "ela_score",
+    "noise": "noise_score",
+    "compression": "compression_score",
+    "font": "font_score",
+    "metadata": "metadata_score",
+}
+
+
+def max_score(name: str, known: Dict[str, float]) -> float:
+    """
+    Highest value a scorer can still return, given what is already known.
+    A gate value of None (its scorer failed) is unknown, not 0.
+    """
+    gate = SCORERS[name].get("gate")
+    if gate and known.get(gate[0]) is not None:
+        return gate_cap(name, known[gate[0]])
+    return float(SCORERS[name]["max_score"])
+
+
+def _fuse(fuse: Callable[..., float], values: Dict[str, float]) -> float:
+    return float(fuse(**{kw: values.get(name, 0.0) for name, kw in SCORE_KWARGS.items()}))
+
+
+def risk_bounds(scores: Dict[str, float], known: Dict[str, float], fuse: Callable[..., float]) -> Tuple[float, float]:
+    """
+    (lower, upper) forensic risk with the missing scorers at 0 / at their max.
+
+    Assumes compute_final_score never decreases when one score goes up.
+    """
+    lower = _fuse(fuse, scores)
+    upper = _fuse(fuse, {
+        name: scores[name] if name in scores else max_score(name, known)
+        for name in SCORE_KWARGS
+    })
+    return lower, upper
+
+
+def contribution(name: str, scores: Dict[str, float], known: Dict[str, float], fuse: Callable[..., float]) -> float:
+    """
+    Most a missing scorer can still add to the fused risk: compute_final_score
+    with it at max_score() minus with it at 0 (other missing scorers at 0).
+
+    Measured on the fusion itself, so it follows the compute_final_score
+    weights (and the compression gate on ELA) without restating them here.
+    """
+    base = {n: v for n, v in scores.items() if n != name}
+    return max(0.0, _fuse(fuse, dict(base, **{name: max_score(name, known)})) - _fuse(fuse, base))
+
+
+def _priority(name: str, pending: List[str], scores: Dict[str, float], known: Dict[str, float], fuse: Callable[..., float]) -> float:
+    """
+    Upper bound removed per unit of cost by running `name` next; a scorer
+    that resolves another one's gate (compression -> ELA) also removes the
+    gated scorer's share.
+    """
+    provides = SCORERS[name].get("provides")
+    gated = [
+        n for n in pending
+        if provides and SCORERS[n].get("gate", ("",))[0] == provides and known.get(provides) is None
+    ]
+    gain = sum(contribution(n, scores, known, fuse) for n in [name] + gated)
+    return gain / SCORERS[name]["cost"]
+
+
+def _clean_wave(names: List[str], scores: Dict[str, float], known: Dict[str, float], fuse: Callable[..., float], clean_gate: float) -> List[str]:
+    """
+    Fewest raster scorers (largest contribution first) that, if they all come
+    back 0, leave the others unable to lift the document over the clean gate.
+    """
+    order = sorted(names, key=lambda n: contribution(n, scores, known, fuse), reverse=True)
+    for i in range(1, len(order)):
+        assumed = dict(scores, **{n: 0.0 for n in order[:i]})
+        if risk_bounds(assumed, known, fuse)[1] < clean_gate:
+            return order[:i]
+    return order
+
+
+def run_staged(
+    run,
+    scorers: List[str],
+    fuse: Callable[..., float],
+    clean_gate: float,
+    batch: Optional[Callable[[List[str]], Dict[str, float]]] = None
+) -> Tuple[List[str], float]:
+    """
+    Run scorers until the rest cannot lift the document over the clean gate.
+
+    `run` is the DocumentRun for this document (scorer names are DAG nodes).
+    Next is always the scorer that removes the most of the upper bound per
+    unit of cost (contribution / cost), so the bound falls as fast as it can;
+    scorers that can barely move the fused risk are the ones left to skip.
+
+    `batch(names)`, when given, evaluates raster scorers together (see
+    concurrent_scoring) after the cheap ones: first the smallest set that lets
+    a clean document stop, then - only if it did not - everything else.
+    Once the lower bound is over the gate nothing can be skipped, so the
+    remaining raster scorers go in one batch.
+
+    A scorer capped at 0 by a known gate (ELA under the compression gate)
+    returns exactly 0 and is skipped whatever the other scores are.
+
+    Returns (skipped scorers, forensic risk upper bound at the stop point).
+
+    Only the clean gate is used for early termination: above it the ML model
+    needs every score as a feature, so nothing else can be skipped safely.
+    The bounds assume a monotone `fuse`; if a lower bound ever comes out
+    above its upper bound, every remaining scorer is run.
+    """
+    # Inactive scorers are fixed at 0.0 from the start
+    scores = {name: 0.0 for name in SCORE_KWARGS if name not in scorers}
+    pending = list(scorers)
+    skipped = []
+
+    while pending:
+        for name in [n for n in pending if max_score(n, run.results) <= 0.0]:
+            scores[name] = 0.0
+            pending.remove(name)
+            skipped.append(name)
+        if not pending:
+            break
+
+        lower, upper = risk_bounds(scores, run.results, fuse)
+        if lower > upper:
+            # Not monotone: the upper bound proves nothing, skip nothing more
+            scores.update(batch(pending) if batch is not None else {n: run.get(n) for n in pending})
+            break
+        if upper < clean_gate:
+            return skipped + pending, upper
+
+        sequential = [n for n in pending if batch is None or SCORERS[n]["cost"] < RASTER_COST]
+        if sequential:
+            name = max(sequential, key=lambda n: _priority(n, pending, scores, run.results, fuse))
+            scores[name] = run.get(name)
+            pending.remove(name)
+            continue
+
+        if lower >= clean_gate:
+            wave = pending
+        else:
+            wave = _clean_wave(pending, scores, run.results, fuse, clean_gate)
+        scores.update(batch(wave))
+        pending = [n for n in pending if n not in wave]
+
+    return skipped, risk_bounds(scores, run.results, fuse)[1]
+
@@ -0,0 +1,193 @@
+from collections import defaultdict
+from typing import List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+
+# Same ceiling as the metadata slot it is folded into (pipeline_stages.SCORERS)
+MAX_STRUCTURE_SCORE = 0.8
+
+# An image covering more than this share of the page is a background / scan, not a patch
+FULL_PAGE_AREA = 0.8
+
+# A glyph counts as hidden when an opaque image drawn after it covers this share of its box
+HIDDEN_GLYPH_AREA = 0.5
+
+
+def _base_font(name: str) -> str:
+    """
+    'ABCDEF+Arial-Bold' -> 'Arial-Bold' (drop the 6-letter subset tag).
+    """
+    if len(name) > 7 and name[6] == "+" and name[:6].isupper():
+        return name[7:]
+    return name
+
+
+def _subset_tag(name: str) -> Optional[str]:
+    if len(name) > 7 and name[6] == "+" and name[:6].isupper():
+        return name[:6]
+    return None
+
+
+def _glyph_rects(page: "fitz.Page") -> List["fitz.Rect"]:
+    rects = []
+    for block in page.get_text("rawdict")["blocks"]:
+        for line in block.get("lines", ()):
+            for span in line["spans"]:
+                rects.extend(fitz.Rect(ch["bbox"]) for ch in span["chars"] if ch["c"].strip())
+    return rects
+
+
+def _same_rect(a: "fitz.Rect", b: "fitz.Rect", tol: float = 1.0) -> bool:
+    return all(abs(x - y) <= tol for x, y in zip(a, b))
+
+
+def _hidden_glyphs(page: "fitz.Page", images: List[Tuple[int, "fitz.Rect"]]) -> List[Tuple[int, "fitz.Rect", int]]:
+    """
+    (xref, rect, glyph count) for every opaque image painted over glyphs that
+    were drawn before it. Paint order comes from the page's bbox log, so text
+    printed on top of an image (letterheads, form backgrounds) does not count.
+    """
+    glyphs = _glyph_rects(page)
+    if not glyphs:
+        return []
+
+    found = []
+    text_drawn = []
+    for kind, bbox in page.get_bboxlog():
+        rect = fitz.Rect(bbox)
+        if kind in ("fill-text", "stroke-text"):
+            text_drawn.append(rect)
+            continue
+        if kind != "fill-image" or not text_drawn:
+            continue
+
+        xref = next((x for x, r in images if _same_rect(r, rect)), None)
+        if xref is None:
+            continue
+
+        hidden = 0
+        for glyph in glyphs:
+            covered = rect & glyph
+            if covered.is_empty or abs(covered) < HIDDEN_GLYPH_AREA * abs(glyph):
+                continue
+            if any(t.intersects(glyph) for t in text_drawn):
+                hidden += 1
+        if hidden:
+            found.append((xref, rect, hidden))
+    return found
+
+
+def structure_features(doc: "fitz.Document") -> dict:
+    """
+    Per-page font / image inventory from the object model (no rasterizing).
+
+    - single_page_fonts: fonts used on exactly one page of a multi-page document
+    - subset_mismatch_fonts: one font embedded under several subset tags on
+      the SAME page (the original subset plus the one a second tool embedded
+      for the edit). Different tags on different pages come from separate
+      embedding runs (per-page subsetting, merged files) and are ignored.
+    - overlay_images: small opaque images hiding glyphs drawn before them
+      (patched amounts)
+    """
+    font_pages = defaultdict(set)
+    font_page_tags = defaultdict(lambda: defaultdict(set))
+    overlays = []
+
+    for page in doc:
+        page_no = page.number + 1
+
+        for font in page.get_fonts(full=True):
+            name = font[3] or font[4]
+            if not name:
+                continue
+            base = _base_font(name)
+            font_pages[base].add(page_no)
+            tag = _subset_tag(name)
+            if tag:
+                font_page_tags[base][page_no].add(tag)
+
+        page_area = abs(page.rect) or 1.0
+
+        # No soft mask: the text under the image cannot show through
+        opaque = [
+            (img[0], rect)
+            for img in page.get_images(full=True) if not img[1]
+            for rect in page.get_image_rects(img[0])
+            if abs(rect) / page_area <= FULL_PAGE_AREA
+        ]
+        if opaque:
+            for xref, rect, hidden in _hidden_glyphs(page, opaque):
+                overlays.append({
+                    "page": page_no, "xref": xref, "rect": [round(v, 1) for v in rect], "hidden_glyphs": hidden
+                })
+
+    single_page = []
+    if doc.page_count > 1:
+        single_page = sorted(f for f, pages in font_pages.items() if len(pages) == 1)
+
+    return {
+        "pages": doc.page_count,
+        "fonts": len(font_pages),
+        "single_page_fonts": single_page,
+        "subset_mismatch_fonts": sorted(
+            f for f, pages in font_page_tags.items() if any(len(tags) > 1 for tags in pages.values())
+        ),
+        "overlay_images": overlays,
+    }
+
+
+def structure_risk(features: dict) -> float:
+    """
+    0.0 – 0.8 from structure_features():
+    - re-embedded (subset mismatch) font → 0.6
+    - opaque image hiding text           → 0.5 (0.6 for several)
+    - fonts used on one page only        → 0.15 each, at most 0.3
+    - +0.1 per additional kind of signal
+    """
+    signals = []
+
+    if features["subset_mismatch_fonts"]:
+        signals.append(0.6)
+
+    if features["overlay_images"]:
+        signals.append(0.6 if len(features["overlay_images"]) > 1 else 0.5)
+
+    if features["single_page_fonts"]:
+        signals.append(min(0.3, 0.15 * len(features["single_page_fonts"])))
+
+    if not signals:
+        return 0.0
+
+    return round(min(MAX_STRUCTURE_SCORE, max(signals) + 0.1 * (len(signals) - 1)), 3)
+
+
+def compute_structure_score(
+    pdf_path: Optional[str] = None,
+    doc: Optional["fitz.Document"] = None,
+    stats: Optional[dict] = None
+) -> float:
+    """
+    Structural manipulation score (0.0 – 0.8), milliseconds per document.
+
+    Pass `doc` (DocumentContext.doc) to reuse the already-open document;
+    fitz documents are not thread-safe, so only do that from one thread.
+    The features land in `stats` when given.
+    """
+    own = doc is None
+    try:
+        if own:
+            doc = fitz.open(pdf_path)
+        features = structure_features(doc)
+    except Exception as e:
+        if stats is not None:
+            stats["error"] = str(e)
+        return 0.0
+    finally:
+        if own and doc is not None and not doc.is_closed:
+            doc.close()
+
+    score = structure_risk(features)
+    if stats is not None:
+        stats.update(features)
+    return score
@@ -0,0 +1,65 @@
+import json
+
+from batch_score import completed_sources, trim_partial_line
+
+
+def write_lines(path, rows, tail=""):
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+        f.write(tail)
+
+
+ROWS = [
+    {"source_pdf": "a.pdf", "forensic_risk": 0.1},
+    {"source_pdf": "b.pdf", "error": "RuntimeError: render failed"},
+    {"source_pdf": "c.pdf", "forensic_risk": 0.7},
+]
+
+
+def test_trim_partial_line_removes_the_cut_line(tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    tail = '{"source_pdf": "d.pdf", "forensic_ri'
+    write_lines(path, ROWS, tail)
+
+    assert trim_partial_line(path) == len(tail)
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"source_pdf": "d.pdf", "forensic_risk": 0.2}) + "\n")
+    assert completed_sources(path) == {"a.pdf", "c.pdf", "d.pdf"}
+
+
+def test_trim_partial_line_longer_than_one_chunk(tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    tail = '{"source_pdf": "d.pdf", "page_scan": "' + "x" * 200000
+    write_lines(path, ROWS[:1], tail)
+
+    assert trim_partial_line(path) == len(tail)
+    assert completed_sources(path) == {"a.pdf"}
+
+
+def test_trim_partial_line_complete_or_missing_file(tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    assert trim_partial_line(path) == 0
+
+    write_lines(path, ROWS)
+    size = (tmp_path / "out.jsonl").stat().st_size
+
+    assert trim_partial_line(path) == 0
+    assert (tmp_path / "out.jsonl").stat().st_size == size
+
+
+def test_trim_partial_line_without_any_newline(tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    write_lines(path, [], '{"source_pdf": "a.pd')
+
+    assert trim_partial_line(path) == len('{"source_pdf": "a.pd')
+    assert (tmp_path / "out.jsonl").stat().st_size == 0
+
+
+def test_completed_sources_skips_failed_and_unparsable_lines(tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    write_lines(path, ROWS, '{"source_pdf": "d.pdf", "forensic_ri')
+
+    assert completed_sources(path) == {"a.pdf", "c.pdf"}
+    assert completed_sources(str(tmp_path / "missing.jsonl")) == set()
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageChops, ImageDraw
+
+from ela import perform_ela
+from forensic_maps import compression_map, ela_map, save_map
+from page_content import page_content
+
+
+def disk_compression_difference(image_path, save_path):
+    # The compression module forensics.py imports is not in this tree; this is
+    # its file-based pipeline: Q70 / Q95 files, difference scaled by the page max
+    img = Image.open(image_path).convert("RGB")
+    img.save(save_path + ".low.jpg", "JPEG", quality=70)
+    img.save(save_path + ".high.jpg", "JPEG", quality=95)
+    low = Image.open(save_path + ".low.jpg").convert("RGB")
+    high = Image.open(save_path + ".high.jpg").convert("RGB")
+
+    arr = np.array(ImageChops.difference(low, high), dtype=np.float32)
+    arr = np.clip(arr * (255.0 / max(float(arr.max()), 1.0)), 0, 255).astype(np.uint8)
+    Image.fromarray(arr, mode="RGB").save(save_path, "JPEG")
+
+
+@pytest.fixture(params=["color", "monochrome"])
+def page_path(request, tmp_path):
+    im = Image.new("RGB", (400, 520), "white")
+    draw = ImageDraw.Draw(im)
+    for i in range(12):
+        draw.text((60, 80 + 25 * i), "Invoice total 1,234.56 line %d" % i, fill=(0, 0, 0))
+    if request.param == "color":
+        draw.rectangle((250, 400, 330, 450), fill=(200, 30, 30))
+
+    path = str(tmp_path / "page_1.png")
+    im.save(path)
+    return path
+
+
+def pixels(path_or_image):
+    if isinstance(path_or_image, str):
+        with Image.open(path_or_image) as im:
+            return np.asarray(im)
+    return np.asarray(path_or_image)
+
+
+@pytest.mark.parametrize("cropped", [False, True])
+def test_ela_map_equals_perform_ela(page_path, tmp_path, cropped):
+    disk = str(tmp_path / "ela.jpg")
+    perform_ela(page_path, disk)
+    content = page_content(page_path)
+
+    with Image.open(page_path) as im:
+        in_memory = ela_map(im, box=content.box if cropped else None, mode=content.mode)
+
+    assert np.array_equal(pixels(in_memory), pixels(disk))
+
+
+@pytest.mark.parametrize("cropped", [False, True])
+def test_compression_map_equals_disk_pipeline(page_path, tmp_path, cropped):
+    disk = str(tmp_path / "compression.jpg")
+    disk_compression_difference(page_path, disk)
+    box = page_content(page_path).box if cropped else None
+
+    with Image.open(page_path) as im:
+        in_memory = compression_map(im, box=box)
+
+    assert np.array_equal(pixels(in_memory), pixels(disk))
+
+
+@pytest.mark.parametrize("kind", ["ELA", "Compression"])
+def test_save_map_writes_the_generator_file(page_path, tmp_path, kind):
+    disk = str(tmp_path / "disk.jpg")
+    saved = str(tmp_path / "saved.jpg")
+    mode = page_content(page_path).mode
+    if kind == "ELA":
+        perform_ela(page_path, disk)
+    else:
+        disk_compression_difference(page_path, disk)
+
+    with Image.open(page_path) as im:
+        save_map(kind, im, saved, mode=mode)
+
+    with open(disk, "rb") as a, open(saved, "rb") as b:
+        assert a.read() == b.read()
@@ -0,0 +1,80 @@
+import shutil
+
+import fitz  # PyMuPDF
+import pytest
+
+from pdf_structure import revision_risk, scan_file, scan_structure
+
+
+@pytest.fixture
+def original(tmp_path):
+    path = str(tmp_path / "original.pdf")
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Total: 100.00")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+@pytest.fixture
+def updated(original, tmp_path):
+    # Same file plus one incremental update that rewrites the page content
+    path = str(tmp_path / "updated.pdf")
+    shutil.copy(original, path)
+    doc = fitz.open(path)
+    doc[0].insert_text((72, 100), "Total: 900.00")
+    doc.saveIncr()
+    doc.close()
+    return path
+
+
+def test_single_revision(original):
+    structure = scan_file(original)
+
+    assert structure.revisions == 1
+    assert structure.xref_sections == 1
+    assert structure.prev_links == 0
+    assert structure.redefined_objects == 0
+    assert not structure.linearized
+    assert revision_risk(structure) == 0.0
+
+
+def test_one_incremental_update(original, updated):
+    before = scan_file(original)
+    structure = scan_file(updated)
+
+    assert structure.revisions == 2
+    assert structure.eof_offsets[0] == before.eof_offsets[0]
+    assert structure.xref_sections == 2
+    assert structure.prev_links == 1
+    assert structure.redefined_objects >= 1
+    assert revision_risk(structure) == pytest.approx(0.4)
+    # Report / pickled form
+    assert revision_risk(structure._asdict()) == revision_risk(structure)
+
+
+def test_scan_file_matches_scan_structure(updated):
+    with open(updated, "rb") as f:
+        assert scan_file(updated) == scan_structure(f.read())
+
+
+def test_linearized_file_counts_one_section_less():
+    data = (
+        b"%PDF-1.5\n1 0 obj\n<< /Linearized 1 /L 400 >>\nendobj\n"
+        b"xref\n0 1\ntrailer\n<< >>\n%%EOF\n"
+        b"2 0 obj\n<< /Type /Catalog >>\nendobj\n"
+        b"xref\n0 1\ntrailer\n<< /Prev 40 >>\n%%EOF\n"
+    )
+
+    structure = scan_structure(data)
+
+    assert structure.linearized
+    assert structure.revisions == 1
+    assert revision_risk(structure) == 0.0
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.pdf"
+    path.write_bytes(b"")
+
+    assert scan_file(str(path)).revisions == 1
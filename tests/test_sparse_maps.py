@@ -0,0 +1,84 @@
+from collections import deque
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from sparse_maps import SparseMap, components, sparsify
+
+
+def bfs_components(mask):
+    """
+    Reference 8-connected labelling: {frozenset of flat indices: (left, top, width, height)}.
+    """
+    h, w = mask.shape
+    seen = np.zeros_like(mask, dtype=bool)
+    out = {}
+    for y0, x0 in zip(*np.nonzero(mask)):
+        if seen[y0, x0]:
+            continue
+        seen[y0, x0] = True
+        queue, pixels = deque([(y0, x0)]), []
+        while queue:
+            y, x = queue.popleft()
+            pixels.append((y, x))
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    ny, nx = y + dy, x + dx
+                    if 0 <= ny < h and 0 <= nx < w and mask[ny, nx] and not seen[ny, nx]:
+                        seen[ny, nx] = True
+                        queue.append((ny, nx))
+        ys = [p[0] for p in pixels]
+        xs = [p[1] for p in pixels]
+        key = frozenset(y * w + x for y, x in pixels)
+        out[key] = (min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1)
+    return out
+
+
+def sparse_of(mask):
+    index = np.flatnonzero(mask)
+    return SparseMap(mask.shape, index, np.full((index.size, 1), 255, np.uint8))
+
+
+def by_pixels(sparse, comps):
+    out = {}
+    for i in range(comps.count):
+        key = frozenset(sparse.index[comps.labels == i].tolist())
+        assert len(key) == comps.area[i]
+        out[key] = (comps.left[i], comps.top[i], comps.width[i], comps.height[i])
+    return out
+
+
+@pytest.mark.parametrize("density", [0.02, 0.2, 0.45, 0.7])
+@pytest.mark.parametrize("seed", range(3))
+def test_components_match_bfs(density, seed):
+    mask = np.random.default_rng(seed).random((37, 53)) < density
+    sparse = sparse_of(mask)
+
+    assert by_pixels(sparse, components(sparse)) == bfs_components(mask)
+
+
+def test_components_do_not_wrap_rows():
+    # Last column of row 0 and first column of row 1 are adjacent in the flat index only
+    mask = np.zeros((3, 5), dtype=bool)
+    mask[0, 4] = mask[1, 0] = True
+    sparse = sparse_of(mask)
+
+    assert components(sparse).count == 2
+
+
+def test_components_of_empty_map():
+    assert components(sparse_of(np.zeros((4, 4), dtype=bool))).count == 0
+
+
+def test_sparsify_round_trip_and_gray():
+    rng = np.random.default_rng(7)
+    rgb = rng.integers(0, 256, (20, 30, 3)).astype(np.uint8)
+    rgb[rng.random((20, 30)) < 0.6] = 0
+    image = Image.fromarray(rgb)
+
+    sparse = sparsify(image)
+
+    assert np.array_equal(np.asarray(sparse.to_image()), rgb)
+    gray = np.asarray(image.convert("L")).reshape(-1)
+    assert np.array_equal(sparse.gray(), gray[sparse.index])
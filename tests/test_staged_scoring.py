@@ -0,0 +1,144 @@
+import pytest
+
+from concurrent_scoring import run_guarded
+from pipeline_dag import DocumentRun, Node, build_graph
+from pipeline_stages import SCORERS, declare_gate
+from staged_scoring import max_score, risk_bounds, run_staged
+
+
+CLEAN_GATE = 0.06
+
+WEIGHTS = {"ela_score": 0.35, "noise_score": 0.25, "compression_score": 0.2, "font_score": 0.1, "metadata_score": 0.1}
+
+
+def weighted_fusion(**scores):
+    # Monotone stand-in for scoring.final_score.compute_final_score
+    return sum(WEIGHTS[k] * v for k, v in scores.items())
+
+
+@pytest.fixture
+def gated_ela():
+    declare_gate("ela", "compression_gate", ((0.03, 0.0), (0.07, 0.5)))
+    yield
+    declare_gate("ela", "compression_gate", ())
+
+
+def _fail():
+    raise RuntimeError("compression map unreadable")
+
+
+def make_run(scores, compression_task=None):
+    """
+    DocumentRun shaped like final_runner's scorer nodes; `ran` lists the
+    scorers that were actually evaluated.
+    """
+    ran = []
+
+    def scorer(name):
+        def fn(**deps):
+            ran.append(name)
+            return scores.get(name, 0.0)
+        return fn
+
+    def compression_gate():
+        if compression_task is None:
+            return scores.get("compression", 0.0)
+        return run_guarded("compression", compression_task, default=None)
+
+    def compression(compression_gate):
+        ran.append("compression")
+        return SCORERS["compression"]["default"] if compression_gate is None else compression_gate
+
+    graph = build_graph([
+        Node("compression_gate", (), compression_gate),
+        Node("compression", ("compression_gate",), compression),
+        Node("ela", ("compression_gate",), scorer("ela")),
+        Node("noise", (), scorer("noise")),
+        Node("font", (), scorer("font")),
+        Node("metadata", (), scorer("metadata")),
+    ])
+    run = DocumentRun(graph)
+
+    def batch(names):
+        return {n: run.get(n) for n in names}
+
+    return run, ran, batch
+
+
+def test_risk_bounds_missing_scorers_at_zero_and_at_max():
+    lower, upper = risk_bounds({"metadata": 0.2}, {}, weighted_fusion)
+
+    assert lower == pytest.approx(0.02)
+    assert upper == pytest.approx(0.9 + 0.02)
+
+
+def test_risk_bounds_known_gate_caps_ela(gated_ela):
+    _, upper = risk_bounds({}, {"compression_gate": 0.05}, weighted_fusion)
+
+    assert max_score("ela", {"compression_gate": 0.05}) == 0.5
+    # metadata can reach 0.8 at most
+    assert upper == pytest.approx(0.35 * 0.5 + 0.25 + 0.2 + 0.1 + 0.1 * 0.8)
+
+
+def test_unknown_gate_does_not_cap_ela(gated_ela):
+    assert max_score("ela", {"compression_gate": None}) == 1.0
+
+
+def test_ungated_ela_is_not_capped():
+    assert "gate" not in SCORERS["ela"]
+    assert max_score("ela", {"compression_gate": 0.0}) == 1.0
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_clean_document_stops_before_every_scorer(gated_ela, batched):
+    run, ran, batch = make_run({})
+
+    skipped, upper = run_staged(run, list(SCORERS), weighted_fusion, CLEAN_GATE, batch=batch if batched else None)
+
+    assert skipped
+    assert not set(skipped) & set(ran)
+    assert upper < CLEAN_GATE
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_flagged_document_runs_every_scorer(batched):
+    run, ran, batch = make_run({"metadata": 0.8, "noise": 0.3})
+
+    skipped, upper = run_staged(run, list(SCORERS), weighted_fusion, CLEAN_GATE, batch=batch if batched else None)
+
+    assert skipped == []
+    assert sorted(ran) == sorted(SCORERS)
+    assert upper == pytest.approx(weighted_fusion(metadata_score=0.8, noise_score=0.3))
+
+
+def test_closed_gate_skips_ela(gated_ela):
+    run, ran, _ = make_run({"compression": 0.01, "ela": 0.9, "metadata": 0.8})
+
+    skipped, _ = run_staged(run, list(SCORERS), weighted_fusion, CLEAN_GATE)
+
+    assert "ela" in skipped
+    assert "ela" not in ran
+
+
+def test_compression_failure_does_not_disable_ela(gated_ela):
+    run, ran, _ = make_run({"ela": 0.4}, compression_task=(_fail, (), {}))
+
+    skipped, upper = run_staged(run, list(SCORERS), weighted_fusion, CLEAN_GATE)
+
+    assert run.results["compression_gate"] is None
+    assert run.results["compression"] == SCORERS["compression"]["default"]
+    assert "ela" in ran and "ela" not in skipped
+    assert upper >= 0.35 * 0.4
+
+
+def test_non_monotone_fusion_skips_nothing():
+    # Rises when ELA falls: the "upper" bound would wrongly clear the document
+    def inverted(**scores):
+        return 0.1 * (1.0 - scores["ela_score"])
+
+    run, ran, _ = make_run({})
+
+    skipped, _ = run_staged(run, list(SCORERS), inverted, CLEAN_GATE)
+
+    assert skipped == []
+    assert sorted(ran) == sorted(SCORERS)
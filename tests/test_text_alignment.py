@@ -0,0 +1,74 @@
+import fitz  # PyMuPDF
+import pytest
+
+from text_alignment import alignment_features, page_spans, text_alignment_score
+
+
+AMOUNTS = ["1,250.00", "87.50", "12,400.00", "310.25", "9.99", "4,000.00"]
+RIGHT_EDGE = 500
+FONT_SIZE = 11
+
+
+def add_invoice(doc, shift_x=None, shift_y=None, other_font=None):
+    """
+    Item labels on the left, amounts right-aligned at RIGHT_EDGE; the
+    optional arguments move / re-font one amount (by row index).
+    """
+    page = doc.new_page()
+    for i, amount in enumerate(AMOUNTS):
+        y = 120 + 22 * i
+        page.insert_text((72, y), f"Item number {i + 1} description", fontsize=FONT_SIZE)
+
+        font = "cour" if i == other_font else "helv"
+        dx = 5 if i == shift_x else 0
+        dy = 3 if i == shift_y else 0
+        width = fitz.get_text_length(amount, fontname=font, fontsize=FONT_SIZE)
+        page.insert_text((RIGHT_EDGE - width + dx, y + dy), amount, fontsize=FONT_SIZE, fontname=font)
+    return page
+
+
+def add_scanned(doc):
+    page = doc.new_page()
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 50, 50))
+    pix.clear_with(200)
+    page.insert_image(fitz.Rect(50, 50, 300, 300), pixmap=pix)
+    return page
+
+
+def test_clean_columns_score_zero():
+    doc = fitz.open()
+    features = alignment_features(page_spans(add_invoice(doc)))
+
+    assert features["values_checked"] == len(AMOUNTS)
+    assert features["misaligned_values"] == 0
+    assert features["mixed_font_values"] == 0
+    assert features["off_baseline"] == 0
+    assert text_alignment_score(doc).score == 0.0
+
+
+@pytest.mark.parametrize("jitter, feature", [
+    ({"shift_x": 2}, "misaligned_values"),
+    ({"other_font": 5}, "mixed_font_values"),
+    ({"shift_y": 4}, "off_baseline"),
+])
+def test_jittered_span_is_flagged(jitter, feature):
+    doc = fitz.open()
+    features = alignment_features(page_spans(add_invoice(doc, **jitter)))
+
+    assert features[feature] >= 1
+    assert text_alignment_score(doc).score > 0.0
+
+
+def test_pages_without_text_layer_go_to_the_raster_path():
+    doc = fitz.open()
+    add_scanned(doc)
+    doc.new_page()                      # blank: neither text nor image
+    add_invoice(doc)
+    add_invoice(doc, shift_x=2, shift_y=4, other_font=5)
+
+    result = text_alignment_score(doc)
+
+    assert result.scanned_pages == [1]
+    assert [p["page"] for p in result.pages] == [3, 4]
+    assert result.pages[0]["score"] == 0.0
+    assert result.score == result.pages[1]["score"] > 0.0
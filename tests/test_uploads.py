@@ -0,0 +1,65 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from uploads import HashingWriter, save_upload
+
+
+DATA = b"%PDF-1.4\n" + bytes(range(256)) * 300
+
+
+def test_close_renames_and_reports_size_and_hash(tmp_path):
+    path = str(tmp_path / "uploads" / "doc.pdf")
+    writer = HashingWriter(path)
+    for i in range(0, len(DATA), 1000):
+        writer.write(DATA[i:i + 1000])
+
+    # Readers never see a half-written upload under the target name
+    assert not os.path.exists(path)
+    assert os.path.exists(writer.tmp_path)
+
+    saved = writer.close()
+
+    assert saved == (path, len(DATA), hashlib.sha256(DATA).hexdigest())
+    assert open(path, "rb").read() == DATA
+    assert not os.path.exists(writer.tmp_path)
+
+
+def test_abort_drops_the_temp_file_and_keeps_the_target(tmp_path):
+    path = str(tmp_path / "doc.pdf")
+    with open(path, "wb") as f:
+        f.write(b"previous upload")
+
+    writer = HashingWriter(path)
+    writer.write(DATA[:500])
+    writer.abort()
+
+    assert not os.path.exists(writer.tmp_path)
+    assert open(path, "rb").read() == b"previous upload"
+    assert os.listdir(tmp_path) == ["doc.pdf"]
+
+
+def test_save_upload_chunks_from_the_start(tmp_path):
+    src = io.BytesIO(DATA)
+    src.read(100)
+
+    saved = save_upload(src, str(tmp_path / "doc.pdf"), chunk_size=4096)
+
+    assert saved.size == len(DATA)
+    assert saved.sha256 == hashlib.sha256(DATA).hexdigest()
+
+
+class BrokenStream(io.BytesIO):
+    def read(self, size=-1):
+        if self.tell() >= 2048:
+            raise ConnectionError("client went away")
+        return super().read(size)
+
+
+def test_save_upload_aborts_on_a_failed_read(tmp_path):
+    with pytest.raises(ConnectionError):
+        save_upload(BrokenStream(DATA), str(tmp_path / "doc.pdf"), chunk_size=1024)
+
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,195 @@
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from page_scan import MaxPageScan
+
+
+# Deviations are measured in PDF points (1/72 inch), independent of render zoom
+ALIGN_TOL_PT = 1.5          # column edge deviation that counts as misaligned
+BASELINE_TOL = 0.12         # baseline deviation, as a fraction of the font size
+COLUMN_GAP = 2.0            # x gap (in font sizes) that starts a new column
+ROW_GAP = 0.5               # y gap (in font sizes) that starts a new row
+MIN_COLUMN = 3              # spans needed before a column says anything
+
+# A page with less text than this and an image is treated as scanned
+MIN_TEXT_CHARS = 20
+
+_NUMERIC_CHARS = set("0123456789.,-+/()%₹$€£")
+
+
+class PageSpans(NamedTuple):
+    x0: np.ndarray          # left edge
+    x1: np.ndarray          # right edge
+    baseline: np.ndarray    # origin y
+    size: np.ndarray
+    font: np.ndarray        # font name per span (object array)
+    numeric: np.ndarray     # bool: span is an amount / date / number
+
+
+def _is_numeric(text: str) -> bool:
+    """
+    Amounts, dates, account numbers: digits plus separators only.
+    """
+    stripped = text.replace(" ", "")
+    return any(c.isdigit() for c in stripped) and all(c in _NUMERIC_CHARS for c in stripped)
+
+
+def page_spans(page) -> Optional[PageSpans]:
+    """
+    Span geometry from fitz page.get_text("dict"); None when the page has
+    no usable text layer.
+    """
+    rows = []
+    chars = 0
+    for block in page.get_text("dict")["blocks"]:
+        if block.get("type") != 0:
+            continue
+        for line in block["lines"]:
+            for span in line["spans"]:
+                text = span["text"].strip()
+                if not text:
+                    continue
+                chars += len(text)
+                x0, _, x1, _ = span["bbox"]
+                rows.append((x0, x1, span["origin"][1], span["size"], span["font"], _is_numeric(text)))
+
+    if chars < MIN_TEXT_CHARS:
+        return None
+
+    x0, x1, baseline, size, font, numeric = zip(*rows)
+    return PageSpans(
+        np.asarray(x0, dtype=np.float64),
+        np.asarray(x1, dtype=np.float64),
+        np.asarray(baseline, dtype=np.float64),
+        np.asarray(size, dtype=np.float64),
+        np.asarray(font, dtype=object),
+        np.asarray(numeric, dtype=bool),
+    )
+
+
+def _gap_clusters(values: np.ndarray, gap: np.ndarray) -> np.ndarray:
+    """
+    1-D clustering without loops: sort, start a new cluster wherever the
+    step to the next value exceeds `gap`. Returns a label per value.
+    """
+    order = np.argsort(values, kind="stable")
+    steps = np.diff(values[order]) > gap[order][1:]
+    labels_sorted = np.concatenate(([0], np.cumsum(steps)))
+    labels = np.empty_like(labels_sorted)
+    labels[order] = labels_sorted
+    return labels
+
+
+def _group_median(values: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """
+    Median of `values` within each label, broadcast back per element.
+    """
+    out = np.empty_like(values)
+    for label in np.unique(labels):
+        mask = labels == label
+        out[mask] = np.median(values[mask])
+    return out
+
+
+def alignment_features(spans: PageSpans) -> dict:
+    """
+    - misaligned_values: numeric spans whose column neither left- nor
+      right-aligns them within ALIGN_TOL_PT
+    - mixed_font_values: numeric spans set in a different font than the
+      rest of their column
+    - off_baseline: spans sitting off their row's baseline
+    """
+    n = len(spans.size)
+    size = np.maximum(spans.size, 1.0)
+
+    # ---- rows / baselines (all spans) ----
+    rows = _gap_clusters(spans.baseline, ROW_GAP * size)
+    baseline_dev = np.abs(spans.baseline - _group_median(spans.baseline, rows))
+    off_baseline = int(np.count_nonzero(baseline_dev > BASELINE_TOL * size))
+
+    # ---- value columns (numeric spans only) ----
+    idx = np.flatnonzero(spans.numeric)
+    misaligned = mixed_font = checked = 0
+
+    if idx.size >= MIN_COLUMN:
+        x0, x1 = spans.x0[idx], spans.x1[idx]
+        centre = (x0 + x1) / 2.0
+        cols = _gap_clusters(centre, COLUMN_GAP * size[idx])
+
+        dev_left = np.abs(x0 - _group_median(x0, cols))
+        dev_right = np.abs(x1 - _group_median(x1, cols))
+        # A column is either left- or right-aligned: the better edge decides
+        dev = np.minimum(dev_left, dev_right)
+
+        fonts = spans.font[idx]
+        for label in np.unique(cols):
+            mask = cols == label
+            if np.count_nonzero(mask) < MIN_COLUMN:
+                continue
+            checked += int(np.count_nonzero(mask))
+            misaligned += int(np.count_nonzero(dev[mask] > ALIGN_TOL_PT))
+
+            names, counts = np.unique(fonts[mask], return_counts=True)
+            mixed_font += int(counts.sum() - counts.max())
+
+    return {
+        "spans": n,
+        "values_checked": checked,
+        "misaligned_values": misaligned,
+        "mixed_font_values": mixed_font,
+        "off_baseline": off_baseline,
+    }
+
+
+def alignment_risk(features: dict) -> float:
+    """
+    0.0 – 1.0 per page:
+    - share of misaligned values   × 2.5
+    - share of mixed-font values   × 1.5
+    - share of off-baseline spans  × 2.0
+    """
+    checked = max(features["values_checked"], 1)
+    spans = max(features["spans"], 1)
+
+    score = (
+        2.5 * features["misaligned_values"] / checked
+        + 1.5 * features["mixed_font_values"] / checked
+        + 2.0 * features["off_baseline"] / spans
+    )
+    return float(min(1.0, round(score, 3)))
+
+
+class TextLayerResult(NamedTuple):
+    score: float                 # max over born-digital pages
+    scanned_pages: List[int]     # 1-based; these still need the raster path
+    pages: List[dict]            # features per born-digital page
+
+
+def text_alignment_score(doc) -> TextLayerResult:
+    """
+    Font alignment for every page that has a text layer; pages without one
+    are listed in `scanned_pages` for the raster scorer.
+    """
+    scanned = []
+    pages = []
+
+    def born_digital():
+        for page in doc:
+            spans = page_spans(page)
+            if spans is None:
+                if page.get_images():
+                    scanned.append(page.number + 1)
+                continue
+            yield page.number + 1, spans
+
+    scan = MaxPageScan(born_digital())
+    for page_no, spans in scan:
+        features = alignment_features(spans)
+        features["page"] = page_no
+        features["score"] = alignment_risk(features)
+        pages.append(features)
+        scan.add(features["score"])
+
+    # Pages left unread after saturation are not classified; the score is already maximal
+    return TextLayerResult(scan.value, scanned, pages)
@@ -0,0 +1,71 @@
+import hashlib
+import os
+from typing import BinaryIO, NamedTuple
+
+
+# Big enough for few syscalls, small enough that a 500 MB scan never sits in memory
+CHUNK_SIZE = 1024 * 1024
+
+
+class SavedUpload(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+
+
+class HashingWriter:
+    """
+    Writes chunks to <path> while computing size + SHA-256 in the same pass.
+
+    Data goes to a hidden temp file next to the target and is renamed on
+    close(), so readers never see a half-written upload. abort() drops it.
+    Used directly by async readers (service.py); sync callers use save_upload().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.part")
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._f = open(self.tmp_path, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._f.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def close(self) -> SavedUpload:
+        self._f.close()
+        os.replace(self.tmp_path, self.path)
+        return SavedUpload(self.path, self.size, self._hash.hexdigest())
+
+    def abort(self) -> None:
+        self._f.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+def save_upload(src: BinaryIO, path: str, chunk_size: int = CHUNK_SIZE) -> SavedUpload:
+    """
+    Copy a file-like upload (Streamlit UploadedFile, request body, open file)
+    to `path` in fixed-size chunks; returns (path, size, sha256).
+    """
+    if hasattr(src, "seek"):
+        src.seek(0)
+
+    writer = HashingWriter(path)
+    try:
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                break
+            writer.write(chunk)
+    except BaseException:
+        writer.abort()
+        raise
+
+    return writer.close()
@@ -0,0 +1,128 @@
+import argparse
+import multiprocessing as mp
+import os
+import time
+import traceback
+
+from job_queue import (
+    EventWriter,
+    active_pdf_paths,
+    claim_job,
+    complete_job,
+    fail_job,
+    init_queue,
+    requeue_orphans,
+    update_progress,
+)
+from workspace import prune_workspaces
+
+
+def _preload() -> None:
+    """
+    Pay the heavy imports once per worker, not once per document.
+
+    fitz / cv2 / numpy plus the whole pipeline, which imports the scorers
+    and ml.predict_xgb (loads the XGBoost model).
+    """
+    import fitz  # noqa: F401
+    import cv2  # noqa: F401
+    import numpy  # noqa: F401
+    import pipeline  # noqa: F401
+    import ml.predict_xgb  # noqa: F401
+
+
+def worker_loop(poll_interval: float = 0.5) -> None:
+    _preload()
+
+    from pipeline import analyze_document
+    from workspace import create_workspace, workspace_of
+
+    pid = os.getpid()
+    print(f"[worker {pid}] ready")
+
+    while True:
+        job = claim_job(pid)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        job_id = job["id"]
+        print(f"[worker {pid}] job {job_id}: {job['pdf_path']}")
+
+        # The UI saves each upload into its own workspace; older jobs get a fresh one.
+        # It stays after the job (report / evidence downloads): prune_workspaces removes it
+        workspace = workspace_of(job["pdf_path"]) or create_workspace(f"job-{job_id}")
+
+        try:
+            with EventWriter(job_id) as on_event:
+                report = analyze_document(
+                    record_id=job["record_id"],
+                    pdf_path=job["pdf_path"],
+                    progress=lambda stage, fraction: update_progress(job_id, stage, fraction),
+                    workspace=workspace,
+                    on_event=on_event
+                )
+            complete_job(job_id, report)
+
+        except Exception as e:
+            traceback.print_exc()
+            fail_job(job_id, f"{type(e).__name__}: {e}")
+
+
+# Seconds between sweeps for expired workspaces (workspace.WORKSPACE_TTL_HOURS)
+PRUNE_INTERVAL = 600.0
+
+
+def _start_worker(poll_interval: float) -> mp.Process:
+    # Not daemonic: workers may start their own process pool (FORENSICS_SCORING_MODE=process)
+    proc = mp.Process(target=worker_loop, args=(poll_interval,))
+    proc.start()
+    return proc
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Warm forensics workers for the job queue")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--poll", type=float, default=0.5, help="seconds between queue polls")
+    args = parser.parse_args()
+
+    init_queue()
+
+    # Anything still 'running' belongs to a previous supervisor that died
+    requeued = requeue_orphans([])
+    if requeued:
+        print(f"Requeued {requeued} interrupted job(s)")
+
+    workers = [_start_worker(args.poll) for _ in range(args.workers)]
+    print(f"Started {len(workers)} worker(s)")
+
+    last_prune = 0.0
+
+    try:
+        while True:
+            time.sleep(2.0)
+
+            if time.time() - last_prune >= PRUNE_INTERVAL:
+                last_prune = time.time()
+                pruned = prune_workspaces(keep=active_pdf_paths())
+                if pruned:
+                    print(f"Removed {pruned} expired workspace(s)")
+
+            dead = [w for w in workers if not w.is_alive()]
+            if not dead:
+                continue
+
+            workers = [w for w in workers if w.is_alive()]
+            requeue_orphans([w.pid for w in workers])
+
+            for _ in dead:
+                workers.append(_start_worker(args.poll))
+            print(f"Restarted {len(dead)} worker(s)")
+
+    except KeyboardInterrupt:
+        for w in workers:
+            w.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import os
+import shutil
+import time
+import uuid
+from typing import Iterable, NamedTuple, Optional
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BASE_DIR)
+
+WORKSPACE_ROOT = os.getenv("FORENSICS_WORKSPACE_ROOT", os.path.join(PROJECT_ROOT, "workspaces"))
+
+# Finished workspaces stay for the UI (report, evidence ZIP downloads) until
+# nothing in them changed for this many hours; 0 keeps them forever
+WORKSPACE_TTL_HOURS = float(os.getenv("FORENSICS_WORKSPACE_TTL_HOURS", "24"))
+
+
+class Workspace(NamedTuple):
+    """
+    Private folder tree for one analysis.
+
+    Same layout as the project root (uploads/, Images/, Forensics_Output/,
+    reports/), so code that resolves siblings (Forensics_Output/<doc> ->
+    Images/<doc>) works unchanged inside a workspace.
+    """
+    root: str
+
+    @property
+    def uploads(self) -> str:
+        return os.path.join(self.root, "uploads")
+
+    @property
+    def images(self) -> str:
+        return os.path.join(self.root, "Images")
+
+    @property
+    def forensics(self) -> str:
+        return os.path.join(self.root, "Forensics_Output")
+
+    @property
+    def reports(self) -> str:
+        return os.path.join(self.root, "reports")
+
+
+def create_workspace(name: Optional[str] = None, base: str = WORKSPACE_ROOT) -> Workspace:
+    """
+    New isolated workspace: <base>/<name or random id>/...
+    """
+    ws = Workspace(os.path.join(base, name or uuid.uuid4().hex))
+    for d in (ws.uploads, ws.images, ws.forensics, ws.reports):
+        os.makedirs(d, exist_ok=True)
+    return ws
+
+
+def workspace_of(path: str, base: str = WORKSPACE_ROOT) -> Optional[Workspace]:
+    """
+    The workspace whose uploads/ folder holds `path`, or None for files
+    saved anywhere else.
+    """
+    uploads = os.path.dirname(os.path.abspath(path))
+    root = os.path.dirname(uploads)
+    if os.path.basename(uploads) != "uploads" or os.path.dirname(root) != os.path.abspath(base):
+        return None
+    return Workspace(root)
+
+
+def remove_workspace(ws: Workspace) -> None:
+    shutil.rmtree(ws.root, ignore_errors=True)
+
+
+def _last_change(root: str) -> float:
+    # A new / removed file touches its folder, so folder mtimes are enough
+    latest = os.path.getmtime(root)
+    for dirpath, _, _ in os.walk(root):
+        latest = max(latest, os.path.getmtime(dirpath))
+    return latest
+
+
+def prune_workspaces(
+    ttl_hours: float = WORKSPACE_TTL_HOURS,
+    keep: Iterable[str] = (),
+    base: str = WORKSPACE_ROOT
+) -> int:
+    """
+    Remove workspaces nothing was written to for `ttl_hours` (evidence
+    rendered or zipped for a download counts), except those holding a path
+    in `keep` (uploads of queued / running jobs). Returns how many were removed.
+    """
+    if ttl_hours <= 0 or not os.path.isdir(base):
+        return 0
+
+    keep_roots = {ws.root for ws in (workspace_of(p, base) for p in keep) if ws is not None}
+    cutoff = time.time() - ttl_hours * 3600.0
+
+    removed = 0
+    for name in os.listdir(base):
+        ws = Workspace(os.path.join(os.path.abspath(base), name))
+        if ws.root in keep_roots or not os.path.isdir(ws.root):
+            continue
+        try:
+            if _last_change(ws.root) >= cutoff:
+                continue
+        except OSError:
+            continue
+        remove_workspace(ws)
+        removed += 1
+    return removed